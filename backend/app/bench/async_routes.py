@@ -0,0 +1,94 @@
+# app/bench/async_routes.py
+"""
+Requests/second for the same product-page read served by a sync (threadpool)
+handler and an async (AsyncSession) handler, under N concurrent clients.
+
+    python -m app.bench.async_routes --clients 200 --seconds 10
+
+Starts a throwaway uvicorn process on --port against DATABASE_URL, so the
+load generator doesn't share a GIL with the server.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.bench import serve
+from app.crud import products as crud
+from app.db import AsyncSessionDep, SessionDep, init_db
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync/products")
+def sync_products(db: SessionDep, limit: int = 50):
+    rows, _ = crud.list_products(db, limit=limit)
+    return rows
+
+
+@bench_app.get("/async/products")
+async def async_products(db: AsyncSessionDep, limit: int = 50):
+    rows, _ = await db.run_sync(crud.list_products, limit=limit)
+    return rows
+
+
+async def _load(url: str, clients: int, seconds: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    r = await http.get(url)
+                    r.raise_for_status()
+                    latencies.append(time.perf_counter() - t0)
+                except httpx.HTTPError:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def pick(q: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+
+    return {
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(pick(0.50), 1),
+        "p99_ms": round(pick(0.99), 1),
+        "errors": errors,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.bench.async_routes")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    init_db()
+    with serve("app.bench.async_routes:bench_app", args.port) as base:
+        for kind in ("sync", "async"):
+            r = asyncio.run(
+                _load(f"{base}/{kind}/products", args.clients, args.seconds)
+            )
+            print(
+                f"{kind:<6} {r['rps']:>8} req/s  p50={r['p50_ms']}ms  p99={r['p99_ms']}ms  "
+                f"errors={r['errors']}  ({args.clients} clients, {args.seconds}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
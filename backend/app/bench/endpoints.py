@@ -0,0 +1,278 @@
+# app/bench/endpoints.py
+"""
+In-process latency / query / allocation benchmarks for the hot endpoints.
+
+    python -m app.bench.endpoints --scale 10 --out app/bench/baseline.json
+    python -m app.bench.endpoints --compare app/bench/baseline.json
+
+Requests go through TestClient, so routing, validation, serialization and
+the metrics middleware are all included. Query counts come from the
+Server-Timing header the middleware writes. Allocations are peak
+tracemalloc KiB per call, measured in a separate pass so tracing doesn't
+skew the timings. --scale replaces the data with app.seed.generate first;
+without it the suite runs on whatever DATABASE_URL holds.
+
+--compare exits 1 when a case is slower than the baseline by more than
+--threshold (and --min-delta-ms) or issues more queries than before.
+"""
+
+import argparse
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from statistics import median
+from typing import Callable
+
+from fastapi.testclient import TestClient
+
+from app.db import engine, init_db
+from app.main import app
+from app.seed import generate
+from app.services import catalogue, dashboard
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class Case:
+    name: str
+    method: str
+    path: str
+    params: dict = field(default_factory=dict)
+    headers: dict = field(default_factory=dict)
+    body: Callable[[], dict] | None = None
+    before: Callable[[], None] | None = None
+
+
+def _fixtures(client: TestClient) -> dict:
+    """Bench-owned products (deep stock) and a supplier for the write cases."""
+    tag = uuid.uuid4().hex[:6].upper()
+    products = []
+    for i in range(3):
+        r = client.post(
+            "/products/",
+            json={
+                "name": f"Bench {tag}-{i}",
+                "sku": f"BENCH-{tag}-{i}",
+                "price": 10.0 + i,
+                "cost_price": 5.0,
+                "stock_qty": 1e9,
+            },
+        )
+        r.raise_for_status()
+        products.append(r.json()["id"])
+    r = client.post("/suppliers/", json={"name": f"Bench supplier {tag}"})
+    r.raise_for_status()
+    etag = client.get("/products/", params={"limit": 50}).headers["etag"]
+    return {"products": products, "supplier_id": r.json()["id"], "products_etag": etag}
+
+
+def cases(fx: dict) -> list[Case]:
+    pids = fx["products"]
+    sale = {
+        "payment_method": "cash",
+        "items": [{"product_id": pid, "qty": 1, "unit_price": 10.0} for pid in pids],
+    }
+    purchase = {
+        "supplier_id": fx["supplier_id"],
+        "items": [{"product_id": pid, "qty": 5, "unit_cost": 5.0} for pid in pids],
+    }
+    return [
+        # Till poll with an unchanged catalogue: 304 from the page cache
+        Case(
+            "products_not_modified",
+            "GET",
+            "/products/",
+            {"limit": 50},
+            headers={"If-None-Match": fx["products_etag"]},
+        ),
+        # Bump first so the page is read and rendered, not served from cache
+        Case(
+            "products_page", "GET", "/products/", {"limit": 50}, before=catalogue.bump
+        ),
+        Case(
+            "products_low_stock",
+            "GET",
+            "/products/",
+            {"limit": 50, "low_stock": True},
+            before=catalogue.bump,
+        ),
+        # Invalidate first: the interesting number is the aggregate, not the cache hit
+        Case(
+            "dashboard_summary",
+            "GET",
+            "/dashboard/summary",
+            before=dashboard.invalidate,
+        ),
+        Case("credits_summary", "GET", "/credits/summary"),
+        Case("payment_history", "GET", "/credits/payment-history"),
+        Case("purchases_page", "GET", "/purchases/"),
+        Case("create_sale", "POST", "/sales/", body=lambda: sale),
+        Case("create_purchase", "POST", "/purchases/", body=lambda: purchase),
+    ]
+
+
+def _call(client: TestClient, case: Case):
+    if case.before:
+        case.before()
+    r = client.request(
+        case.method,
+        case.path,
+        params=case.params,
+        headers=case.headers,
+        json=case.body() if case.body else None,
+    )
+    if r.status_code >= 400:
+        raise RuntimeError(
+            f"{case.name}: {case.method} {case.path} -> {r.status_code} {r.text[:200]}"
+        )
+    return r
+
+
+def _pct(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def run_case(client: TestClient, case: Case, iterations: int, warmup: int = 3) -> dict:
+    for _ in range(warmup):
+        _call(client, case)
+
+    timings, queries = [], []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        r = _call(client, case)
+        timings.append((time.perf_counter() - t0) * 1000)
+        m = _QUERIES.search(r.headers.get("server-timing", ""))
+        queries.append(int(m.group(1)) if m else 0)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(min(iterations, 5)):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            _call(client, case)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(_pct(timings, 0.50), 3),
+        "p95_ms": round(_pct(timings, 0.95), 3),
+        "queries": int(median(queries)),
+        "alloc_peak_kib": round(median(peaks) / 1024, 1),
+        "iterations": iterations,
+    }
+
+
+def run_suite(iterations: int = 50, only: list[str] | None = None) -> dict:
+    with TestClient(app) as client:
+        fx = _fixtures(client)
+        results = {}
+        for case in cases(fx):
+            if only and case.name not in only:
+                continue
+            results[case.name] = run_case(client, case, iterations)
+    return results
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float = 0.2, min_delta_ms: float = 2.0
+) -> list[str]:
+    """Human-readable regressions of `current` against `baseline` results."""
+    problems = []
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            delta = now[metric] - before[metric]
+            if delta > min_delta_ms and now[metric] > before[metric] * (1 + threshold):
+                problems.append(
+                    f"{name}: {metric} {before[metric]} -> {now[metric]} "
+                    f"(+{100 * delta / before[metric]:.0f}%)"
+                )
+        if now["queries"] > before["queries"]:
+            problems.append(f"{name}: queries {before['queries']} -> {now['queries']}")
+    return problems
+
+
+def _print(results: dict, baseline: dict | None = None) -> None:
+    print(f"{'case':<20} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'alloc KiB':>10}")
+    for name, r in results.items():
+        line = f"{name:<20} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['queries']:>8} {r['alloc_peak_kib']:>10.1f}"
+        if baseline and name in baseline:
+            line += f"   (baseline p50 {baseline[name]['p50_ms']:.2f}, q {baseline[name]['queries']})"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bench.endpoints")
+    parser.add_argument(
+        "--scale", type=int, help="Reseed with app.seed.generate at this scale first"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--only", nargs="*", help="Run only these case names")
+    parser.add_argument("--out", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed latency regression (0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=2.0,
+        help="Ignore latency changes below this",
+    )
+    args = parser.parse_args(argv)
+
+    init_db()
+    if args.scale:
+        print(f"seeding scale={args.scale} seed={args.seed} ...", flush=True)
+        generate(engine, scale=args.scale, seed=args.seed)
+
+    results = run_suite(args.iterations, args.only)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    _print(results, baseline)
+
+    if args.out:
+        doc = {
+            "meta": {
+                "dialect": engine.dialect.name,
+                "scale": args.scale,
+                "seed": args.seed,
+                "iterations": args.iterations,
+                "python": platform.python_version(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.out, "w") as f:
+            json.dump(doc, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"wrote {args.out}")
+
+    if baseline is not None:
+        problems = compare(baseline, results, args.threshold, args.min_delta_ms)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        print(f"{len(problems)} regression(s) against {args.compare}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,435 @@
+# app/bench/pos_workload.py
+"""
+Concurrent POS workload: many tills selling the same hot SKUs while the back
+office restocks, takes credit payments and polls the dashboard.
+
+    python -m app.bench.pos_workload --concurrency 32 --seconds 30
+    python -m app.bench.pos_workload --url http://localhost:8000 --mix sale=80,payment=10,dashboard=10
+
+Without --url a throwaway uvicorn (--workers, --stock-engine) is started
+against DATABASE_URL. Setup creates its own hot products, employees and
+supplier over HTTP, so the run only touches rows it owns.
+
+Every response is classified as ok, rejected (4xx business rule, e.g.
+insufficient stock or overpayment), contention (the 409/503 the API
+returns for deadlocks, serialization failures and lock/statement timeouts)
+or error (5xx / transport). Afterwards the database is checked against
+what the server acknowledged:
+
+  * stock_qty == initial + acknowledged purchases - acknowledged sales
+  * sale and purchase lines on the hot SKUs add up to the same totals
+  * no negative stock or outstanding balance
+  * the stock movement ledger sums to stock_qty on the hot SKUs
+  * credit balances match the ledger, and the ledger matches the
+    acknowledged credit sales and payments
+
+Exit status is 1 when an invariant fails.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+
+import httpx
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.bench import serve
+from app.db import engine, init_db
+from app.models import (
+    CreditBalance,
+    CreditTransaction,
+    CreditType,
+    Product,
+    PurchaseItem,
+    SaleItem,
+    StockMovement,
+)
+from app.services.credits import rebuild_credit_balances
+
+DEFAULT_MIX = "sale=70,payment=10,purchase=5,dashboard=15"
+
+
+@dataclass
+class Tally:
+    """Client-side view of what the server acknowledged."""
+
+    latencies: dict = field(default_factory=lambda: defaultdict(list))
+    outcomes: dict = field(default_factory=lambda: defaultdict(Counter))
+    contention: Counter = field(default_factory=Counter)
+    sold: Counter = field(default_factory=Counter)
+    bought: Counter = field(default_factory=Counter)
+    charged: Counter = field(default_factory=Counter)
+    paid: Counter = field(default_factory=Counter)
+    unknown_writes: int = 0
+
+
+@dataclass
+class Fixture:
+    products: list[int]
+    prices: dict[int, float]
+    initial_stock: dict[int, float]
+    employees: list[int]
+    supplier_id: int
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("sale", "payment", "purchase", "dashboard"):
+            raise SystemExit(f"unknown operation in --mix: {name!r}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def setup(
+    http: httpx.AsyncClient, hot: int, stock: float, employees: int
+) -> Fixture:
+    tag = uuid.uuid4().hex[:6].upper()
+    products, prices = [], {}
+    for i in range(hot):
+        price = float(10 + 5 * i)
+        r = await http.post(
+            "/products/",
+            json={
+                "name": f"POS hot {tag}-{i}",
+                "sku": f"POS-{tag}-{i}",
+                "price": price,
+                "cost_price": price / 2,
+                "stock_qty": stock,
+            },
+        )
+        r.raise_for_status()
+        products.append(r.json()["id"])
+        prices[products[-1]] = price
+    emp_ids = []
+    for i in range(employees):
+        r = await http.post("/employees/", json={"name": f"POS till {tag}-{i}"})
+        r.raise_for_status()
+        emp_ids.append(r.json()["id"])
+    r = await http.post("/suppliers/", json={"name": f"POS supplier {tag}"})
+    r.raise_for_status()
+    return Fixture(
+        products, prices, {p: stock for p in products}, emp_ids, r.json()["id"]
+    )
+
+
+def _classify(r: httpx.Response) -> str:
+    if r.status_code < 400:
+        return "ok"
+    if r.status_code in (409, 503):
+        try:
+            body = r.json()
+        except ValueError:
+            body = {}
+        if isinstance(body, dict) and body.get("sqlstate"):
+            return "contention"
+    return "rejected" if r.status_code < 500 else "error"
+
+
+async def worker(
+    http,
+    fx: Fixture,
+    mix: dict,
+    tally: Tally,
+    deadline: float,
+    rng: random.Random,
+    credit_share: float,
+    zipf: list[float],
+) -> None:
+    ops, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        op = rng.choices(ops, weights)[0]
+        lines, employee_id, amount = {}, None, 0.0
+        if op == "sale":
+            for pid in rng.choices(fx.products, zipf, k=rng.randint(1, 3)):
+                lines[pid] = lines.get(pid, 0) + rng.randint(1, 3)
+            credit = rng.random() < credit_share
+            employee_id = rng.choice(fx.employees) if credit else None
+            req = http.post(
+                "/sales/",
+                json={
+                    "employee_id": employee_id,
+                    "payment_method": "credit" if credit else "cash",
+                    "items": [
+                        {"product_id": p, "qty": q, "unit_price": fx.prices[p]}
+                        for p, q in lines.items()
+                    ],
+                },
+            )
+        elif op == "payment":
+            employee_id = rng.choice(fx.employees)
+            amount = float(rng.randint(1, 40))
+            req = http.post(f"/credits/{employee_id}/payments", json={"amount": amount})
+        elif op == "purchase":
+            for pid in rng.sample(fx.products, k=min(2, len(fx.products))):
+                lines[pid] = rng.randint(20, 60)
+            req = http.post(
+                "/purchases/",
+                json={
+                    "supplier_id": fx.supplier_id,
+                    "items": [
+                        {"product_id": p, "qty": q, "unit_cost": fx.prices[p] / 2}
+                        for p, q in lines.items()
+                    ],
+                },
+            )
+        else:
+            req = http.get("/dashboard/summary")
+
+        t0 = time.perf_counter()
+        try:
+            r = await req
+        except httpx.HTTPError:
+            tally.outcomes[op]["error"] += 1
+            if op != "dashboard":
+                tally.unknown_writes += 1  # may or may not have committed
+            continue
+        tally.latencies[op].append(time.perf_counter() - t0)
+        outcome = _classify(r)
+        tally.outcomes[op][outcome] += 1
+        if outcome == "contention":
+            tally.contention[r.json()["sqlstate"]] += 1
+        if outcome != "ok":
+            continue
+        if op == "sale":
+            tally.sold.update(lines)
+            if employee_id is not None:
+                tally.charged[employee_id] += r.json()["total"]
+        elif op == "purchase":
+            tally.bought.update(lines)
+        elif op == "payment":
+            tally.paid[employee_id] += amount
+
+
+def check_invariants(fx: Fixture, tally: Tally) -> list[tuple[str, bool, str]]:
+    """(name, ok, detail) per invariant, read straight from the database."""
+    out = []
+    with Session(engine) as db:
+        stock = dict(
+            db.exec(
+                select(Product.id, Product.stock_qty).where(Product.id.in_(fx.products))
+            ).all()
+        )
+        sold = dict(
+            db.exec(
+                select(SaleItem.product_id, func.sum(SaleItem.qty))
+                .where(SaleItem.product_id.in_(fx.products))
+                .group_by(SaleItem.product_id)
+            ).all()
+        )
+        bought = dict(
+            db.exec(
+                select(PurchaseItem.product_id, func.sum(PurchaseItem.qty))
+                .where(PurchaseItem.product_id.in_(fx.products))
+                .group_by(PurchaseItem.product_id)
+            ).all()
+        )
+
+        bad = [
+            f"#{p}: stock {stock[p]} != {fx.initial_stock[p]} + {tally.bought[p]} - {tally.sold[p]}"
+            for p in fx.products
+            if abs(stock[p] - (fx.initial_stock[p] + tally.bought[p] - tally.sold[p]))
+            > 1e-6
+        ]
+        out.append(("stock matches acknowledged writes", not bad, "; ".join(bad[:3])))
+        bad = [
+            f"#{p}: lines sold {sold.get(p, 0)}/{tally.sold[p]} bought {bought.get(p, 0)}/{tally.bought[p]}"
+            for p in fx.products
+            if abs(sold.get(p, 0) - tally.sold[p]) > 1e-6
+            or abs(bought.get(p, 0) - tally.bought[p]) > 1e-6
+        ]
+        out.append(
+            ("line items match acknowledged writes", not bad, "; ".join(bad[:3]))
+        )
+        negative = [p for p in fx.products if stock[p] < 0]
+        out.append(
+            (
+                "no negative stock",
+                not negative,
+                f"products {negative}" if negative else "",
+            )
+        )
+        moved = dict(
+            db.exec(
+                select(StockMovement.product_id, func.sum(StockMovement.delta))
+                .where(StockMovement.product_id.in_(fx.products))
+                .group_by(StockMovement.product_id)
+            ).all()
+        )
+        bad = [
+            f"#{p}: ledger {moved.get(p, 0)} != stock {stock[p]}"
+            for p in fx.products
+            if abs(moved.get(p, 0) - stock[p]) > 1e-6
+        ]
+        out.append(("stock ledger matches stock", not bad, "; ".join(bad[:3])))
+
+        ledger = {
+            (emp, kind): total
+            for emp, kind, total in db.exec(
+                select(
+                    CreditTransaction.employee_id,
+                    CreditTransaction.type,
+                    func.sum(CreditTransaction.amount),
+                )
+                .where(CreditTransaction.employee_id.in_(fx.employees))
+                .group_by(CreditTransaction.employee_id, CreditTransaction.type)
+            ).all()
+        }
+        bad = [
+            f"employee {e}: charges {ledger.get((e, CreditType.charge), 0):.2f}/{tally.charged[e]:.2f} "
+            f"payments {ledger.get((e, CreditType.payment), 0):.2f}/{tally.paid[e]:.2f}"
+            for e in fx.employees
+            if abs(ledger.get((e, CreditType.charge), 0) - tally.charged[e]) > 0.005
+            or abs(ledger.get((e, CreditType.payment), 0) - tally.paid[e]) > 0.005
+        ]
+        out.append(("ledger matches acknowledged credit", not bad, "; ".join(bad[:3])))
+        overdrawn = db.exec(
+            select(CreditBalance.employee_id).where(
+                CreditBalance.employee_id.in_(fx.employees),
+                CreditBalance.outstanding < -0.005,
+            )
+        ).all()
+        out.append(
+            (
+                "no negative outstanding",
+                not overdrawn,
+                f"employees {overdrawn}" if overdrawn else "",
+            )
+        )
+        drift = rebuild_credit_balances(db, fix=False)
+        out.append(
+            (
+                "balances match ledger",
+                not drift,
+                f"{len(drift)} drifted" if drift else "",
+            )
+        )
+    return out
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+
+
+def report(tally: Tally, elapsed: float, invariants: list) -> None:
+    every = [v for vals in tally.latencies.values() for v in vals]
+    total = sum(sum(c.values()) for c in tally.outcomes.values())
+    ok = sum(c["ok"] for c in tally.outcomes.values())
+    print(
+        f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s, "
+        f"{ok / elapsed:.1f} ok/s, p50 {_pct(every, 0.5):.1f}ms, p99 {_pct(every, 0.99):.1f}ms"
+    )
+    print(
+        f"{'op':<10} {'ok':>7} {'rejected':>9} {'contention':>11} {'error':>6} {'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for op in sorted(tally.outcomes):
+        c, lat = tally.outcomes[op], tally.latencies[op]
+        print(
+            f"{op:<10} {c['ok']:>7} {c['rejected']:>9} {c['contention']:>11} {c['error']:>6} "
+            f"{_pct(lat, 0.5):>8.1f} {_pct(lat, 0.99):>8.1f}"
+        )
+    if tally.contention:
+        print(
+            "contention: "
+            + ", ".join(f"{k}={v}" for k, v in sorted(tally.contention.items()))
+        )
+    if tally.unknown_writes:
+        print(
+            f"warning: {tally.unknown_writes} write(s) failed in transport; invariants may not hold exactly"
+        )
+    print("invariants:")
+    for name, ok, detail in invariants:
+        print(
+            f"  [{'PASS' if ok else 'FAIL'}] {name}" + (f": {detail}" if detail else "")
+        )
+
+
+async def run(base_url: str, args) -> tuple[Tally, float, Fixture]:
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=args.timeout
+    ) as http:
+        fx = await setup(http, args.hot, args.stock, args.employees)
+        mix = parse_mix(args.mix)
+        zipf = [1 / (rank**1.2) for rank in range(1, len(fx.products) + 1)]
+        tally = Tally()
+        started = time.perf_counter()
+        deadline = started + args.seconds
+        await asyncio.gather(
+            *(
+                worker(
+                    http,
+                    fx,
+                    mix,
+                    tally,
+                    deadline,
+                    random.Random(args.seed + i),
+                    args.credit_share,
+                    zipf,
+                )
+                for i in range(args.concurrency)
+            )
+        )
+        return tally, time.perf_counter() - started, fx
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bench.pos_workload")
+    parser.add_argument("--url", help="Target a running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="uvicorn workers for the spawned server"
+    )
+    parser.add_argument(
+        "--stock-engine",
+        choices=("lock", "conditional"),
+        help="STOCK_ENGINE for the spawned server",
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help=f"Weighted operations (default {DEFAULT_MIX})",
+    )
+    parser.add_argument("--hot", type=int, default=5, help="Number of hot SKUs")
+    parser.add_argument(
+        "--stock", type=float, default=500, help="Initial stock per hot SKU"
+    )
+    parser.add_argument("--employees", type=int, default=8)
+    parser.add_argument(
+        "--credit-share", type=float, default=0.3, help="Fraction of sales on credit"
+    )
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    init_db()
+    env = {"STOCK_ENGINE": args.stock_engine} if args.stock_engine else None
+    server = (
+        nullcontext(args.url)
+        if args.url
+        else serve("app.main:app", args.port, args.workers, env)
+    )
+    with server as base:
+        tally, elapsed, fx = asyncio.run(run(base, args))
+    invariants = check_invariants(fx, tally)
+    report(tally, elapsed, invariants)
+    return 0 if all(ok for _, ok, _ in invariants) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
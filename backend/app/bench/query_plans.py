@@ -0,0 +1,273 @@
+# app/bench/query_plans.py
+"""
+EXPLAIN every hot query and fail when one falls back to a full table scan.
+
+    python -m app.bench.query_plans --scale 100
+    python -m app.bench.query_plans --force-index     # any data size
+
+Each case drives the real code path (mostly through TestClient). Every
+SELECT it sends is captured with its parameters and re-run under EXPLAIN
+(PostgreSQL) or EXPLAIN QUERY PLAN (SQLite). A sequential scan of any
+table outside SMALL_TABLES fails the case.
+
+The PostgreSQL planner rightly scans small tables, so run it on a scaled
+dataset (--scale reseeds with app.seed.generate first). --force-index
+sets enable_seqscan = off instead: the plan then only falls back to a
+scan when no usable index exists, which holds at any size. The test
+suite uses it.
+"""
+
+import argparse
+import json
+import re
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, text
+from sqlalchemy.engine import Connection
+from sqlmodel import Session, SQLModel, select
+
+from app.crud.products import delete_product
+from app.db import async_engine, engine, init_db
+from app.main import app
+from app.models import CreditTransaction, Product, Purchase, Sale, SaleItem
+from app.seed import generate
+
+# Dimension tables that stay small; scanning them is fine
+SMALL_TABLES = {"employee", "supplier", "creditbalance"}
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[TestClient, dict], object]
+    allow: frozenset[str] = frozenset()  # tables this case may scan, with a reason
+
+
+def _refused_product_delete(client: TestClient, ids: dict) -> None:
+    # The "used in purchases/sales" lookups; the product has history, so nothing is deleted
+    with Session(engine) as db:
+        try:
+            delete_product(db, ids["product_no_stock"])
+        except ValueError:
+            pass
+        db.rollback()
+
+
+CASES = [
+    Case("purchases_page", lambda c, ids: c.get("/purchases/", params={"limit": 50})),
+    Case(
+        "purchases_window",
+        lambda c, ids: c.get(
+            "/purchases/", params={"from": ids["day"], "to": ids["day"], "limit": 50}
+        ),
+    ),
+    Case("purchase_detail", lambda c, ids: c.get(f"/purchases/{ids['purchase']}")),
+    # The page's items cover every charge of ~50 employees (thousands of lines);
+    # hash-joining those to sale and product beats as many primary key probes
+    Case(
+        "payment_history",
+        lambda c, ids: c.get("/credits/payment-history", params={"limit": 50}),
+        allow=frozenset({"sale", "product"}),
+    ),
+    # Every line of every debtor's credit sales (a fifth of all sale lines at
+    # --scale 330): hash joins over scans win; --force-index still proves the
+    # indexes exist
+    Case(
+        "credit_summary",
+        lambda c, ids: c.get("/credits/summary"),
+        allow=frozenset({"credittransaction", "sale", "saleitem", "product"}),
+    ),
+    Case(
+        "payment_history_window",
+        lambda c, ids: c.get(
+            "/credits/payment-history",
+            params={"from": ids["day"], "to": ids["day"], "limit": 50},
+        ),
+    ),
+    Case(
+        "employee_payments",
+        lambda c, ids: c.get(
+            "/credits/payment-history",
+            params={"employee_id": ids["employee"], "limit": 50},
+        ),
+    ),
+    Case("products_page", lambda c, ids: c.get("/products/", params={"limit": 50})),
+    Case(
+        "low_stock_page",
+        lambda c, ids: c.get("/products/", params={"low_stock": True, "limit": 50}),
+    ),
+    Case(
+        "stock_movements",
+        lambda c, ids: c.get(
+            "/stock/movements", params={"product_id": ids["product"], "limit": 50}
+        ),
+    ),
+    Case(
+        "stock_on_hand",
+        lambda c, ids: c.get("/stock/on-hand", params={"product_id": ids["product"]}),
+    ),
+    Case(
+        "top_products",
+        lambda c, ids: c.get(
+            "/reports/top-products", params={"from": ids["day"], "to": ids["day"]}
+        ),
+    ),
+    Case(
+        "sales_export_day",
+        lambda c, ids: c.get(
+            "/exports/sales", params={"from": ids["day"], "to": ids["day"]}
+        ),
+    ),
+    Case(
+        "employee_delete_check",
+        lambda c, ids: c.delete(f"/employees/{ids['employee']}"),
+    ),
+    Case("product_delete_check", _refused_product_delete),
+]
+
+
+def _sample_ids(db: Session) -> dict:
+    """Representative keys: the latest rows, and an employee with credit history."""
+    last_sale = db.exec(select(func.max(Sale.created_at))).one()
+    return {
+        "purchase": db.exec(select(func.max(Purchase.id))).one(),
+        "employee": db.exec(
+            select(CreditTransaction.employee_id)
+            .order_by(CreditTransaction.id.desc())
+            .limit(1)
+        ).first(),
+        "product": db.exec(
+            select(SaleItem.product_id).order_by(SaleItem.id.desc()).limit(1)
+        ).first(),
+        "product_no_stock": db.exec(
+            select(Product.id)
+            .where(Product.stock_qty == 0, Product.id.in_(select(SaleItem.product_id)))
+            .limit(1)
+        ).first(),
+        "day": (last_sale.date() if last_sale else date.today()).isoformat(),
+    }
+
+
+@contextmanager
+def _capture():
+    """SELECTs (statement, parameters) sent by the sync and async engines."""
+    seen: dict[str, object] = {}
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(
+            ("SELECT", "WITH")
+        ):
+            seen.setdefault(statement, parameters)
+
+    targets = (engine, async_engine.sync_engine)
+    for target in targets:
+        event.listen(target, "before_cursor_execute", _before)
+    try:
+        yield seen
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", _before)
+
+
+def _scanned_tables(conn: Connection, statement: str, parameters) -> set[str]:
+    if conn.dialect.name == "postgresql":
+        ((plan,),) = conn.exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + statement, parameters
+        ).all()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        scanned, nodes = set(), [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan":
+                scanned.add(node["Relation Name"])
+            nodes.extend(node.get("Plans", ()))
+        return scanned
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    # Materialized subqueries show up as "SCAN anon_1"; only tables count
+    return {m.group(1) for r in rows if (m := _SQLITE_SCAN.match(r[-1]))} & set(
+        SQLModel.metadata.tables
+    )
+
+
+def check_plans(force_index: bool = False, only: list[str] | None = None) -> list[dict]:
+    """Run every case; one result per case with the scanned big tables per statement."""
+    client = TestClient(app)
+    with Session(engine) as db:
+        ids = _sample_ids(db)
+    results = []
+    for case in CASES:
+        if only and case.name not in only:
+            continue
+        if any(v is None for v in ids.values()):
+            results.append(
+                {"case": case.name, "queries": 0, "skipped": True, "scans": []}
+            )
+            continue
+        with _capture() as seen:
+            case.run(client, ids)
+        scans = []
+        with engine.connect() as conn:
+            if force_index and conn.dialect.name == "postgresql":
+                conn.execute(text("SET enable_seqscan = off"))
+            for statement, parameters in seen.items():
+                bad = (
+                    _scanned_tables(conn, statement, parameters)
+                    - SMALL_TABLES
+                    - case.allow
+                )
+                if bad:
+                    scans.append(
+                        {
+                            "tables": sorted(bad),
+                            "statement": " ".join(statement.split()),
+                        }
+                    )
+            conn.rollback()
+        results.append(
+            {"case": case.name, "queries": len(seen), "skipped": False, "scans": scans}
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bench.query_plans")
+    parser.add_argument(
+        "--scale", type=int, help="Reseed with app.seed.generate at this scale first"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--force-index",
+        action="store_true",
+        help="PostgreSQL: disable seq scans, so only a missing index shows up as one",
+    )
+    parser.add_argument("--only", nargs="*", help="Run only these case names")
+    args = parser.parse_args(argv)
+
+    if args.scale:
+        init_db()
+        print(generate(engine, scale=args.scale, seed=args.seed))
+        if engine.dialect.name == "postgresql":
+            with engine.connect() as conn:
+                conn.execute(text("ANALYZE"))
+                conn.commit()
+
+    failed = 0
+    for r in check_plans(force_index=args.force_index, only=args.only):
+        status = "skip" if r["skipped"] else ("FAIL" if r["scans"] else "ok")
+        print(f"{status:4}  {r['case']:24} {r['queries']} queries")
+        for s in r["scans"]:
+            print(f"      seq scan on {', '.join(s['tables'])}: {s['statement'][:200]}")
+        failed += bool(r["scans"])
+    print(f"{failed} case(s) with sequential scans")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
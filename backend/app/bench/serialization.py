@@ -0,0 +1,118 @@
+# app/bench/serialization.py
+"""
+Before/after for rendering a large product list (50k rows by default).
+
+    python -m app.bench.serialization --rows 50000
+
+Rows are built in memory, so only serialization and compression are
+measured. Each path runs through TestClient with a real route:
+
+  before      hand-built ProductOut objects returned through response_model
+              and rendered with the stdlib JSONResponse (dump, re-validate,
+              jsonable, json.dumps)
+  orjson      plain rows through response_model with ORJSONResponse (the
+              app default now: one validation, orjson encoding)
+  validated   utils.json_response: validate once and encode in pydantic-core
+              (purchases / credit list routes)
+  dump_json   TypeAdapter(list[ProductOut]).dump_json of the ORM rows
+              (the GET /products/ cache-miss path)
+
+and then the dump_json path again with Accept-Encoding gzip and br.
+"""
+
+import argparse
+import statistics
+import time
+
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.compression import CompressionMiddleware, brotli
+from app.models import Product
+from app.schemas import ProductOut
+from app.utils import json_response
+
+_adapter = TypeAdapter(list[ProductOut])
+
+
+def _rows(n: int) -> list[Product]:
+    return [
+        Product(
+            id=i,
+            name=f"Product {i:06d}",
+            sku=f"SKU-{i:06d}",
+            unit="bag",
+            price=10 + i % 90,
+            cost_price=7.5 + i % 60,
+            stock_qty=i % 200,
+            reorder_level=10,
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def build_app(rows: list[Product]) -> FastAPI:
+    bench_app = FastAPI(default_response_class=ORJSONResponse)
+    bench_app.add_middleware(CompressionMiddleware)
+
+    @bench_app.get(
+        "/before", response_model=list[ProductOut], response_class=JSONResponse
+    )
+    def before():
+        return [ProductOut.model_validate(p) for p in rows]
+
+    @bench_app.get("/orjson", response_model=list[ProductOut])
+    def orjson_rows():
+        return rows
+
+    @bench_app.get("/validated", response_model=list[ProductOut])
+    def validated():
+        return json_response(_adapter, rows)
+
+    @bench_app.get("/dump_json", response_model=list[ProductOut])
+    def dump_json():
+        return Response(_adapter.dump_json(rows), media_type="application/json")
+
+    return bench_app
+
+
+def _time(
+    client: TestClient, path: str, repeat: int, encoding: str = "identity"
+) -> tuple[float, int]:
+    timings, size = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        r = client.get(path, headers={"Accept-Encoding": encoding})
+        timings.append((time.perf_counter() - t0) * 1000)
+        size = int(r.headers.get("content-length", len(r.content)))
+    return statistics.median(timings), size
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.bench.serialization")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    client = TestClient(build_app(_rows(args.rows)))
+    print(f"{args.rows} products, median of {args.repeat}")
+    print(f"{'path':<22} {'ms':>9} {'bytes':>12}")
+    runs = [
+        ("before", "identity"),
+        ("orjson", "identity"),
+        ("validated", "identity"),
+        ("dump_json", "identity"),
+        ("dump_json", "gzip"),
+    ]
+    if brotli is not None:
+        runs.append(("dump_json", "br"))
+    for path, encoding in runs:
+        ms, size = _time(client, f"/{path}", args.repeat, encoding)
+        label = path if encoding == "identity" else f"{path} + {encoding}"
+        print(f"{label:<22} {ms:>9.1f} {size:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# app/bench/stock_engines.py
+"""
+Compare sale throughput on a single hot SKU between the stock engines.
+
+    python -m app.bench.stock_engines --workers 16 --sales 2000
+
+Runs against DATABASE_URL; each worker thread uses its own session.
+Meaningful numbers need PostgreSQL (SQLite serialises all writers).
+
+A local database answers in microseconds, so the run is CPU-bound and
+how long a hot row stays locked barely shows. --rtt-ms sleeps that long
+before every statement, like the network round trip to a remote server:
+a row locked across N statements is then held for about N round trips.
+"""
+
+import argparse
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.db import engine, init_db
+from app.models import PaymentMethod, Product
+from app.services.inventory import STOCK_ENGINES, create_sale
+
+
+def _hot_product(stock: float) -> int:
+    with Session(engine) as db:
+        sku = f"BENCH-HOT-{uuid.uuid4().hex[:8]}".upper()
+        p = Product(
+            name=f"Bench hot SKU {sku}",
+            sku=sku,
+            price=1.0,
+            cost_price=0.5,
+            stock_qty=stock,
+        )
+        db.add(p)
+        db.commit()
+        return p.id
+
+
+def run(stock_engine: str, workers: int, sales: int) -> dict:
+    product_id = _hot_product(stock=sales)
+    items = [{"product_id": product_id, "qty": 1, "unit_price": 1.0}]
+
+    def sell(_) -> bool:
+        with Session(engine) as db:
+            try:
+                create_sale(
+                    db, None, PaymentMethod.cash, items, stock_engine=stock_engine
+                )
+                return True
+            except HTTPException:
+                return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = sum(1 for ok in pool.map(sell, range(sales)) if not ok)
+    elapsed = time.perf_counter() - started
+
+    with Session(engine) as db:
+        left = db.get(Product, product_id).stock_qty
+    return {
+        "engine": stock_engine,
+        "sales": sales,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "sales_per_sec": round((sales - errors) / elapsed, 1),
+        "errors": errors,
+        "stock_left": left,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.bench.stock_engines")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--sales", type=int, default=2000)
+    parser.add_argument("--engines", nargs="+", default=list(STOCK_ENGINES))
+    parser.add_argument(
+        "--rtt-ms",
+        type=float,
+        default=0.0,
+        help="Simulated client-server round trip per statement",
+    )
+    args = parser.parse_args(argv)
+
+    init_db()
+    if args.rtt_ms:
+        delay = args.rtt_ms / 1000
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _round_trip(*_):
+            time.sleep(delay)
+
+    for name in args.engines:
+        r = run(name, args.workers, args.sales)
+        print(
+            f"{r['engine']:<12} {r['sales_per_sec']:>8} sales/s  "
+            f"({r['sales']} sales, {r['workers']} workers, {r['seconds']}s, "
+            f"errors={r['errors']}, stock_left={r['stock_left']}, rtt={args.rtt_ms}ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
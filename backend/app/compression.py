@@ -0,0 +1,142 @@
+# app/compression.py
+"""
+Response compression: brotli when the client accepts it and the `brotli`
+package is installed, gzip otherwise.
+
+Pure ASGI middleware, like MetricsMiddleware. Small bodies (< MIN_SIZE) and
+non-text content pass through untouched. Streaming responses (exports) are
+compressed chunk by chunk without buffering the whole body.
+
+A strong ETag names exact bytes, so compressed responses (and 304s to
+clients that negotiated an encoding) carry it weakened to W/"...";
+catalogue.etag_matches compares weakly, so either form revalidates.
+"""
+
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # dynamic content: most of the ratio at a fraction of q11's CPU
+COMPRESSIBLE = (
+    b"application/json",
+    b"application/x-ndjson",
+    b"text/",
+)
+
+
+def _choose(accept_encoding: str) -> str | None:
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def _weaken_etag(headers: list) -> list:
+    return [
+        (k, b"W/" + v if k == b"etag" and not v.startswith(b"W/") else v)
+        for k, v in headers
+    ]
+
+
+class _Encoder:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.flush()
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.finish()
+        return self._c.compress(data) + self._c.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, min_size: int = MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept = ""
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = _choose(accept) if accept else None
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        encoder = None
+
+        async def send_wrapper(message):
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                start = message  # held until we see the first body chunk
+                if start["status"] == 304:
+                    start["headers"] = _weaken_etag(start.get("headers", []))
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if start is not None:
+                headers = start.get("headers", [])
+                ctype = next((v for k, v in headers if k == b"content-type"), b"")
+                skip = (
+                    any(k == b"content-encoding" for k, _ in headers)
+                    or not ctype.startswith(COMPRESSIBLE)
+                    or (not more and len(body) < self.min_size)
+                )
+                if not skip:
+                    encoder = _Encoder(encoding)
+                    start["headers"] = [
+                        (k, v)
+                        for k, v in _weaken_etag(headers)
+                        if k != b"content-length"
+                    ] + [
+                        (b"content-encoding", encoding.encode()),
+                        (b"vary", b"Accept-Encoding"),
+                    ]
+                    body = encoder.chunk(body) if more else encoder.finish(body)
+                    if not more:
+                        start["headers"].append(
+                            (b"content-length", str(len(body)).encode())
+                        )
+                await send(start)
+                start = None
+                return await send(
+                    {"type": "http.response.body", "body": body, "more_body": more}
+                )
+
+            if encoder is not None:
+                body = encoder.chunk(body) if more else encoder.finish(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more})
+
+        await self.app(scope, receive, send_wrapper)
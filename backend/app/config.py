@@ -8,6 +8,21 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change-me"
     CORS_ORIGINS: str = "http://localhost:5173"
     LOG_LEVEL: str = "info"
+    DASHBOARD_CACHE_SECONDS: float = 5.0
+    # Max age of a cached product-list page; bounds staleness across workers
+    CATALOGUE_CACHE_SECONDS: float = 30.0
+    # "lock" (SELECT ... FOR UPDATE then ORM write) or "conditional"
+    # (single UPDATE ... WHERE stock_qty >= :q per product)
+    STOCK_ENGINE: str = "lock"
+    # Interval of each worker's background fold of SalesDelta into DailySales
+    # (0 disables it; `manage sales-fold` still works)
+    SALES_FOLD_SECONDS: float = 60.0
+    # Connection pool (applies to both the sync and async engines)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 = server default (no limit)
 
     class Config:
         env_file = ".env.backend"
@@ -3,8 +3,8 @@ from sqlmodel import Session
 from ..services.credits import (
     balance_for_employee,
     credit_summary,
-    record_credit_payment,
     payment_history,
+    record_credit_payment,
 )
 
 
@@ -20,5 +20,5 @@ def summary(db: Session):
     return credit_summary(db)
 
 
-def payment_history_crud(db: Session):
-    return payment_history(db)
+def payment_history_crud(db: Session, **filters):
+    return payment_history(db, **filters)
@@ -1,8 +1,15 @@
 from typing import List
+
+from sqlalchemy import and_, func, or_
 from sqlmodel import Session, select
+
+from ..db import on_commit, transactional
 from ..models import Product, PurchaseItem, SaleItem
+from ..services import catalogue, dashboard
+from ..services.stock_ledger import forget_product
 
 
+@transactional
 def delete_product(db: Session, pid: int) -> bool:
     prod = db.get(Product, pid)
     if not prod:
@@ -13,41 +20,77 @@ def delete_product(db: Session, pid: int) -> bool:
         raise ValueError("Cannot delete: product has non-zero stock.")
 
     # Safety: block delete if it was ever used in purchases or sales
-    used_in_purchase = db.exec(select(PurchaseItem.id).where(PurchaseItem.product_id == pid).limit(1)).first()
-    used_in_sale = db.exec(select(SaleItem.id).where(SaleItem.product_id == pid).limit(1)).first()
+    used_in_purchase = db.exec(
+        select(PurchaseItem.id).where(PurchaseItem.product_id == pid).limit(1)
+    ).first()
+    used_in_sale = db.exec(
+        select(SaleItem.id).where(SaleItem.product_id == pid).limit(1)
+    ).first()
     if used_in_purchase or used_in_sale:
         raise ValueError("Cannot delete: product has transaction history.")
 
+    forget_product(db, pid)
     db.delete(prod)
-    db.commit()
+    on_commit(db, dashboard.invalidate)
+    on_commit(db, catalogue.bump)
     return True
 
 
+def _product_filters(
+    low_stock_only: bool = False,
+    unit: str | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+) -> list:
+    clauses = []
+    if low_stock_only:
+        clauses.append(Product.stock_qty <= Product.reorder_level)
+    if unit is not None:
+        clauses.append(Product.unit == unit)
+    if min_price is not None:
+        clauses.append(Product.price >= min_price)
+    if max_price is not None:
+        clauses.append(Product.price <= max_price)
+    return clauses
 
-def list_products(db: Session) -> List[Product]:
-    res = db.exec(select(Product).order_by(Product.name.asc()))
-    rows = res.all()
+
+def list_products(
+    db: Session,
+    *,
+    after: tuple[str, int] | None = None,
+    limit: int | None = None,
+    **filters,
+) -> tuple[List[Product], tuple[str, int] | None]:
+    """
+    Products ordered by (name, id). With `limit`, returns one keyset page
+    starting after `after`; the second element is the next page's key.
+    """
+    stmt = (
+        select(Product)
+        .where(*_product_filters(**filters))
+        .order_by(Product.name.asc(), Product.id.asc())
+    )
+    if after is not None:
+        name, pid = after
+        stmt = stmt.where(
+            or_(Product.name > name, and_(Product.name == name, Product.id > pid))
+        )
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+    rows = db.exec(stmt).all()
     # Older SQLModel/SQLAlchemy can return rows as tuples like (Product,)
     if rows and isinstance(rows[0], tuple):
         rows = [r[0] for r in rows]
-    return rows
-
+    next_key = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_key = (rows[-1].name, rows[-1].id)
+    return rows, next_key
 
-def create_product(db: Session, p: Product) -> Product:
-    db.add(p)
-    db.commit()
-    db.refresh(p)
-    return p
 
-
-def update_product(db: Session, pid: int, **kwargs) -> Product | None:
-    prod = db.get(Product, pid)
-    if not prod:
-        return None
-    for k, v in kwargs.items():
-        if v is not None:
-            setattr(prod, k, v)
-    db.add(prod)
-    db.commit()
-    db.refresh(prod)
-    return prod
+def count_products(db: Session, **filters) -> int:
+    return int(
+        db.exec(
+            select(func.count(Product.id)).where(*_product_filters(**filters))
+        ).one()
+    )
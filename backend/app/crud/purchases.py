@@ -1,15 +1,28 @@
-from sqlalchemy import func
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import and_, or_
 from sqlmodel import Session, select
+
+from ..models import Product, Purchase, PurchaseItem, Supplier
 from ..services.inventory import create_purchase
-from ..models import Purchase, PurchaseItem, Supplier, Product
+
 
 def create_purchase_tx(db: Session, supplier_id: int, items: list[dict]):
     return create_purchase(db, supplier_id, items)
 
-def list_purchases(db: Session) -> list[dict]:
+
+def list_purchases(
+    db: Session,
+    supplier_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    after: tuple[datetime, int] | None = None,
+    limit: int = 100,
+) -> tuple[list[dict], tuple[datetime, int] | None]:
     """
-    Returns rows shaped for PurchaseListOut:
+    One keyset page (newest first) of rows shaped for PurchaseListOut:
     {id, supplier_id, supplier_name, total, created_at, item_count, products}
+    plus the next page's (created_at, id) key, or None on the last page.
     """
     stmt = (
         select(
@@ -18,44 +31,69 @@ def list_purchases(db: Session) -> list[dict]:
             Supplier.name.label("supplier_name"),
             Purchase.total,
             Purchase.created_at,
-            func.count(PurchaseItem.id).label("item_count"),
         )
         .join(Supplier, Supplier.id == Purchase.supplier_id)
-        .outerjoin(PurchaseItem, PurchaseItem.purchase_id == Purchase.id)
-        .group_by(Purchase.id, Supplier.name)
-        .order_by(Purchase.created_at.desc())
-        .limit(100)
+        .order_by(Purchase.created_at.desc(), Purchase.id.desc())
+        .limit(limit + 1)
     )
+    if supplier_id is not None:
+        stmt = stmt.where(Purchase.supplier_id == supplier_id)
+    if date_from is not None:
+        stmt = stmt.where(Purchase.created_at >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        stmt = stmt.where(
+            Purchase.created_at
+            < datetime.combine(date_to + timedelta(days=1), time.min)
+        )
+    if after is not None:
+        ts, last_id = after
+        stmt = stmt.where(
+            or_(
+                Purchase.created_at < ts,
+                and_(Purchase.created_at == ts, Purchase.id < last_id),
+            )
+        )
     rows = db.exec(stmt).all()
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_key = (rows[-1].created_at, rows[-1].id)
 
-    # Get product information for each purchase
-    result = []
-    for r in rows:
-        # Get products for this purchase
-        products = []
-        if r.item_count > 0:
-            product_stmt = (
-                select(Product.name, PurchaseItem.qty, PurchaseItem.unit_cost, PurchaseItem.subtotal)
-                .join(PurchaseItem, PurchaseItem.product_id == Product.id)
-                .where(PurchaseItem.purchase_id == r.id)
+    # Item lines for the whole page in one query
+    products: dict[int, list[dict]] = {}
+    if rows:
+        item_rows = db.exec(
+            select(
+                PurchaseItem.purchase_id,
+                Product.name,
+                PurchaseItem.qty,
+                PurchaseItem.unit_cost,
+                PurchaseItem.subtotal,
+            )
+            .join(Product, Product.id == PurchaseItem.product_id)
+            .where(PurchaseItem.purchase_id.in_([r.id for r in rows]))
+            .order_by(PurchaseItem.id)
+        ).all()
+        for it in item_rows:
+            products.setdefault(it.purchase_id, []).append(
+                {
+                    "name": it.name,
+                    "qty": float(it.qty or 0),
+                    "unit_cost": float(it.unit_cost or 0),
+                    "subtotal": float(it.subtotal or 0),
+                }
             )
-            product_rows = db.exec(product_stmt).all()
-            for product_row in product_rows:
-                products.append({
-                    "name": product_row.name,
-                    "qty": float(product_row.qty or 0),
-                    "unit_cost": float(product_row.unit_cost or 0),
-                    "subtotal": float(product_row.subtotal or 0)
-                })
-
-        result.append({
+
+    result = [
+        {
             "id": r.id,
             "supplier_id": r.supplier_id,
             "supplier_name": r.supplier_name,
             "total": float(r.total or 0),
             "created_at": r.created_at.isoformat(),
-            "item_count": int(r.item_count or 0),
-            "products": products,
-        })
-
-    return result
+            "item_count": len(products.get(r.id, [])),
+            "products": products.get(r.id, []),
+        }
+        for r in rows
+    ]
+    return result, next_key
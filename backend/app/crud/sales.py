@@ -1,8 +1,7 @@
 from sqlmodel import Session
 
 from ..models import PaymentMethod
-from ..services.credits import record_credit_charge
-from ..services.inventory import create_sale
+from ..services.inventory import create_sale, create_sales_batch
 
 
 def create_sale_tx(
@@ -12,7 +11,9 @@ def create_sale_tx(
     items: list[dict],
     due_date=None,
 ):
-    sale = create_sale(db, employee_id, payment_method, items, due_date)
-    if payment_method == PaymentMethod.credit:
-        record_credit_charge(db, sale)
-    return sale
+    # create_sale records the credit charge in the sale's transaction
+    return create_sale(db, employee_id, payment_method, items, due_date)
+
+
+def create_sales_batch_tx(db: Session, payloads: list[dict]) -> list[dict]:
+    return create_sales_batch(db, payloads)
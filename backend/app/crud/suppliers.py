@@ -2,6 +2,7 @@ from typing import List
 
 from sqlmodel import Session, select
 
+from ..db import transactional
 from ..models import Supplier
 
 
@@ -9,8 +10,7 @@ def list_suppliers(db: Session) -> List[Supplier]:
     return list(db.exec(select(Supplier).order_by(Supplier.name.asc())))
 
 
+@transactional
 def create_supplier(db: Session, s: Supplier) -> Supplier:
     db.add(s)
-    db.commit()
-    db.refresh(s)
     return s
@@ -1,8 +1,13 @@
 from fastapi import Depends
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .db import get_session
+from .db import get_async_session, get_session
 
 
 def get_db(session: Session = Depends(get_session)) -> Session:
     return session
+
+
+def get_async_db(session: AsyncSession = Depends(get_async_session)) -> AsyncSession:
+    return session
@@ -0,0 +1,176 @@
+# app/manage.py
+"""Maintenance commands. Usage: python -m app.manage <command> [options]"""
+
+import argparse
+import sys
+from datetime import date, datetime
+
+from sqlmodel import Session
+
+from app import migrations
+from app.db import engine, init_db
+from app.seed import generate
+from app.services.credits import rebuild_credit_balances
+from app.services.sales_rollup import (
+    backfill_sales_rollup,
+    fold_deltas,
+    verify_sales_rollup,
+)
+from app.services.stock_ledger import rebuild_stock_ledger, take_snapshots
+
+
+def _credit_balances(db: Session, args: argparse.Namespace) -> int:
+    drift = rebuild_credit_balances(db, fix=not args.verify)
+    for d in drift:
+        print(
+            f"employee {d['employee_id']}: stored={d['stored_outstanding']} "
+            f"ledger={d['ledger_outstanding']}"
+        )
+    action = "found" if args.verify else "repaired"
+    print(f"{len(drift)} drifted balance(s) {action}")
+    return 1 if (drift and args.verify) else 0
+
+
+def _stock_ledger(db: Session, args: argparse.Namespace) -> int:
+    drift = rebuild_stock_ledger(db, fix=not args.verify)
+    for d in drift:
+        print(
+            f"product {d['product_id']}: stored={d['stored_qty']} ledger={d['ledger_qty']}"
+        )
+    action = "found" if args.verify else "repaired"
+    print(f"{len(drift)} drifted product(s) {action}")
+    return 1 if (drift and args.verify) else 0
+
+
+def _stock_snapshot(db: Session, args: argparse.Namespace) -> int:
+    written = take_snapshots(db, args.at)
+    print(f"{written} snapshot(s) written")
+    return 0
+
+
+def _sales_rollup(db: Session, args: argparse.Namespace) -> int:
+    if args.verify:
+        drift = verify_sales_rollup(db)
+        for d in drift:
+            print(
+                f"{d['day']} product {d['product_id']} {d['payment_method']}: "
+                f"stored={d['stored_qty']}/{d['stored_revenue']} "
+                f"expected={d['expected_qty']}/{d['expected_revenue']}"
+            )
+        print(f"{len(drift)} drifted rollup row(s) found")
+        return 1 if drift else 0
+    written = backfill_sales_rollup(db, args.date_from)
+    print(f"{written} rollup row(s) written")
+    return 0
+
+
+def _sales_fold(db: Session, args: argparse.Namespace) -> int:
+    folded = fold_deltas(db)
+    print(f"{folded} sales delta(s) folded into the rollup")
+    return 0
+
+
+def _migrate(db: Session, args: argparse.Namespace) -> int:
+    # init_db() below has already brought the schema to head
+    if args.message:
+        migrations.revision(engine, args.message)
+    return 0
+
+
+def _seed(db: Session, args: argparse.Namespace) -> int:
+    result = generate(db.get_bind(), scale=args.scale, seed=args.seed, days=args.days)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser(
+        "credit-balances",
+        help="Recompute per-employee credit balances from the ledger",
+    )
+    p.add_argument(
+        "--verify", action="store_true", help="Only report drift, don't write"
+    )
+    p.set_defaults(func=_credit_balances)
+
+    p = sub.add_parser(
+        "stock-ledger",
+        help="Check Product.stock_qty against the movement ledger; backfill or correct it",
+    )
+    p.add_argument(
+        "--verify", action="store_true", help="Only report drift, don't write"
+    )
+    p.set_defaults(func=_stock_ledger)
+
+    p = sub.add_parser(
+        "stock-snapshot",
+        help="Snapshot stock on hand for products that moved since their last snapshot (run from cron)",
+    )
+    p.add_argument(
+        "--at",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Snapshot time, naive UTC (default: a few minutes ago)",
+    )
+    p.set_defaults(func=_stock_snapshot)
+
+    p = sub.add_parser(
+        "sales-rollup",
+        help="Rebuild the daily sales rollup from the sale lines",
+    )
+    p.add_argument(
+        "--verify", action="store_true", help="Only report drift, don't write"
+    )
+    p.add_argument(
+        "--from",
+        dest="date_from",
+        type=date.fromisoformat,
+        default=None,
+        help="Only rebuild days from this date on (default: everything)",
+    )
+    p.set_defaults(func=_sales_rollup)
+
+    p = sub.add_parser(
+        "sales-fold",
+        help="Fold the per-sale rollup deltas into the daily rollup (run from cron)",
+    )
+    p.set_defaults(func=_sales_fold)
+
+    p = sub.add_parser(
+        "migrate",
+        help="Run the schema migrations (every command does this first)",
+    )
+    p.add_argument(
+        "-m",
+        "--message",
+        default=None,
+        help="Then autogenerate a new migration from the model changes",
+    )
+    p.set_defaults(func=_migrate)
+
+    p = sub.add_parser(
+        "seed",
+        help="Replace all data with a deterministic synthetic dataset",
+    )
+    p.add_argument(
+        "--scale",
+        type=int,
+        default=10,
+        help="Size multiplier; 1 = 100 products, 1000 sales (330 ~ 1M sale lines)",
+    )
+    p.add_argument("--seed", type=int, default=42, help="Random seed")
+    p.add_argument("--days", type=int, default=180, help="History window in days")
+    p.set_defaults(func=_seed)
+
+    args = parser.parse_args(argv)
+    init_db()
+    with Session(engine) as db:
+        return args.func(db, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# app/metrics.py
+"""
+In-process Prometheus metrics: per-route latency histogram, status counts,
+in-flight requests, and SQL statement count / DB time per request.
+
+Pure ASGI middleware plus SQLAlchemy cursor events; everything is a dict
+update under one lock, so it stays on in production. Exposed at /metrics.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+UNMATCHED = "<unmatched>"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests: dict[tuple, int] = {}  # (method, route, status) -> n
+        self.latency: dict[tuple, _Histogram] = {}  # (method, route) -> seconds
+        self.statements: dict[
+            tuple, _Histogram
+        ] = {}  # (method, route) -> statements/request
+        self.db_seconds: dict[tuple, float] = {}  # (method, route) -> total DB time
+        self.in_flight: dict[str, int] = {}  # route -> n
+
+    def reset(self) -> None:
+        with self.lock:
+            self.__init__()
+
+
+registry = _Registry()
+
+
+class _RequestStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[_RequestStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def current_request_stats() -> _RequestStats | None:
+    return _current.get()
+
+
+def instrument_engine(sync_engine) -> None:
+    """Count statements and DB time against the request running them."""
+
+    # One start time per connection, not a stack: a connection runs one
+    # statement at a time, and after_cursor_execute is skipped when it fails
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["_metrics_t0"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("_metrics_t0")
+        stats = _current.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += time.perf_counter() - started
+
+
+def _route_template(app, scope) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        route = _route_template(scope["app"], scope)
+        method = scope["method"]
+        stats = _RequestStats()
+        token = _current.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+        with registry.lock:
+            registry.in_flight[route] = registry.in_flight.get(route, 0) + 1
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Per-request DB cost so far, visible in browser devtools
+                message.setdefault("headers", []).append(
+                    (
+                        b"server-timing",
+                        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries"'.encode(),
+                    )
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            key = (method, route)
+            with registry.lock:
+                registry.in_flight[route] -= 1
+                rkey = (method, route, status_code)
+                registry.requests[rkey] = registry.requests.get(rkey, 0) + 1
+                registry.latency.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(
+                    elapsed
+                )
+                registry.statements.setdefault(
+                    key, _Histogram(STATEMENT_BUCKETS)
+                ).observe(stats.statements)
+                registry.db_seconds[key] = (
+                    registry.db_seconds.get(key, 0.0) + stats.db_seconds
+                )
+
+
+def _labels(**kw) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in kw.items()) + "}"
+
+
+def _histogram_lines(name: str, hist: _Histogram, **labels) -> list[str]:
+    lines, cumulative = [], 0
+    for bound, n in zip(hist.buckets, hist.counts):
+        cumulative += n
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {hist.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+    return lines
+
+
+def render() -> str:
+    """Prometheus text exposition format (0.0.4)."""
+    out: list[str] = []
+    with registry.lock:
+        out += [
+            "# HELP http_requests_total Requests by route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, code), n in sorted(registry.requests.items()):
+            out.append(
+                f"http_requests_total{_labels(method=method, route=route, status=code)} {n}"
+            )
+
+        out += [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        for route, n in sorted(registry.in_flight.items()):
+            out.append(f"http_requests_in_flight{_labels(route=route)} {n}")
+
+        out += [
+            "# HELP http_request_duration_seconds Request latency.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), h in sorted(registry.latency.items()):
+            out += _histogram_lines(
+                "http_request_duration_seconds", h, method=method, route=route
+            )
+
+        out += [
+            "# HELP http_request_db_statements SQL statements issued per request.",
+            "# TYPE http_request_db_statements histogram",
+        ]
+        for (method, route), h in sorted(registry.statements.items()):
+            out += _histogram_lines(
+                "http_request_db_statements", h, method=method, route=route
+            )
+
+        out += [
+            "# HELP http_request_db_seconds_total Time spent executing SQL.",
+            "# TYPE http_request_db_seconds_total counter",
+        ]
+        for (method, route), s in sorted(registry.db_seconds.items()):
+            out.append(
+                f"http_request_db_seconds_total{_labels(method=method, route=route)} {s}"
+            )
+    return "\n".join(out) + "\n"
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
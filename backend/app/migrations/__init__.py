@@ -0,0 +1,82 @@
+"""
+Versioned schema migrations (Alembic). `init_db()` runs them on startup;
+`python -m app.manage migrate` / `migration -m "..."` from a shell.
+"""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+# Schema as create_all() built it before migrations existed
+BASELINE = "0001"
+BASELINE_TABLES = {
+    "employee",
+    "product",
+    "supplier",
+    "purchase",
+    "purchaseitem",
+    "sale",
+    "saleitem",
+    "credittransaction",
+}
+
+# Serialises concurrent upgrades (several workers starting at once) on PostgreSQL
+_LOCK_ID = 0x5A1E5
+
+
+def config(engine: Engine) -> Config:
+    cfg = Config()
+    cfg.set_main_option("script_location", str(Path(__file__).parent))
+    cfg.attributes["engine"] = engine
+    return cfg
+
+
+def upgrade(engine: Engine, revision: str = "head") -> None:
+    """
+    Migrate to `revision`. A database created by create_all() (tables but
+    no alembic_version) is stamped at the baseline first, so only the
+    later migrations run against it. Stamping a partial schema would mark
+    it current without its tables, so that is refused.
+    """
+    cfg = config(engine)
+    with engine.connect() as conn:
+        # Session-level lock over the whole check, stamp and upgrade, so a
+        # second worker sees the first one's alembic_version instead of
+        # stamping the same database again
+        locked = conn.dialect.name == "postgresql"
+        if locked:
+            conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": _LOCK_ID})
+        try:
+            tables = set(inspect(conn).get_table_names())
+            conn.commit()
+            # env.py migrates on this connection, inside the lock
+            cfg.attributes["connection"] = conn
+            if tables & BASELINE_TABLES and "alembic_version" not in tables:
+                missing = BASELINE_TABLES - tables
+                if missing:
+                    raise RuntimeError(
+                        "Unversioned database lacks baseline tables "
+                        f"{sorted(missing)}; refusing to stamp it at revision "
+                        + BASELINE
+                    )
+                command.stamp(cfg, BASELINE)
+            command.upgrade(cfg, revision)
+        finally:
+            if locked:
+                conn.rollback()
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _LOCK_ID})
+                conn.commit()
+
+
+def revision(engine: Engine, message: str) -> None:
+    """
+    Autogenerate the next numbered migration from the difference between
+    the models and the (migrated) database. Review it before committing.
+    """
+    number = len(list((Path(__file__).parent / "versions").glob("[0-9]*.py"))) + 1
+    command.revision(
+        config(engine), message=message, autogenerate=True, rev_id=f"{number:04d}"
+    )
@@ -0,0 +1,30 @@
+from alembic import context
+from sqlmodel import SQLModel
+
+from app import models  # noqa: F401  (registers the tables on SQLModel.metadata)
+
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=SQLModel.metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+        user_module_prefix="sqlmodel.sql.sqltypes.",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # upgrade() passes the connection holding its advisory lock
+    connection = context.config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+    with context.config.attributes["engine"].connect() as connection:
+        _run(connection)
+
+
+if context.is_offline_mode():
+    raise RuntimeError("Offline (--sql) migrations are not supported")
+run_migrations_online()
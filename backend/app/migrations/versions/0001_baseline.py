@@ -0,0 +1,132 @@
+"""Baseline: the eight tables create_all() built before migrations existed.
+
+Databases created that way are stamped at this revision (see
+app.migrations.upgrade), so this only runs against empty databases. Every
+table added since has its own revision, which also backfills it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel  # noqa: F401
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "employee",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("phone", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "product",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("sku", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("unit", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("cost_price", sa.Float(), nullable=False),
+        sa.Column("stock_qty", sa.Float(), nullable=False),
+        sa.Column("reorder_level", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_product_sku", "product", ["sku"], unique=True)
+    op.create_table(
+        "supplier",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("phone", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "purchase",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("supplier_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["supplier_id"], ["supplier.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "sale",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column(
+            "payment_method",
+            sa.Enum("cash", "credit", name="paymentmethod"),
+            nullable=False,
+        ),
+        sa.Column("due_date", sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(["employee_id"], ["employee.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "credittransaction",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "type", sa.Enum("charge", "payment", name="credittype"), nullable=False
+        ),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("sale_id", sa.Integer(), nullable=True),
+        sa.Column("note", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.ForeignKeyConstraint(["employee_id"], ["employee.id"]),
+        sa.ForeignKeyConstraint(["sale_id"], ["sale.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "purchaseitem",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("purchase_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("qty", sa.Float(), nullable=False),
+        sa.Column("unit_cost", sa.Float(), nullable=False),
+        sa.Column("subtotal", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"]),
+        sa.ForeignKeyConstraint(["purchase_id"], ["purchase.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "saleitem",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sale_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("qty", sa.Float(), nullable=False),
+        sa.Column("unit_price", sa.Float(), nullable=False),
+        sa.Column("subtotal", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"]),
+        sa.ForeignKeyConstraint(["sale_id"], ["sale.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("saleitem")
+    op.drop_table("purchaseitem")
+    op.drop_table("credittransaction")
+    op.drop_table("sale")
+    op.drop_table("purchase")
+    op.drop_table("supplier")
+    op.drop_index("ix_product_sku", table_name="product")
+    op.drop_table("product")
+    op.drop_table("employee")
+    for name in ("paymentmethod", "credittype"):
+        sa.Enum(name=name).drop(op.get_bind(), checkfirst=True)  # PostgreSQL enum types
@@ -0,0 +1,89 @@
+"""Materialized credit balances, backfilled from the credit ledger.
+
+Payments lock and check this row, so every employee with ledger entries
+needs one before the new code serves them (otherwise their payments are
+refused as having no outstanding balance).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+credittransaction = sa.table(
+    "credittransaction",
+    sa.column("id", sa.Integer()),
+    sa.column("employee_id", sa.Integer()),
+    sa.column("type", sa.Enum("charge", "payment", name="credittype")),
+    sa.column("amount", sa.Float()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    creditbalance = op.create_table(
+        "creditbalance",
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("charges", sa.Float(), nullable=False),
+        sa.Column("payments", sa.Float(), nullable=False),
+        sa.Column("outstanding", sa.Float(), nullable=False),
+        sa.Column("last_txn_id", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["employee_id"], ["employee.id"]),
+        sa.ForeignKeyConstraint(["last_txn_id"], ["credittransaction.id"]),
+        sa.PrimaryKeyConstraint("employee_id"),
+    )
+
+    # Same totals and rounding as app.services.credits.rebuild_credit_balances
+    ct = credittransaction.c
+    ledger = (
+        op.get_bind()
+        .execute(
+            sa.select(
+                ct.employee_id,
+                sa.func.coalesce(
+                    sa.func.sum(sa.case((ct.type == "charge", ct.amount), else_=0.0)),
+                    0.0,
+                ),
+                sa.func.coalesce(
+                    sa.func.sum(sa.case((ct.type == "payment", ct.amount), else_=0.0)),
+                    0.0,
+                ),
+                sa.func.max(ct.id),
+            ).group_by(ct.employee_id)
+        )
+        .all()
+    )
+    now = datetime.utcnow()
+    rows = []
+    for employee_id, charges, payments, last_txn_id in ledger:
+        charges, payments = round(float(charges), 2), round(float(payments), 2)
+        rows.append(
+            {
+                "employee_id": employee_id,
+                "charges": charges,
+                "payments": payments,
+                "outstanding": round(charges - payments, 2),
+                "last_txn_id": last_txn_id,
+                "updated_at": now,
+            }
+        )
+    if rows:
+        op.bulk_insert(creditbalance, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("creditbalance")
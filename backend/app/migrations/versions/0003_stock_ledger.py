@@ -0,0 +1,89 @@
+"""Append-only stock ledger and its snapshots.
+
+The ledger starts now: every product with stock gets one opening movement
+at its current stock_qty, so ledger totals match the stored stock from the
+first request on.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+stockreason = sa.Enum(
+    "opening",
+    "purchase",
+    "purchase_edit",
+    "purchase_cancel",
+    "sale",
+    "adjustment",
+    name="stockreason",
+)
+
+product = sa.table(
+    "product",
+    sa.column("id", sa.Integer()),
+    sa.column("stock_qty", sa.Float()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    stockmovement = op.create_table(
+        "stockmovement",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("delta", sa.Float(), nullable=False),
+        sa.Column("reason", stockreason, nullable=False),
+        sa.Column("source_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_stockmovement_product_created",
+        "stockmovement",
+        ["product_id", "created_at"],
+    )
+    op.create_table(
+        "stocksnapshot",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("taken_at", sa.DateTime(), nullable=False),
+        sa.Column("qty", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"]),
+        sa.PrimaryKeyConstraint("product_id", "taken_at"),
+    )
+
+    # Opening movements, as app.services.stock_ledger.record_opening writes them
+    op.execute(
+        stockmovement.insert().from_select(
+            ["product_id", "delta", "reason", "source_id", "created_at"],
+            sa.select(
+                product.c.id,
+                product.c.stock_qty,
+                sa.literal("opening", stockreason),
+                sa.literal(None, sa.Integer()),
+                sa.literal(datetime.utcnow(), sa.DateTime()),
+            ).where(product.c.stock_qty != 0),
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("stocksnapshot")
+    op.drop_index("ix_stockmovement_product_created", table_name="stockmovement")
+    op.drop_table("stockmovement")
+    stockreason.drop(op.get_bind(), checkfirst=True)  # PostgreSQL enum type
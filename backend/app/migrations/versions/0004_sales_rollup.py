@@ -0,0 +1,103 @@
+"""Daily sales rollup and the per-sale deltas folded into it.
+
+The rollup is backfilled from the sale lines, like
+`python -m app.manage sales-rollup`: reports read only the rollup, so
+without it they would start empty. Historical cost uses today's
+cost_price, since sale lines don't record it.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Created with the sale table in 0001; PostgreSQL must not create it again
+paymentmethod = postgresql.ENUM(
+    "cash", "credit", name="paymentmethod", create_type=False
+)
+
+sale = sa.table(
+    "sale",
+    sa.column("id", sa.Integer()),
+    sa.column("created_at", sa.DateTime()),
+    sa.column("payment_method", paymentmethod),
+)
+saleitem = sa.table(
+    "saleitem",
+    sa.column("sale_id", sa.Integer()),
+    sa.column("product_id", sa.Integer()),
+    sa.column("qty", sa.Float()),
+    sa.column("subtotal", sa.Float()),
+)
+product = sa.table(
+    "product",
+    sa.column("id", sa.Integer()),
+    sa.column("cost_price", sa.Float()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dailysales = op.create_table(
+        "dailysales",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("payment_method", paymentmethod, nullable=False),
+        sa.Column("qty", sa.Float(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.Column("cost", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"]),
+        sa.PrimaryKeyConstraint("day", "product_id", "payment_method"),
+    )
+    op.create_table(
+        "salesdelta",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("payment_method", paymentmethod, nullable=False),
+        sa.Column("qty", sa.Float(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.Column("cost", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_salesdelta_day", "salesdelta", ["day"], unique=False)
+
+    # Same aggregate as app.services.sales_rollup.backfill_sales_rollup
+    day = sa.func.date(sale.c.created_at)
+    op.execute(
+        dailysales.insert().from_select(
+            ["day", "product_id", "payment_method", "qty", "revenue", "cost"],
+            sa.select(
+                day,
+                saleitem.c.product_id,
+                sale.c.payment_method,
+                sa.func.sum(saleitem.c.qty),
+                sa.func.sum(saleitem.c.subtotal),
+                sa.func.sum(saleitem.c.qty * product.c.cost_price),
+            )
+            .select_from(saleitem)
+            .join(sale, sale.c.id == saleitem.c.sale_id)
+            .join(product, product.c.id == saleitem.c.product_id)
+            .group_by(day, saleitem.c.product_id, sale.c.payment_method),
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_salesdelta_day", table_name="salesdelta")
+    op.drop_table("salesdelta")
+    op.drop_table("dailysales")
@@ -0,0 +1,72 @@
+"""Indexes for the foreign keys and orderings the hot queries filter on.
+
+Nothing was indexed beyond primary keys and sku, so line lookups by
+sale/purchase, credit history per employee, the keyset pages over
+purchases and payments, and the low-stock product list all scanned
+their tables. Plain CREATE INDEX: it blocks writes to the table while it
+builds (a few seconds for a million sale lines), so deploy off-hours.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name -> (table, columns)
+INDEXES = {
+    # Lines of a sale / purchase, and "is this product used anywhere"
+    "ix_saleitem_sale_id": ("saleitem", ["sale_id"]),
+    "ix_saleitem_product_id": ("saleitem", ["product_id"]),
+    "ix_purchaseitem_purchase_id": ("purchaseitem", ["purchase_id"]),
+    "ix_purchaseitem_product_id": ("purchaseitem", ["product_id"]),
+    # Charges and payments per employee (payment history's employee keyset)
+    "ix_credittransaction_employee_type": (
+        "credittransaction",
+        ["employee_id", "type"],
+    ),
+    # Payments in a date window (payment history with from/to)
+    "ix_credittransaction_type_created": (
+        "credittransaction",
+        ["type", "created_at", "id"],
+    ),
+    "ix_credittransaction_sale_id": ("credittransaction", ["sale_id"]),
+    # Sales per employee; date windows and (created_at, id) keysets
+    "ix_sale_employee_id": ("sale", ["employee_id"]),
+    "ix_sale_created_at": ("sale", ["created_at", "id"]),
+    "ix_purchase_created_at": ("purchase", ["created_at", "id"]),
+}
+
+# Partial index: only the (few) products at or below their reorder level,
+# in the (name, id) order of the product list's low_stock filter
+LOW_STOCK = sa.text("stock_qty <= reorder_level")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, (table, columns) in INDEXES.items():
+        op.create_index(name, table, columns)
+    op.create_index(
+        "ix_product_low_stock",
+        "product",
+        ["name", "id"],
+        postgresql_where=LOW_STOCK,
+        sqlite_where=LOW_STOCK,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_product_low_stock", table_name="product")
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table)
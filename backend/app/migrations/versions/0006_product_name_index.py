@@ -0,0 +1,31 @@
+"""Index the product list's (name, id) keyset order.
+
+Every /products/ page is a keyset over (name, id); only the partial
+low-stock index had that order, so unfiltered pages sorted the whole
+product table.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_product_name_id", "product", ["name", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_product_name_id", table_name="product")
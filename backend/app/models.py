@@ -2,6 +2,7 @@ from datetime import date, datetime
 from enum import Enum
 from typing import List, Optional
 
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -10,7 +11,24 @@ class PaymentMethod(str, Enum):
     credit = "credit"
 
 
+# Indexes are created by migrations (app/migrations); keep these in step,
+# test_migrations compares the two.
+_LOW_STOCK = text("stock_qty <= reorder_level")
+
+
 class Product(SQLModel, table=True):
+    __table_args__ = (
+        # The product list's (name, id) keyset order
+        Index("ix_product_name_id", "name", "id"),
+        # Partial: only products at or below their reorder level, in list order
+        Index(
+            "ix_product_low_stock",
+            "name",
+            "id",
+            postgresql_where=_LOW_STOCK,
+            sqlite_where=_LOW_STOCK,
+        ),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     sku: str = Field(index=True, unique=True)
@@ -40,6 +58,7 @@ class Employee(SQLModel, table=True):
 
 
 class Purchase(SQLModel, table=True):
+    __table_args__ = (Index("ix_purchase_created_at", "created_at", "id"),)
     id: Optional[int] = Field(default=None, primary_key=True)
     supplier_id: int = Field(foreign_key="supplier.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -51,8 +70,8 @@ class Purchase(SQLModel, table=True):
 
 class PurchaseItem(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    purchase_id: int = Field(foreign_key="purchase.id")
-    product_id: int = Field(foreign_key="product.id")
+    purchase_id: int = Field(foreign_key="purchase.id", index=True)
+    product_id: int = Field(foreign_key="product.id", index=True)
     qty: float
     unit_cost: float
     subtotal: float
@@ -62,8 +81,11 @@ class PurchaseItem(SQLModel, table=True):
 
 
 class Sale(SQLModel, table=True):
+    __table_args__ = (Index("ix_sale_created_at", "created_at", "id"),)
     id: Optional[int] = Field(default=None, primary_key=True)
-    employee_id: Optional[int] = Field(default=None, foreign_key="employee.id")
+    employee_id: Optional[int] = Field(
+        default=None, foreign_key="employee.id", index=True
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
     total: float = 0
     payment_method: PaymentMethod
@@ -75,8 +97,8 @@ class Sale(SQLModel, table=True):
 
 class SaleItem(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    sale_id: int = Field(foreign_key="sale.id")
-    product_id: int = Field(foreign_key="product.id")
+    sale_id: int = Field(foreign_key="sale.id", index=True)
+    product_id: int = Field(foreign_key="product.id", index=True)
     qty: float
     unit_price: float
     subtotal: float
@@ -85,18 +107,110 @@ class SaleItem(SQLModel, table=True):
     product: Optional[Product] = Relationship(back_populates="sale_items")
 
 
+class DailySales(SQLModel, table=True):
+    """Sales rollup per UTC day, product and payment method.
+
+    Reports read it (plus the SalesDelta rows not folded in yet) instead of
+    re-aggregating SaleItem. Cost is at the product's cost_price when sold;
+    `python -m app.manage sales-rollup` rebuilds it from history.
+    """
+
+    day: date = Field(primary_key=True)
+    product_id: int = Field(foreign_key="product.id", primary_key=True)
+    payment_method: PaymentMethod = Field(primary_key=True)
+    qty: float = 0
+    revenue: float = 0
+    cost: float = 0
+
+
+class SalesDelta(SQLModel, table=True):
+    """One sale's additions to DailySales, appended in the sale's transaction.
+
+    A plain insert takes no lock another sale waits for, unlike an upsert of
+    the shared rollup row; `python -m app.manage sales-fold` moves them into
+    DailySales.
+    """
+
+    __table_args__ = (Index("ix_salesdelta_day", "day"),)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    day: date
+    product_id: int = Field(foreign_key="product.id")
+    payment_method: PaymentMethod
+    qty: float = 0
+    revenue: float = 0
+    cost: float = 0
+
+
 class CreditType(str, Enum):
     charge = "charge"
     payment = "payment"
 
 
 class CreditTransaction(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_credittransaction_employee_type", "employee_id", "type"),
+        Index("ix_credittransaction_type_created", "type", "created_at", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     employee_id: int = Field(foreign_key="employee.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     type: CreditType
     amount: float
-    sale_id: Optional[int] = Field(default=None, foreign_key="sale.id")
+    sale_id: Optional[int] = Field(default=None, foreign_key="sale.id", index=True)
     note: Optional[str] = None
 
     employee: Optional[Employee] = Relationship(back_populates="credit_txns")
+
+
+class CreditBalance(SQLModel, table=True):
+    """Materialized per-employee view of the credit ledger.
+
+    Maintained in the same transaction as every CreditTransaction insert;
+    `python -m app.manage credit-balances` rebuilds it from the ledger.
+    """
+
+    employee_id: int = Field(foreign_key="employee.id", primary_key=True)
+    charges: float = 0
+    payments: float = 0
+    outstanding: float = 0
+    last_txn_id: Optional[int] = Field(default=None, foreign_key="credittransaction.id")
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class StockReason(str, Enum):
+    opening = "opening"  # stock a product was created or imported with
+    purchase = "purchase"
+    purchase_edit = "purchase_edit"
+    purchase_cancel = "purchase_cancel"
+    sale = "sale"
+    adjustment = "adjustment"  # manual edits and ledger corrections
+
+
+class StockMovement(SQLModel, table=True):
+    """Append-only stock ledger: one row per change to Product.stock_qty.
+
+    Written in the same transaction as the change itself; source_id is the
+    purchase or sale id for those reasons.
+    """
+
+    __table_args__ = (
+        Index("ix_stockmovement_product_created", "product_id", "created_at"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    product_id: int = Field(foreign_key="product.id")
+    delta: float
+    reason: StockReason
+    source_id: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class StockSnapshot(SQLModel, table=True):
+    """Stock on hand per product at `taken_at`, folded from the ledger.
+
+    Point-in-time reads start from the latest snapshot and add only the
+    movements after it; `python -m app.manage stock-snapshot` takes them.
+    """
+
+    product_id: int = Field(foreign_key="product.id", primary_key=True)
+    taken_at: datetime = Field(primary_key=True)
+    qty: float
@@ -1,32 +1,42 @@
 # backend/app/routers/credits.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, func
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import TypeAdapter
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..deps import get_db
-from ..schemas import CreditPaymentIn, CreditSummary, PaymentHistory
-from ..models import CreditTransaction, CreditType
 from ..crud import credits as crud  # <- import your credits CRUD helpers
+from ..db import unit_of_work
+from ..deps import get_async_db, get_db
+from ..models import CreditTransaction, CreditType
+from ..schemas import CreditPaymentIn, CreditSummary, PaymentHistory
+from ..services.credits import apply_to_balance, locked_balance
+from ..utils import decode_cursor, encode_cursor, json_response
 
 router = APIRouter(prefix="/credits", tags=["credits"])
 
+_summary_list = TypeAdapter(list[CreditSummary])
+_history_list = TypeAdapter(list[PaymentHistory])
+
 
 @router.get("/summary", response_model=list[CreditSummary])
-def summary(db: Session = Depends(get_db)):
-    data = crud.summary(db)
+async def summary(db: AsyncSession = Depends(get_async_db)):
+    data = await db.run_sync(crud.summary)
     # Clamp negative balances to 0.0 for display/business rule
     for d in data:
         try:
             d["balance"] = max(float(d.get("balance", 0.0)), 0.0)
         except Exception:
             d["balance"] = 0.0
-    return [CreditSummary(**d) for d in data]
+    return json_response(_summary_list, data)
 
 
 @router.get("/{employee_id}/balance", response_model=float)
-def employee_balance(employee_id: int, db: Session = Depends(get_db)):
+async def employee_balance(employee_id: int, db: AsyncSession = Depends(get_async_db)):
     # Same rule: never report negative (no outstanding)
     try:
-        bal = float(crud.employee_balance(db, employee_id))
+        bal = float(await db.run_sync(crud.employee_balance, employee_id))
     except Exception:
         bal = 0.0
     return max(bal, 0.0)
@@ -34,58 +44,36 @@ def employee_balance(employee_id: int, db: Session = Depends(get_db)):
 
 # backend/app/routers/credits.py
 
+
 @router.post("/{employee_id}/payments")
-def add_payment(employee_id: int, payload: CreditPaymentIn, db: Session = Depends(get_db)):
-    # Robust sum helper across SA versions and result shapes
-    def sum_amount(emp_id: int, t_value: str) -> float:
-        stmt = select(func.coalesce(func.sum(CreditTransaction.amount), 0.0)).where(
-            CreditTransaction.employee_id == emp_id,
-            # compare to the stored string value to avoid enum binding quirks
-            CreditTransaction.type == t_value,
-        )
-        try:
-            res = db.exec(stmt)
-            row = res.first()
-            # row may be a scalar, a Row, or a 1-tuple depending on SA/SQLModel
-            if row is None:
-                return 0.0
-            if isinstance(row, tuple):
-                return float(row[0] or 0.0)
-            # Row or plain scalar
-            try:
-                # SQLAlchemy Row supports ._mapping / tuple-like access
-                return float(row[0] if hasattr(row, "__getitem__") else (row or 0.0))
-            except Exception:
-                return float(row or 0.0)
-        except Exception as e:
-            # Last-resort guard: do not 500 on aggregation reads
-            print(f"[credits.add_payment] sum_amount error: {e}")
-            return 0.0
-
-    total_charges = sum_amount(employee_id, CreditType.charge.value)
-    total_payments = sum_amount(employee_id, CreditType.payment.value)
-    outstanding = total_charges - total_payments
-
-    if outstanding <= 0:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="No outstanding balance for this employee.",
-        )
-    if payload.amount > outstanding:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Payment exceeds outstanding balance. Remaining: {outstanding:.2f}",
-        )
+def add_payment(
+    employee_id: int, payload: CreditPaymentIn, db: Session = Depends(get_db)
+):
+    with unit_of_work(db):
+        # Lock the materialized balance row so concurrent payments can't overdraw it
+        bal = locked_balance(db, employee_id)
+        outstanding = round(bal.outstanding or 0.0, 2)
 
-    txn = CreditTransaction(
-        employee_id=employee_id,
-        type=CreditType.payment,
-        amount=payload.amount,
-        note=payload.note,
-    )
-    db.add(txn)
-    db.commit()
-    db.refresh(txn)
+        if outstanding <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="No outstanding balance for this employee.",
+            )
+        if payload.amount > outstanding:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Payment exceeds outstanding balance. Remaining: {outstanding:.2f}",
+            )
+
+        txn = CreditTransaction(
+            employee_id=employee_id,
+            type=CreditType.payment,
+            amount=payload.amount,
+            note=payload.note,
+        )
+        db.add(txn)
+        db.flush()
+        apply_to_balance(db, txn)
 
     return {
         "id": txn.id,
@@ -95,6 +83,25 @@ def add_payment(employee_id: int, payload: CreditPaymentIn, db: Session = Depend
 
 
 @router.get("/payment-history", response_model=list[PaymentHistory])
-def payment_history_endpoint(db: Session = Depends(get_db)):
-    data = crud.payment_history_crud(db)
-    return [PaymentHistory(**d) for d in data]
+async def payment_history_endpoint(
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+    employee_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Keyset page over paying employees; the next page's cursor goes in X-Next-Cursor
+    after = decode_cursor(cursor, int)[0] if cursor else None
+    data, next_key = await db.run_sync(
+        crud.payment_history_crud,
+        date_from=date_from,
+        date_to=date_to,
+        employee_id=employee_id,
+        after=after,
+        limit=limit,
+    )
+    headers = (
+        {"X-Next-Cursor": encode_cursor(next_key)} if next_key is not None else None
+    )
+    return json_response(_history_list, data, headers)
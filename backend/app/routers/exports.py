@@ -0,0 +1,40 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from ..services.exports import export_statement, stream_export
+from ..utils import ensure
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+@router.get("/{kind}")
+async def export(
+    kind: Literal["sales", "purchases", "credit-transactions", "stock"],
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+    format: Literal["csv", "ndjson"] = "csv",
+):
+    # Streamed straight from a server-side cursor: constant memory, and the
+    # response starts before the query has finished
+    if kind == "stock":
+        ensure(
+            date_from is None and date_to is None,
+            "The stock export is a current snapshot; it takes no date range",
+        )
+    ensure(
+        date_from is None or date_to is None or date_from <= date_to,
+        "'from' must not be after 'to'",
+    )
+    stmt = export_statement(kind, date_from, date_to)
+    period = "_".join(d.isoformat() for d in (date_from, date_to) if d) or "all"
+    filename = f"{kind}-{period}.{format}"
+    return StreamingResponse(
+        stream_export(stmt, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,8 +1,51 @@
 # app/routers/health.py
-from fastapi import APIRouter
+import asyncio
+import time
+
+from fastapi import APIRouter, Response, status
+from sqlalchemy import text
+
+from app.db import async_engine, engine, pool_stats
 
 router = APIRouter(tags=["health"])
 
+
 @router.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+def _saturated(stats: dict) -> bool:
+    # Every connection is out and callers are already queueing for one
+    return (
+        "capacity" in stats
+        and stats["checkedout"] >= stats["capacity"]
+        and stats["waiting"] > 0
+    )
+
+
+@router.get("/health/db")
+async def health_db(response: Response):
+    """Readiness: live pool stats plus a DB round trip; 503 when we should shed load."""
+    pools = {
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(async_engine.pool),
+    }
+    body = {"status": "ok", "db_latency_ms": None, "pools": pools}
+
+    if any(_saturated(p) for p in pools.values()):
+        body["status"] = "saturated"
+    else:
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(2):
+                async with async_engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            body["db_latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        except Exception as e:
+            body["status"] = "unavailable"
+            body["error"] = type(e).__name__
+
+    if body["status"] != "ok":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return body
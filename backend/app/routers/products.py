@@ -1,29 +1,122 @@
 # app/routers/products.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from typing import Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
 from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
 
-from ..deps import get_db
-from .. import schemas
-from ..models import Product
-from app.db import SessionDep
+from app.db import AsyncSessionDep, SessionDep, on_commit, unit_of_work
 from app.schemas import ProductOut, ProductUpdate
+from app.services import catalogue, dashboard
+from app.services.product_import import import_products, parse_csv, parse_ndjson
+from app.services.stock_ledger import forget_product, movements_for, record_movements
+from app.utils import decode_cursor, encode_cursor, ensure, json_response, normalize_sku
+
+from .. import schemas
+from ..crud import products as crud
+from ..deps import get_db
+from ..models import Product, StockReason
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+_product_list = TypeAdapter(list[ProductOut])
+_import_report = TypeAdapter(schemas.ProductImportOut)
+
+
 @router.get("/", response_model=list[ProductOut])
-def list_products(db: SessionDep):
-    # Works with SQLModel 0.0.16+: exec(select(...)) returns an iterable
-    return list(db.exec(select(Product)))
+async def list_products(
+    db: AsyncSessionDep,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=1000),
+    low_stock: bool = False,
+    unit: str | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    include_total: bool = False,
+    if_none_match: str | None = Header(None),
+):
+    # Without cursor/limit this is the full catalogue (small installs);
+    # otherwise a keyset page on (name, id) with X-Next-Cursor for the next one.
+    # Rendered pages are cached per catalogue version: an unchanged poll with
+    # If-None-Match gets a 304 without touching the database.
+    key = (cursor, limit, low_stock, unit, min_price, max_price, include_total)
+    entry = catalogue.lookup(key)
+    if entry is None:
+        seen_version = catalogue.version()
+        filters = dict(
+            low_stock_only=low_stock,
+            unit=unit,
+            min_price=min_price,
+            max_price=max_price,
+        )
+        if cursor is not None and limit is None:
+            limit = 100
+        after = decode_cursor(cursor, str, int) if cursor else None
+        rows, next_key = await db.run_sync(
+            crud.list_products, after=after, limit=limit, **filters
+        )
+        headers = {}
+        if next_key is not None:
+            headers["X-Next-Cursor"] = encode_cursor(*next_key)
+        if include_total:
+            total = await db.run_sync(crud.count_products, **filters)
+            headers["X-Total-Count"] = str(total)
+        entry = catalogue.store(
+            key, seen_version, _product_list.dump_json(rows), headers
+        )
+
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+    if catalogue.etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 
 @router.post("/", response_model=schemas.ProductOut, status_code=201)
 def create_product(payload: schemas.ProductCreate, db: Session = Depends(get_db)):
     p = Product(**payload.model_dump())
-    db.add(p)
-    db.commit()
-    db.refresh(p)
+    with unit_of_work(db):
+        db.add(p)
+        db.flush()
+        record_movements(db, movements_for({p.id: p.stock_qty}, StockReason.opening))
+        on_commit(db, dashboard.invalidate)
+        on_commit(db, catalogue.bump)
     return schemas.ProductOut.model_validate(p)
 
+
+@router.post("/import", response_model=schemas.ProductImportOut)
+async def import_products_endpoint(
+    request: Request,
+    db: Session = Depends(get_db),
+    format: Literal["csv", "ndjson"] | None = None,
+    errors_only: bool = False,
+):
+    # CSV (header row) or JSON lines, chosen by ?format= or the Content-Type.
+    # Upserts by normalised SKU in batched INSERT ... ON CONFLICT statements.
+    if format is None:
+        ctype = request.headers.get("content-type", "")
+        format = "ndjson" if "json" in ctype else "csv"
+    text = (await request.body()).decode("utf-8-sig")
+    ensure(text.strip() != "", "Empty import")
+    records = parse_ndjson(text) if format == "ndjson" else parse_csv(text)
+    result = await run_in_threadpool(import_products, db, records)
+    if errors_only:
+        result["rows"] = [
+            r for r in result["rows"] if r["status"] in ("error", "skipped")
+        ]
+    return json_response(_import_report, result)
+
+
 @router.patch("/{product_id}", response_model=ProductOut)
 def update_product(product_id: int, payload: ProductUpdate, db: SessionDep):
     prod = db.get(Product, product_id)
@@ -32,13 +125,13 @@ def update_product(product_id: int, payload: ProductUpdate, db: SessionDep):
 
     # Pydantic v2 uses model_dump; v1 uses dict
     try:
-        data = payload.model_dump(exclude_unset=True)      # v2
-    except AttributeError:                                 # v1
+        data = payload.model_dump(exclude_unset=True)  # v2
+    except AttributeError:  # v1
         data = payload.dict(exclude_unset=True)
 
     # Handle SKU change explicitly with uniqueness check
     if "sku" in data and data["sku"] is not None:
-        new_sku = data["sku"].strip().upper()
+        new_sku = normalize_sku(data["sku"])
         if new_sku != prod.sku:
             exists = db.exec(
                 select(Product).where(Product.sku == new_sku, Product.id != product_id)
@@ -49,19 +142,28 @@ def update_product(product_id: int, payload: ProductUpdate, db: SessionDep):
         # remove so we don't double-apply below
         del data["sku"]
 
-    # Apply the rest of the fields
+    # Apply the rest of the fields; a stock edit is booked as an adjustment
+    delta = (
+        (data.get("stock_qty") or 0.0) - (prod.stock_qty or 0.0)
+        if "stock_qty" in data
+        else 0.0
+    )
     for k, v in data.items():
         setattr(prod, k, v)
 
     try:
-        db.add(prod)
-        db.commit()
+        with unit_of_work(db):
+            db.add(prod)
+            record_movements(
+                db, movements_for({prod.id: delta}, StockReason.adjustment)
+            )
+            on_commit(db, dashboard.invalidate)
+            on_commit(db, catalogue.bump)
     except IntegrityError:
-        db.rollback()
         raise HTTPException(status_code=409, detail="Constraint error while saving")
-    db.refresh(prod)
     return prod
 
+
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_product(product_id: int, db: SessionDep):
     prod = db.get(Product, product_id)
@@ -69,13 +171,15 @@ def delete_product(product_id: int, db: SessionDep):
         raise HTTPException(status_code=404, detail="Product not found")
 
     try:
-        db.delete(prod)
-        db.commit()
+        with unit_of_work(db):
+            forget_product(db, product_id)
+            db.delete(prod)
+            on_commit(db, dashboard.invalidate)
+            on_commit(db, catalogue.bump)
     except IntegrityError:
-        db.rollback()
         # If your DB has FK constraints to purchases/sales, surface a clear message
         raise HTTPException(
             status_code=409,
             detail="Cannot delete: product is referenced by purchases or sales.",
         )
-    return None
\ No newline at end of file
+    return None
@@ -1,22 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date, datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import TypeAdapter
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .. import schemas
-from ..crud.purchases import create_purchase_tx, list_purchases as list_purchases_crud
-from ..deps import get_db
-
-from ..models import Purchase, PurchaseItem, Product, Supplier
-from ..services.inventory import create_purchase as create_purchase_svc
+from ..crud.purchases import create_purchase_tx
+from ..crud.purchases import list_purchases as list_purchases_crud
+from ..db import unit_of_work
+from ..deps import get_async_db, get_db
+from ..models import Product, Purchase, PurchaseItem, Supplier
 from ..services.inventory import cancel_purchase as cancel_purchase_svc
+from ..services.inventory import create_purchase as create_purchase_svc
 from ..services.inventory import update_purchase as update_purchase_svc
+from ..utils import decode_cursor, encode_cursor, json_response
 
 router = APIRouter(prefix="/purchases", tags=["purchases"])
 
+_purchase_list = TypeAdapter(list[schemas.PurchaseListOut])
+
 
 @router.get("/", response_model=list[schemas.PurchaseListOut])
-def list_purchases(db: Session = Depends(get_db)):
-    data = list_purchases_crud(db)
-    return [schemas.PurchaseListOut(**row) for row in data]
+async def list_purchases(
+    supplier_id: int | None = None,
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    after = decode_cursor(cursor, datetime, int) if cursor else None
+    data, next_key = await db.run_sync(
+        list_purchases_crud,
+        supplier_id=supplier_id,
+        date_from=date_from,
+        date_to=date_to,
+        after=after,
+        limit=limit,
+    )
+    headers = (
+        {"X-Next-Cursor": encode_cursor(*next_key)} if next_key is not None else None
+    )
+    return json_response(_purchase_list, data, headers)
 
 
 @router.post("/", response_model=schemas.PurchaseOut, status_code=201)
@@ -27,19 +53,27 @@ def create_purchase(payload: schemas.PurchaseCreate, db: Session = Depends(get_d
     return schemas.PurchaseOut.model_validate(p)
 
     # Add edit and cancel Purchases
+
+
 @router.post("/", response_model=schemas.PurchaseOut, status_code=201)
 def create_purchase(payload: schemas.PurchaseCreate, db: Session = Depends(get_db)):
-    p = create_purchase_svc(db, payload.supplier_id, [i.model_dump() for i in payload.items])
+    with unit_of_work(db):
+        p = create_purchase_svc(
+            db, payload.supplier_id, [i.model_dump() for i in payload.items]
+        )
     return schemas.PurchaseOut.model_validate(p)
 
+
 @router.get("/{purchase_id}", response_model=schemas.PurchaseDetailOut)
 def get_purchase(purchase_id: int, db: Session = Depends(get_db)):
     p = db.get(Purchase, purchase_id)
     if not p:
         raise HTTPException(status_code=404, detail="Purchase not found")
-    items = db.exec(select(PurchaseItem, Product.name)
-                    .join(Product, Product.id == PurchaseItem.product_id)
-                    .where(PurchaseItem.purchase_id == purchase_id)).all()
+    items = db.exec(
+        select(PurchaseItem, Product.name)
+        .join(Product, Product.id == PurchaseItem.product_id)
+        .where(PurchaseItem.purchase_id == purchase_id)
+    ).all()
     return schemas.PurchaseDetailOut(
         id=p.id,
         supplier_id=p.supplier_id,
@@ -58,19 +92,25 @@ def get_purchase(purchase_id: int, db: Session = Depends(get_db)):
         ],
     )
 
+
 @router.patch("/{purchase_id}", response_model=schemas.PurchaseOut)
-def update_purchase(purchase_id: int, payload: schemas.PurchaseUpdate, db: Session = Depends(get_db)):
-    p = update_purchase_svc(
-        db,
-        purchase_id,
-        payload.supplier_id,
-        None if payload.items is None else [i.model_dump() for i in payload.items],
-    )
+def update_purchase(
+    purchase_id: int, payload: schemas.PurchaseUpdate, db: Session = Depends(get_db)
+):
+    with unit_of_work(db):
+        p = update_purchase_svc(
+            db,
+            purchase_id,
+            payload.supplier_id,
+            None if payload.items is None else [i.model_dump() for i in payload.items],
+        )
     return schemas.PurchaseOut.model_validate(p)
 
+
 @router.delete("/{purchase_id}", status_code=status.HTTP_204_NO_CONTENT)
 def cancel_purchase(purchase_id: int, db: Session = Depends(get_db)):
-    ok = cancel_purchase_svc(db, purchase_id)
+    with unit_of_work(db):
+        ok = cancel_purchase_svc(db, purchase_id)
     if not ok:
         raise HTTPException(status_code=404, detail="Purchase not found")
     return None
@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+from typing import Literal
+
+from fastapi import APIRouter, Query
+from pydantic import TypeAdapter
+
+from ..db import AsyncSessionDep
+from ..models import PaymentMethod
+from ..schemas import ReorderLine, SalesPeriod, TopProduct
+from ..services import reorder
+from ..services.sales_rollup import sales_by_period, top_products
+from ..utils import ensure, json_response
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+_periods = TypeAdapter(list[SalesPeriod])
+_top = TypeAdapter(list[TopProduct])
+_reorder = TypeAdapter(list[ReorderLine])
+
+DEFAULT_WINDOW = timedelta(days=30)
+
+
+def _window(date_from: date | None, date_to: date | None) -> tuple[date, date]:
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - DEFAULT_WINDOW + timedelta(days=1)
+    ensure(date_from <= date_to, "'from' must not be after 'to'")
+    return date_from, date_to
+
+
+@router.get("/sales", response_model=list[SalesPeriod])
+async def sales(
+    db: AsyncSessionDep,
+    period: Literal["day", "week", "month"] = "day",
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+    payment_method: PaymentMethod | None = None,
+):
+    # Totals per period over the window (default: the last 30 days),
+    # read from the daily rollup rather than the sale lines
+    date_from, date_to = _window(date_from, date_to)
+    data = await db.run_sync(
+        sales_by_period, date_from, date_to, period, payment_method
+    )
+    return json_response(_periods, data)
+
+
+@router.get("/top-products", response_model=list[TopProduct])
+async def top(
+    db: AsyncSessionDep,
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+    limit: int = Query(10, ge=1, le=100),
+    by: Literal["qty", "revenue"] = "qty",
+    payment_method: PaymentMethod | None = None,
+):
+    date_from, date_to = _window(date_from, date_to)
+    data = await db.run_sync(
+        top_products, date_from, date_to, limit, by, payment_method
+    )
+    return json_response(_top, data)
+
+
+@router.get("/reorder", response_model=list[ReorderLine])
+async def reorder_report(
+    db: AsyncSessionDep,
+    window_days: int = Query(reorder.DEFAULT_WINDOW_DAYS, ge=7, le=365),
+    lead_time_days: float = Query(reorder.DEFAULT_LEAD_TIME_DAYS, ge=0, le=180),
+    review_days: float = Query(reorder.DEFAULT_REVIEW_DAYS, ge=0, le=180),
+    service_level: float = Query(reorder.DEFAULT_SERVICE_LEVEL, ge=0.5, lt=1),
+    only_needed: bool = True,
+    limit: int = Query(100, ge=1, le=5000),
+):
+    # Shortest days of cover first, from each product's demand over the
+    # trailing window rather than its static reorder_level
+    data = await db.run_sync(
+        reorder.reorder_report,
+        window_days=window_days,
+        lead_time_days=lead_time_days,
+        review_days=review_days,
+        service_level=service_level,
+        only_needed=only_needed,
+        limit=limit,
+    )
+    return json_response(_reorder, data)
@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends
 from sqlmodel import Session
 
 from .. import schemas
-from ..crud.sales import create_sale_tx
+from ..crud.sales import create_sale_tx, create_sales_batch_tx
+from ..db import unit_of_work
 from ..deps import get_db
 
 router = APIRouter(prefix="/sales", tags=["sales"])
@@ -10,11 +11,27 @@ router = APIRouter(prefix="/sales", tags=["sales"])
 
 @router.post("/", response_model=schemas.SaleOut, status_code=201)
 def create_sale(payload: schemas.SaleCreate, db: Session = Depends(get_db)):
-    sale = create_sale_tx(
-        db,
-        payload.employee_id,
-        payload.payment_method,
-        [i.model_dump() for i in payload.items],
-        payload.due_date,
-    )
+    with unit_of_work(db):
+        sale = create_sale_tx(
+            db,
+            payload.employee_id,
+            payload.payment_method,
+            [i.model_dump() for i in payload.items],
+            payload.due_date,
+        )
     return schemas.SaleOut.model_validate(sale)
+
+
+@router.post("/batch", response_model=schemas.SaleBatchOut)
+def create_sales_batch(
+    payload: list[schemas.SaleCreate], db: Session = Depends(get_db)
+):
+    # Offline till sync: one transaction for the whole batch, per-sale outcome
+    with unit_of_work(db):
+        results = create_sales_batch_tx(db, [s.model_dump() for s in payload])
+    accepted = sum(1 for r in results if r["ok"])
+    return {
+        "accepted": accepted,
+        "rejected": len(results) - accepted,
+        "results": results,
+    }
@@ -0,0 +1,61 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from fastapi import APIRouter, Query
+from pydantic import TypeAdapter
+
+from ..db import AsyncSessionDep
+from ..schemas import StockLevel, StockMovementOut
+from ..services.stock_ledger import movement_history, stock_at
+from ..utils import decode_cursor, encode_cursor, ensure, json_response
+
+router = APIRouter(prefix="/stock", tags=["stock"])
+
+_levels = TypeAdapter(list[StockLevel])
+_movements = TypeAdapter(list[StockMovementOut])
+
+
+@router.get("/on-hand", response_model=list[StockLevel])
+async def on_hand(
+    db: AsyncSessionDep,
+    at: datetime | None = None,
+    on: date | None = None,
+    product_id: list[int] | None = Query(None),
+):
+    # Stock as of an instant (`at`), the close of a day (`on`), or now.
+    # Served from the latest snapshot plus the movements after it.
+    ensure(at is None or on is None, "Pass either 'at' or 'on', not both")
+    if on is not None:
+        at = datetime.combine(on + timedelta(days=1), time.min) - timedelta(
+            microseconds=1
+        )
+    elif at is None:
+        at = datetime.utcnow()
+    elif at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    data = await db.run_sync(stock_at, at, product_id)
+    return json_response(_levels, data)
+
+
+@router.get("/movements", response_model=list[StockMovementOut])
+async def movements(
+    db: AsyncSessionDep,
+    product_id: int | None = None,
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+    cursor: str | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+):
+    # Keyset page over the ledger, newest first; next cursor in X-Next-Cursor
+    after = decode_cursor(cursor, datetime, int) if cursor else None
+    rows, next_key = await db.run_sync(
+        movement_history,
+        product_id=product_id,
+        date_from=date_from,
+        date_to=date_to,
+        after=after,
+        limit=limit,
+    )
+    headers = (
+        {"X-Next-Cursor": encode_cursor(*next_key)} if next_key is not None else None
+    )
+    return json_response(_movements, rows, headers)
@@ -3,7 +3,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
-from .models import CreditType, PaymentMethod
+from .models import CreditType, PaymentMethod, StockReason
 
 
 class ProductCreate(BaseModel):
@@ -40,6 +40,71 @@ class ProductOut(BaseModel):
         from_attributes = True
 
 
+class ProductImportRow(BaseModel):
+    line: int
+    sku: Optional[str] = None
+    status: str  # inserted | updated | skipped | error
+    error: Optional[str] = None
+
+
+class ProductImportOut(BaseModel):
+    inserted: int
+    updated: int
+    skipped: int
+    error: int
+    rows: List[ProductImportRow]
+
+
+class StockLevel(BaseModel):
+    product_id: int
+    sku: str
+    name: str
+    qty: float
+
+
+class StockMovementOut(BaseModel):
+    id: int
+    product_id: int
+    delta: float
+    reason: StockReason
+    source_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SalesPeriod(BaseModel):
+    period: date
+    qty: float
+    revenue: float
+    cost: float
+    margin: float
+
+
+class TopProduct(BaseModel):
+    product_id: int
+    sku: str
+    name: str
+    qty: float
+    revenue: float
+    cost: float
+    margin: float
+
+
+class ReorderLine(BaseModel):
+    product_id: int
+    sku: str
+    name: str
+    stock_qty: float
+    reorder_level: float
+    velocity: float
+    daily_std: float
+    days_of_cover: Optional[float] = None  # None: no sales in the window
+    reorder_point: float
+    suggested_qty: float
+
+
 class SupplierCreate(BaseModel):
     name: str
     phone: Optional[str] = None
@@ -58,9 +123,10 @@ class EmployeeCreate(BaseModel):
     name: str
     phone: Optional[str] = None
 
+
 class EmployeeUpdate(BaseModel):
-   name: Optional[str] = None
-   phone: Optional[str] = None
+    name: Optional[str] = None
+    phone: Optional[str] = None
 
 
 class EmployeeOut(BaseModel):
@@ -129,6 +195,20 @@ class SaleOut(BaseModel):
         from_attributes = True
 
 
+class SaleBatchResult(BaseModel):
+    index: int
+    ok: bool
+    sale_id: Optional[int] = None
+    total: Optional[float] = None
+    error: Optional[str] = None
+
+
+class SaleBatchOut(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[SaleBatchResult]
+
+
 class CreditPaymentIn(BaseModel):
     amount: float = Field(gt=0)
     note: Optional[str] = None
@@ -172,6 +252,7 @@ class DashboardSummary(BaseModel):
     total_stock_value: float
     outstanding_credit: float
 
+
 # --- add below existing purchase schemas ---
 class PurchaseItemOut(BaseModel):
     product_id: int
@@ -180,6 +261,7 @@ class PurchaseItemOut(BaseModel):
     unit_cost: float
     subtotal: float
 
+
 class PurchaseDetailOut(BaseModel):
     id: int
     supplier_id: int
@@ -188,11 +270,13 @@ class PurchaseDetailOut(BaseModel):
     created_at: datetime
     items: list[PurchaseItemOut]
 
+
 class PurchaseItemUpdateIn(BaseModel):
     product_id: int
     qty: float
     unit_cost: float
 
+
 class PurchaseUpdate(BaseModel):
     supplier_id: int | None = None
     items: list[PurchaseItemUpdateIn] | None = None
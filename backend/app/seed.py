@@ -0,0 +1,536 @@
+# app/seed.py
+"""
+Dev data: the compact demo fixture and a scalable synthetic generator.
+
+`generate()` builds a reproducible dataset from a seed and a scale factor.
+SKU popularity is Zipfian, baskets hold several lines, and credit employees
+pay part of what they owe. Rows are bulk-loaded with COPY on PostgreSQL and
+with batched executemany INSERTs elsewhere. Ids are assigned here, so sale
+lines and ledger rows need no RETURNING round trips; credit balances are
+rebuilt from the ledger at the end, and the stock ledger (movements plus
+weekly snapshots) from the loaded lines.
+
+    python -m app.manage seed --scale 100 --seed 42
+    POST /dev/seed?scale=100&seed=42
+"""
+
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session, SQLModel
+
+from .db import on_commit, transactional
+from .models import (
+    CreditTransaction,
+    CreditType,
+    Employee,
+    PaymentMethod,
+    Product,
+    Purchase,
+    PurchaseItem,
+    Sale,
+    SaleItem,
+    Supplier,
+)
+from .services import catalogue, dashboard
+from .services.credits import rebuild_credit_balances
+from .services.sales_rollup import backfill_sales_rollup
+from .services.stock_ledger import rebuild_stock_ledger, take_snapshots
+
+# Rows per unit of scale; scale=330 gives roughly a million sale lines
+PER_SCALE = {
+    "products": 100,
+    "suppliers": 2,
+    "employees": 10,
+    "purchases": 40,
+    "sales": 1000,
+}
+ZIPF_S = 1.1  # SKU popularity exponent
+CREDIT_SHARE = 0.2  # fraction of sales put on an employee's tab
+BASKET_WEIGHTS = [30, 25, 18, 10, 7, 5, 3, 2]  # P(basket of 1..8 lines)
+UNITS = ["unit", "bag", "bottle", "packet", "box", "jar", "pack", "can"]
+CHUNK = 50_000
+SNAPSHOT_EVERY = timedelta(days=7)  # stock snapshots across the generated history
+
+
+def wipe(conn: Connection) -> None:
+    """Empty every table. PostgreSQL also restarts the id sequences."""
+    tables = SQLModel.metadata.sorted_tables
+    if conn.dialect.name == "postgresql":
+        names = ", ".join(f'"{t.name}"' for t in tables)
+        conn.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+    else:
+        for t in reversed(tables):
+            conn.execute(t.delete())
+
+
+def _copy_rows(conn: Connection, table, columns, rows) -> None:
+    cols = ", ".join(columns)
+    with conn.connection.driver_connection.cursor() as cur:
+        with cur.copy(f'COPY "{table.name}" ({cols}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def _insert_rows(conn: Connection, table, columns, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(dict(zip(columns, row)))
+        if len(batch) >= CHUNK:
+            conn.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+
+
+def _loader(conn: Connection):
+    return _copy_rows if conn.dialect.name == "postgresql" else _insert_rows
+
+
+@contextmanager
+def _foreign_keys_deferred(conn: Connection) -> Iterator[None]:
+    """
+    PostgreSQL: drop FK constraints for the load and re-add them afterwards,
+    so each is validated in one set-based pass instead of a trigger per row.
+    """
+    if conn.dialect.name != "postgresql":
+        yield
+        return
+    fks = conn.execute(
+        text(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) "
+            "FROM pg_constraint WHERE contype = 'f' AND connamespace = current_schema()::regnamespace"
+        )
+    ).all()
+    for table, name, _ in fks:
+        conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+    yield
+    for table, name, definition in fks:
+        conn.execute(text(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'))
+
+
+def _reset_sequences(conn: Connection) -> None:
+    """Move serial sequences past the explicit ids we loaded."""
+    if conn.dialect.name != "postgresql":
+        return
+    for t in SQLModel.metadata.sorted_tables:
+        if "id" in t.c and t.c.id.primary_key and t.c.id.autoincrement:
+            conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{t.name}\"', 'id'), "
+                    f'COALESCE((SELECT MAX(id) FROM "{t.name}"), 0) + 1, false)'
+                )
+            )
+
+
+@transactional
+def seed_demo(db: Session) -> dict:
+    """The small hand-written fixture the UI demo relies on (low-stock items, two debtors)."""
+    wipe(db.connection())
+
+    db.add_all(
+        [
+            Supplier(name="ABC Wholesale", phone="+264-61-000-000"),
+            Supplier(name="Namibia Foods Ltd", phone="+264-61-111-111"),
+            Supplier(name="Namib Mills", phone="+264-61-222-333"),
+        ]
+    )
+    e1 = Employee(name="Petrus Shilongo", phone="+264-81-123-4567")
+    e2 = Employee(name="Maria Andreas", phone="+264-81-234-5678")
+    e3 = Employee(name="John Smith", phone="+264-81-345-6789")
+    db.add_all([e1, e2, e3])
+
+    products_data = [
+        {
+            "name": "Rice 1kg",
+            "sku": "RICE-1KG",
+            "unit": "bag",
+            "price": 35.0,
+            "cost_price": 25.0,
+            "stock_qty": 100,
+            "reorder_level": 20,
+        },
+        {
+            "name": "Sugar 1kg",
+            "sku": "SUGAR-1KG",
+            "unit": "bag",
+            "price": 25.0,
+            "cost_price": 18.0,
+            "stock_qty": 75,
+            "reorder_level": 15,
+        },
+        {
+            "name": "Cooking Oil 2L",
+            "sku": "OIL-2L",
+            "unit": "bottle",
+            "price": 45.0,
+            "cost_price": 35.0,
+            "stock_qty": 60,
+            "reorder_level": 12,
+        },
+        {
+            "name": "Flour 2kg",
+            "sku": "FLOUR-2KG",
+            "unit": "bag",
+            "price": 40.0,
+            "cost_price": 30.0,
+            "stock_qty": 5,
+            "reorder_level": 10,
+        },  # low
+        {
+            "name": "Salt 500g",
+            "sku": "SALT-500G",
+            "unit": "packet",
+            "price": 12.0,
+            "cost_price": 8.0,
+            "stock_qty": 3,
+            "reorder_level": 8,
+        },  # low
+        {
+            "name": "Tea Bags 100pk",
+            "sku": "TEA-100",
+            "unit": "pack",
+            "price": 55.0,
+            "cost_price": 42.0,
+            "stock_qty": 2,
+            "reorder_level": 6,
+        },  # low
+        {
+            "name": "Coffee 500g",
+            "sku": "COFFEE-500",
+            "unit": "jar",
+            "price": 85.0,
+            "cost_price": 65.0,
+            "stock_qty": 1,
+            "reorder_level": 5,
+        },  # very low
+        {
+            "name": "Baking Powder 100g",
+            "sku": "BAKE-100",
+            "unit": "box",
+            "price": 18.0,
+            "cost_price": 12.0,
+            "stock_qty": 0,
+            "reorder_level": 3,
+        },  # out
+    ]
+    prods = [Product(**p) for p in products_data]
+    db.add_all(prods)
+
+    # Credit sales history (doesn't mutate stock in seed to keep low-stock demo values)
+    now = datetime.utcnow()
+    sale1 = Sale(
+        employee=e1,
+        payment_method=PaymentMethod.credit,
+        total=150.0,
+        created_at=now - timedelta(days=7),
+    )
+    sale2 = Sale(
+        employee=e2,
+        payment_method=PaymentMethod.credit,
+        total=85.0,
+        created_at=now - timedelta(days=3),
+    )
+    db.add_all(
+        [
+            sale1,
+            SaleItem(
+                sale=sale1, product=prods[3], qty=3, unit_price=40.0, subtotal=120.0
+            ),  # Flour
+            SaleItem(
+                sale=sale1, product=prods[4], qty=5, unit_price=6.0, subtotal=30.0
+            ),  # Salt
+            sale2,
+            SaleItem(
+                sale=sale2, product=prods[6], qty=1, unit_price=85.0, subtotal=85.0
+            ),  # Coffee
+        ]
+    )
+    db.flush()
+    db.add_all(
+        [
+            CreditTransaction(
+                employee_id=e1.id,
+                type=CreditType.charge,
+                amount=150.0,
+                sale_id=sale1.id,
+                created_at=now - timedelta(days=7),
+            ),
+            CreditTransaction(
+                employee_id=e2.id,
+                type=CreditType.charge,
+                amount=85.0,
+                sale_id=sale2.id,
+                created_at=now - timedelta(days=3),
+            ),
+            CreditTransaction(
+                employee_id=e1.id,
+                type=CreditType.payment,
+                amount=100.0,
+                note="Partial payment - still owes N$50",
+                created_at=now - timedelta(days=2),
+            ),
+        ]
+    )
+    db.flush()
+    rebuild_credit_balances(db)
+    rebuild_stock_ledger(db)
+    backfill_sales_rollup(db)
+    on_commit(db, dashboard.invalidate)
+    on_commit(db, catalogue.bump)
+
+    return {
+        "status": "seeded",
+        "products_created": len(prods),
+        "employees_created": 3,
+        "suppliers_created": 3,
+        "sales_created": 2,
+        "credit_transactions": 3,
+        "outstanding_credit": 135.0,
+    }
+
+
+def generate(
+    engine: Engine,
+    scale: int = 1,
+    seed: int = 42,
+    days: int = 180,
+    now: datetime | None = None,
+) -> dict:
+    """Replace the database contents with a synthetic dataset; returns row counts."""
+    rng = random.Random(seed)
+    # Anchored to midnight so the same seed gives identical rows all day
+    now = now or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = now - timedelta(days=days)
+    span = int((now - start).total_seconds())
+    n = {k: max(1, v * scale) for k, v in PER_SCALE.items()}
+    started = time.perf_counter()
+    counts: dict[str, int] = {}
+
+    with engine.begin() as conn, _foreign_keys_deferred(conn):
+        wipe(conn)
+        load = _loader(conn)
+
+        # Catalogue: price drawn per SKU, margin 15-45%. The closing stock is
+        # picked up front and purchases are sized to land on it.
+        products = []
+        for pid in range(1, n["products"] + 1):
+            price = round(rng.uniform(5, 250), 2)
+            cost = round(price / rng.uniform(1.15, 1.45), 2)
+            products.append(
+                (
+                    pid,
+                    f"Product {pid}",
+                    f"SKU-{pid:06d}",
+                    rng.choice(UNITS),
+                    price,
+                    cost,
+                    float(rng.randint(0, 60)),
+                    float(rng.choice((5, 10, 20))),
+                )
+            )
+        price_of = [0.0] + [p[4] for p in products]
+        cost_of = [0.0] + [p[5] for p in products]
+        on_hand = [0.0] + [p[6] for p in products]
+        load(
+            conn,
+            Product.__table__,
+            (
+                "id",
+                "name",
+                "sku",
+                "unit",
+                "price",
+                "cost_price",
+                "stock_qty",
+                "reorder_level",
+            ),
+            products,
+        )
+        counts["products"] = len(products)
+
+        load(
+            conn,
+            Supplier.__table__,
+            ("id", "name", "phone"),
+            (
+                (i, f"Supplier {i}", f"+264-61-{i:07d}")
+                for i in range(1, n["suppliers"] + 1)
+            ),
+        )
+        load(
+            conn,
+            Employee.__table__,
+            ("id", "name", "phone"),
+            (
+                (i, f"Employee {i}", f"+264-81-{i:07d}")
+                for i in range(1, n["employees"] + 1)
+            ),
+        )
+        counts["suppliers"], counts["employees"] = n["suppliers"], n["employees"]
+
+        # Zipfian popularity over a shuffled catalogue, so hot SKUs aren't just low ids
+        ranked = list(range(1, n["products"] + 1))
+        rng.shuffle(ranked)
+        cum_weights = list(
+            accumulate(1 / (r**ZIPF_S) for r in range(1, len(ranked) + 1))
+        )
+        basket_cum = list(accumulate(BASKET_WEIGHTS))
+
+        sold = defaultdict(float)
+        owed = defaultdict(float)
+        charges = []  # (employee_id, created_at, amount, sale_id)
+        line_id = 0
+        sale_times = sorted(rng.randrange(span) for _ in range(n["sales"]))
+        for lo in range(0, n["sales"], CHUNK):
+            sales, lines = [], []
+            for sale_id in range(lo + 1, min(lo + CHUNK, n["sales"]) + 1):
+                created = start + timedelta(seconds=sale_times[sale_id - 1])
+                size = rng.choices(
+                    range(1, len(BASKET_WEIGHTS) + 1), cum_weights=basket_cum
+                )[0]
+                picked = set(rng.choices(ranked, cum_weights=cum_weights, k=size))
+                total = 0.0
+                for pid in picked:
+                    qty = float(rng.choice((1, 1, 1, 2, 2, 3, 5)))
+                    subtotal = round(qty * price_of[pid], 2)
+                    line_id += 1
+                    lines.append((line_id, sale_id, pid, qty, price_of[pid], subtotal))
+                    sold[pid] += qty
+                    total += subtotal
+                total = round(total, 2)
+                if rng.random() < CREDIT_SHARE:
+                    emp = rng.randint(1, n["employees"])
+                    sales.append(
+                        (sale_id, emp, created, total, PaymentMethod.credit.value, None)
+                    )
+                    charges.append((emp, created, total, sale_id))
+                    owed[emp] += total
+                else:
+                    emp = rng.randint(1, n["employees"]) if rng.random() < 0.5 else None
+                    sales.append(
+                        (sale_id, emp, created, total, PaymentMethod.cash.value, None)
+                    )
+            load(
+                conn,
+                Sale.__table__,
+                (
+                    "id",
+                    "employee_id",
+                    "created_at",
+                    "total",
+                    "payment_method",
+                    "due_date",
+                ),
+                sales,
+            )
+            load(
+                conn,
+                SaleItem.__table__,
+                ("id", "sale_id", "product_id", "qty", "unit_price", "subtotal"),
+                lines,
+            )
+        counts["sales"], counts["sale_items"] = n["sales"], line_id
+
+        # Restocks: what was sold plus what is left, split over 1-3 deliveries
+        purchase_lines = defaultdict(list)
+        for pid in range(1, n["products"] + 1):
+            need = sold[pid] + on_hand[pid]
+            deliveries = rng.randint(1, 3)
+            for i in range(deliveries):
+                if need <= 0:
+                    break
+                qty = (
+                    need
+                    if i == deliveries - 1
+                    else float(min(need, rng.randint(10, 200)))
+                )
+                purchase_lines[rng.randint(1, n["purchases"])].append((pid, qty))
+                need -= qty
+        purchases, items = [], []
+        item_id = 0
+        for purchase_id in range(1, n["purchases"] + 1):
+            total = 0.0
+            for pid, qty in purchase_lines.get(purchase_id, ()):
+                item_id += 1
+                subtotal = round(qty * cost_of[pid], 2)
+                items.append((item_id, purchase_id, pid, qty, cost_of[pid], subtotal))
+                total += subtotal
+            created = start + timedelta(seconds=rng.randrange(span))
+            purchases.append(
+                (purchase_id, rng.randint(1, n["suppliers"]), created, round(total, 2))
+            )
+        load(
+            conn,
+            Purchase.__table__,
+            ("id", "supplier_id", "created_at", "total"),
+            purchases,
+        )
+        load(
+            conn,
+            PurchaseItem.__table__,
+            ("id", "purchase_id", "product_id", "qty", "unit_cost", "subtotal"),
+            items,
+        )
+        counts["purchases"], counts["purchase_items"] = len(purchases), item_id
+
+        # Ledger: charges follow the sales; most debtors pay back part of their tab
+        txns = [
+            (i, emp, created, CreditType.charge.value, amount, sale_id, None)
+            for i, (emp, created, amount, sale_id) in enumerate(charges, start=1)
+        ]
+        for emp in sorted(owed):
+            remaining = round(owed[emp] * rng.uniform(0.3, 1.0), 2)
+            for _ in range(rng.randint(0, 3)):
+                amount = round(remaining * rng.uniform(0.3, 0.9), 2)
+                if amount <= 0:
+                    break
+                remaining = round(remaining - amount, 2)
+                created = start + timedelta(seconds=rng.randrange(span))
+                txns.append(
+                    (
+                        len(txns) + 1,
+                        emp,
+                        created,
+                        CreditType.payment.value,
+                        amount,
+                        None,
+                        "Partial payment",
+                    )
+                )
+        load(
+            conn,
+            CreditTransaction.__table__,
+            ("id", "employee_id", "created_at", "type", "amount", "sale_id", "note"),
+            txns,
+        )
+        counts["credit_transactions"] = len(txns)
+
+        _reset_sequences(conn)
+
+        # Stock ledger from the loaded lines, then snapshots as a weekly job
+        # would have taken them; still inside the load so FKs are checked once
+        with Session(bind=conn) as db:
+            rebuild_stock_ledger(db)
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("ANALYZE stockmovement"))
+            at, snapshots = start + SNAPSHOT_EVERY, 0
+            while at <= now:
+                snapshots += take_snapshots(db, at)
+                at += SNAPSHOT_EVERY
+            counts["daily_sales"] = backfill_sales_rollup(db)
+        counts["stock_snapshots"] = snapshots
+
+    with Session(engine) as db:
+        rebuild_credit_balances(db)
+    dashboard.invalidate()
+    catalogue.bump()
+    counts["seconds"] = round(time.perf_counter() - started, 2)
+    return {"status": "seeded", "scale": scale, "seed": seed, **counts}
@@ -0,0 +1,80 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+
+from ..config import settings
+
+# In-process cache of rendered product-list responses, keyed by query.
+# The catalogue version is bumped (after commit) by product writes and by
+# every service that moves stock; entries from an older version are never
+# served. The TTL bounds staleness from writes made by other workers.
+MAX_ENTRIES = 128
+
+_lock = threading.Lock()
+_version = 0
+_entries: dict[tuple, "Entry"] = {}
+
+
+@dataclass(frozen=True)
+class Entry:
+    version: int
+    stored_at: float
+    body: bytes
+    etag: str
+    headers: dict
+
+
+def bump() -> None:
+    """Invalidate every cached page. Call after committing product or stock changes."""
+    global _version
+    with _lock:
+        _version += 1
+        _entries.clear()
+
+
+def version() -> int:
+    with _lock:
+        return _version
+
+
+def lookup(key: tuple) -> Entry | None:
+    with _lock:
+        entry = _entries.get(key)
+        current = _version
+    if entry is None or entry.version != current:
+        return None
+    if time.monotonic() - entry.stored_at > settings.CATALOGUE_CACHE_SECONDS:
+        return None
+    return entry
+
+
+def store(key: tuple, seen_version: int, body: bytes, headers: dict) -> Entry:
+    """Cache a rendered page computed at `seen_version`; the ETag hashes the body."""
+    entry = Entry(
+        version=seen_version,
+        stored_at=time.monotonic(),
+        body=body,
+        etag='"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"',
+        headers=headers,
+    )
+    with _lock:
+        # A bump while we were reading makes this page stale already
+        if seen_version == _version:
+            _entries.pop(key, None)
+            _entries[key] = entry
+            while len(_entries) > MAX_ENTRIES:
+                _entries.pop(next(iter(_entries)))
+    return entry
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """RFC 9110 weak comparison of an If-None-Match header against `etag`."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == bare for tag in if_none_match.split(",")
+    )
@@ -1,11 +1,78 @@
+from datetime import date, datetime, time, timedelta
 from typing import List
 
+from sqlalchemy import case, func, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import Session, select
 
-from ..models import CreditTransaction, CreditType, Employee, Sale, SaleItem, Product
+from ..db import transactional
+from ..models import (
+    CreditBalance,
+    CreditTransaction,
+    CreditType,
+    Employee,
+    Product,
+    Sale,
+    SaleItem,
+)
 from ..utils import ensure
 
 
+def _ensure_balances(db: Session, employee_ids: List[int]) -> None:
+    """
+    Insert zero balance rows for existing employees that have none, with
+    ON CONFLICT DO NOTHING: FOR UPDATE can't lock a row that isn't there,
+    so two first charges would otherwise both insert one.
+    """
+    insert_ = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    db.execute(
+        insert_(CreditBalance)
+        .from_select(
+            ["employee_id", "charges", "payments", "outstanding", "updated_at"],
+            select(
+                Employee.id,
+                literal(0.0),
+                literal(0.0),
+                literal(0.0),
+                literal(datetime.utcnow()),
+            ).where(Employee.id.in_(employee_ids)),
+        )
+        .on_conflict_do_nothing(index_elements=[CreditBalance.employee_id])
+    )
+
+
+def locked_balance(db: Session, employee_id: int) -> CreditBalance:
+    """Return the employee's balance row, locked for update (created if missing)."""
+    _ensure_balances(db, [employee_id])
+    bal = db.exec(
+        select(CreditBalance)
+        .where(CreditBalance.employee_id == employee_id)
+        .with_for_update()
+    ).first()
+    # Unknown employee: an unsaved zero balance, like before
+    return bal or CreditBalance(employee_id=employee_id)
+
+
+def _fold(bal: CreditBalance, txn: CreditTransaction) -> None:
+    if txn.type == CreditType.charge:
+        bal.charges = round((bal.charges or 0) + txn.amount, 2)
+    else:
+        bal.payments = round((bal.payments or 0) + txn.amount, 2)
+    bal.outstanding = round(bal.charges - bal.payments, 2)
+    bal.last_txn_id = txn.id
+    bal.updated_at = datetime.utcnow()
+
+
+def apply_to_balance(db: Session, txn: CreditTransaction) -> CreditBalance:
+    """Fold a flushed ledger row into the materialized balance."""
+    bal = locked_balance(db, txn.employee_id)
+    _fold(bal, txn)
+    db.add(bal)
+    return bal
+
+
+@transactional
 def record_credit_charge(db: Session, sale: Sale) -> None:
     ensure(sale.employee_id is not None, "Credit sale requires employee")
     txn = CreditTransaction(
@@ -15,9 +82,50 @@ def record_credit_charge(db: Session, sale: Sale) -> None:
         sale_id=sale.id,
     )
     db.add(txn)
-    db.commit()
+    db.flush()
+    apply_to_balance(db, txn)
 
 
+@transactional
+def record_credit_charges(db: Session, sales: List[Sale]) -> List[CreditTransaction]:
+    """
+    Bulk record_credit_charge for already-flushed sales: one ledger insert
+    batch and one locked read of the affected balances.
+    """
+    txns = [
+        CreditTransaction(
+            employee_id=s.employee_id,
+            type=CreditType.charge,
+            amount=s.total,
+            sale_id=s.id,
+        )
+        for s in sales
+    ]
+    if not txns:
+        return txns
+    db.add_all(txns)
+    db.flush()
+    emp_ids = sorted({t.employee_id for t in txns})
+    _ensure_balances(db, emp_ids)
+    balances = {
+        b.employee_id: b
+        for b in db.exec(
+            select(CreditBalance)
+            .where(CreditBalance.employee_id.in_(emp_ids))
+            .order_by(CreditBalance.employee_id)
+            .with_for_update()
+        ).all()
+    }
+    for t in txns:
+        bal = balances.get(t.employee_id)
+        if bal is None:
+            bal = balances[t.employee_id] = CreditBalance(employee_id=t.employee_id)
+        _fold(bal, t)
+    db.add_all(balances.values())
+    return txns
+
+
+@transactional
 def record_credit_payment(
     db: Session, employee_id: int, amount: float, note: str | None = None
 ) -> CreditTransaction:
@@ -31,149 +139,261 @@ def record_credit_payment(
         note=note,
     )
     db.add(txn)
-    db.commit()
-    db.refresh(txn)
+    db.flush()
+    apply_to_balance(db, txn)
     return txn
 
 
 def balance_for_employee(db: Session, employee_id: int) -> float:
-    stmt = select(CreditTransaction).where(CreditTransaction.employee_id == employee_id)
-    bal = 0.0
-    for t in db.exec(stmt):
-        bal += t.amount if t.type == CreditType.charge else -t.amount
-    return round(bal, 2)
+    bal = db.get(CreditBalance, employee_id)
+    return round(bal.outstanding, 2) if bal else 0.0
 
 
 def outstanding_credit_sum(db: Session) -> float:
-    stmt = select(CreditTransaction)
-    per_emp: dict[int, float] = {}
-    for t in db.exec(stmt):
-        sgn = 1 if t.type == CreditType.charge else -1
-        per_emp[t.employee_id] = round(
-            per_emp.get(t.employee_id, 0) + sgn * t.amount, 2
+    total = db.exec(
+        select(func.coalesce(func.sum(CreditBalance.outstanding), 0.0)).where(
+            CreditBalance.outstanding > 0
         )
-    total = sum(v for v in per_emp.values() if v > 0)
-    return round(total, 2)
+    ).one()
+    return round(float(total or 0.0), 2)
 
 
-def credit_summary(db: Session) -> List[dict]:
-    employees = db.exec(select(Employee)).all()
-    out = []
-    for e in employees:
-        bal = balance_for_employee(db, e.id)  # type: ignore[arg-type]
-        if bal != 0:
-            # Get products purchased on credit by this employee
-            products = []
-
-            # First, let's get all credit charges for this employee
-            credit_charges = db.exec(
-                select(CreditTransaction).where(
-                    CreditTransaction.employee_id == e.id,
-                    CreditTransaction.type == CreditType.charge
-                )
-            ).all()
-
-            for charge in credit_charges:
-                if charge.sale_id:
-                    # Join SaleItem with Product and Sale to get product details and purchase date
-                    stmt = select(SaleItem, Product, Sale).where(
-                        SaleItem.sale_id == charge.sale_id,
-                        SaleItem.product_id == Product.id,
-                        SaleItem.sale_id == Sale.id
+@transactional
+def rebuild_credit_balances(db: Session, fix: bool = True) -> List[dict]:
+    """
+    Recompute every balance row from the ledger and report drift.
+    With fix=True the stored rows are corrected.
+    """
+    ledger = db.exec(
+        select(
+            CreditTransaction.employee_id,
+            func.coalesce(
+                func.sum(
+                    case(
+                        (
+                            CreditTransaction.type == CreditType.charge,
+                            CreditTransaction.amount,
+                        ),
+                        else_=0.0,
                     )
-                    results = db.exec(stmt).all()
-                    for item, product, sale in results:
-                        products.append({
-                            "id": product.id,
-                            "name": product.name,
-                            "qty": item.qty,
-                            "unit_price": item.unit_price,
-                            "subtotal": item.subtotal,
-                            "purchase_date": sale.created_at.isoformat()
-                        })
-                else:
-                    # If no sale_id, this might be a manual credit charge
-                    # Let's try to find sales for this employee that might not be linked
-                    employee_sales = db.exec(
-                        select(Sale).where(Sale.employee_id == e.id)
-                    ).all()
-
-                    for sale in employee_sales:
-                        if sale.total > 0:  # This might be a credit sale
-                            sale_items = db.exec(
-                                select(SaleItem, Product, Sale).where(
-                                    SaleItem.sale_id == sale.id,
-                                    SaleItem.product_id == Product.id,
-                                    SaleItem.sale_id == Sale.id
-                                )
-                            ).all()
-                            for item, product, sale_info in sale_items:
-                                products.append({
-                                    "id": product.id,
-                                    "name": product.name,
-                                    "qty": item.qty,
-                                    "unit_price": item.unit_price,
-                                    "subtotal": item.subtotal,
-                                    "purchase_date": sale_info.created_at.isoformat()
-                                })
-
-            out.append({
-                "employee_id": e.id,
-                "employee_name": e.name,
-                "balance": bal,
-                "products": products
-            })
-    out.sort(key=lambda x: -x["balance"])
+                ),
+                0.0,
+            ).label("charges"),
+            func.coalesce(
+                func.sum(
+                    case(
+                        (
+                            CreditTransaction.type == CreditType.payment,
+                            CreditTransaction.amount,
+                        ),
+                        else_=0.0,
+                    )
+                ),
+                0.0,
+            ).label("payments"),
+            func.max(CreditTransaction.id).label("last_txn_id"),
+        ).group_by(CreditTransaction.employee_id)
+    ).all()
+    expected = {
+        r.employee_id: (
+            round(float(r.charges), 2),
+            round(float(r.payments), 2),
+            r.last_txn_id,
+        )
+        for r in ledger
+    }
+    stored = {
+        b.employee_id: b for b in db.exec(select(CreditBalance).with_for_update()).all()
+    }
+
+    drift = []
+    for emp_id in sorted(set(expected) | set(stored)):
+        charges, payments, last_id = expected.get(emp_id, (0.0, 0.0, None))
+        outstanding = round(charges - payments, 2)
+        bal = stored.get(emp_id)
+        if bal is not None and (bal.charges, bal.payments, bal.outstanding) == (
+            charges,
+            payments,
+            outstanding,
+        ):
+            continue
+        drift.append(
+            {
+                "employee_id": emp_id,
+                "stored_outstanding": None if bal is None else bal.outstanding,
+                "ledger_outstanding": outstanding,
+            }
+        )
+        if fix:
+            bal = bal or CreditBalance(employee_id=emp_id)
+            bal.charges, bal.payments, bal.outstanding = charges, payments, outstanding
+            bal.last_txn_id = last_id
+            bal.updated_at = datetime.utcnow()
+            db.add(bal)
+    return drift
+
+
+def _items_by_sale(db: Session, sale_ids) -> dict[int, List[dict]]:
+    """
+    One batched SaleItem/Product/Sale fetch, grouped by sale_id. `sale_ids`
+    is a SELECT of sale ids, sent as a subquery: a literal IN list binds one
+    parameter per sale and breaks PostgreSQL's 65,535 limit on big ledgers.
+    """
+    out: dict[int, List[dict]] = {}
+    rows = db.exec(
+        select(SaleItem, Product.name, Sale.created_at)
+        .join(Product, Product.id == SaleItem.product_id)
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .where(SaleItem.sale_id.in_(sale_ids))
+        .order_by(SaleItem.sale_id, SaleItem.id)
+    ).all()
+    for item, product_name, created_at in rows:
+        out.setdefault(item.sale_id, []).append(
+            {
+                "id": item.product_id,
+                "name": product_name,
+                "qty": item.qty,
+                "unit_price": item.unit_price,
+                "subtotal": item.subtotal,
+                "purchase_date": created_at.isoformat(),
+            }
+        )
     return out
 
 
-def payment_history(db: Session) -> List[dict]:
-    employees = db.exec(select(Employee)).all()
-    out = []
-    for e in employees:
-        # Get all credit payments for this employee
-        payments = db.exec(
-            select(CreditTransaction).where(
-                CreditTransaction.employee_id == e.id,
-                CreditTransaction.type == CreditType.payment
-            )
-        ).all()
+def credit_summary(db: Session) -> List[dict]:
+    # Employees with a non-zero balance (one join on the materialized balances)
+    balances = db.exec(
+        select(Employee.id, Employee.name, CreditBalance.outstanding)
+        .join(CreditBalance, CreditBalance.employee_id == Employee.id)
+        .where(CreditBalance.outstanding != 0)
+    ).all()
+    if not balances:
+        return []
 
-        if payments:
-            total_paid = sum(p.amount for p in payments)
-            # Get products purchased on credit by this employee (same as credit_summary)
-            products = []
+    # All credit charges for those employees, in ledger order. Every id set
+    # below stays a subquery joined to the balances, never a parameter list.
+    debtor_charges = (
+        select(CreditTransaction.employee_id, CreditTransaction.sale_id)
+        .join(CreditBalance, CreditBalance.employee_id == CreditTransaction.employee_id)
+        .where(
+            CreditBalance.outstanding != 0, CreditTransaction.type == CreditType.charge
+        )
+    )
+    charges = db.exec(debtor_charges.order_by(CreditTransaction.id)).all()
+    sale_ids = debtor_charges.with_only_columns(CreditTransaction.sale_id)
 
-            credit_charges = db.exec(
-                select(CreditTransaction).where(
-                    CreditTransaction.employee_id == e.id,
-                    CreditTransaction.type == CreditType.charge
+    # Manual charges (no sale_id) fall back to every sale of that employee
+    sales_by_emp: dict[int, List[int]] = {}
+    if any(not c.sale_id for c in charges):
+        manual = select(Sale.id, Sale.employee_id).where(
+            Sale.employee_id.in_(
+                debtor_charges.with_only_columns(CreditTransaction.employee_id).where(
+                    CreditTransaction.sale_id.is_(None)
                 )
-            ).all()
-
-            for charge in credit_charges:
-                if charge.sale_id:
-                    stmt = select(SaleItem, Product, Sale).where(
-                        SaleItem.sale_id == charge.sale_id,
-                        SaleItem.product_id == Product.id,
-                        SaleItem.sale_id == Sale.id
-                    )
-                    results = db.exec(stmt).all()
-                    for item, product, sale in results:
-                        products.append({
-                            "id": product.id,
-                            "name": product.name,
-                            "qty": item.qty,
-                            "unit_price": item.unit_price,
-                            "subtotal": item.subtotal,
-                            "purchase_date": sale.created_at.isoformat()
-                        })
-
-            out.append({
-                "employee_id": e.id,
-                "employee_name": e.name,
-                "total_paid": total_paid,
-                "products": products
-            })
-    out.sort(key=lambda x: -x["total_paid"])
+            ),
+            Sale.total > 0,
+        )
+        for sale_id, emp_id in db.exec(manual.order_by(Sale.id)).all():
+            sales_by_emp.setdefault(emp_id, []).append(sale_id)
+        sale_ids = sale_ids.union(manual.with_only_columns(Sale.id))
+    items = _items_by_sale(db, sale_ids)
+
+    products_by_emp: dict[int, List[dict]] = {}
+    for c in charges:
+        linked = [c.sale_id] if c.sale_id else sales_by_emp.get(c.employee_id, [])
+        bucket = products_by_emp.setdefault(c.employee_id, [])
+        for sid in linked:
+            bucket.extend(items.get(sid, []))
+
+    out = [
+        {
+            "employee_id": r.id,
+            "employee_name": r.name,
+            "balance": round(r.outstanding, 2),
+            "products": products_by_emp.get(r.id, []),
+        }
+        for r in balances
+    ]
+    out.sort(key=lambda x: -x["balance"])
     return out
+
+
+def payment_history(
+    db: Session,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    employee_id: int | None = None,
+    after: int | None = None,
+    limit: int = 100,
+) -> tuple[List[dict], int | None]:
+    """
+    One keyset page of employees who paid in the window, by employee id.
+    Each row's total_paid covers the whole window, so every employee shows
+    up on exactly one page. Returns (rows, next_key); next_key is the last
+    employee id, None on the last page. Charges and their sale lines are
+    limited to the page's employees and the same window.
+    """
+    window = []
+    if date_from is not None:
+        window.append(
+            CreditTransaction.created_at >= datetime.combine(date_from, time.min)
+        )
+    if date_to is not None:
+        window.append(
+            CreditTransaction.created_at
+            < datetime.combine(date_to + timedelta(days=1), time.min)
+        )
+    if employee_id is not None:
+        window.append(CreditTransaction.employee_id == employee_id)
+
+    stmt = (
+        select(
+            CreditTransaction.employee_id,
+            Employee.name,
+            func.sum(CreditTransaction.amount).label("total_paid"),
+        )
+        .join(Employee, Employee.id == CreditTransaction.employee_id)
+        .where(CreditTransaction.type == CreditType.payment, *window)
+        .group_by(CreditTransaction.employee_id, Employee.name)
+        .order_by(CreditTransaction.employee_id)
+        .limit(limit + 1)
+    )
+    if after is not None:
+        stmt = stmt.where(CreditTransaction.employee_id > after)
+    payers = db.exec(stmt).all()
+    next_key = None
+    if len(payers) > limit:
+        payers = payers[:limit]
+        next_key = payers[-1].employee_id
+    if not payers:
+        return [], None
+    emp_ids = [p.employee_id for p in payers]
+
+    page_charges = select(
+        CreditTransaction.employee_id, CreditTransaction.sale_id
+    ).where(
+        CreditTransaction.type == CreditType.charge,
+        CreditTransaction.sale_id.is_not(None),
+        CreditTransaction.employee_id.in_(emp_ids),
+        *window,
+    )
+    charges = db.exec(page_charges.order_by(CreditTransaction.id)).all()
+    items = _items_by_sale(
+        db, page_charges.with_only_columns(CreditTransaction.sale_id)
+    )
+
+    products_by_emp: dict[int, List[dict]] = {}
+    for c in charges:
+        products_by_emp.setdefault(c.employee_id, []).extend(items.get(c.sale_id, []))
+
+    out = [
+        {
+            "employee_id": p.employee_id,
+            "employee_name": p.name,
+            "total_paid": round(p.total_paid, 2),
+            "products": products_by_emp.get(p.employee_id, []),
+        }
+        for p in payers
+    ]
+    return out, next_key
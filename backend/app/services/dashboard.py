@@ -0,0 +1,101 @@
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import case, func
+from sqlmodel import Session, select
+
+from ..config import settings
+from ..models import PaymentMethod, Product
+from .sales_rollup import rollup_rows
+
+# In-process snapshot of the dashboard numbers. Writers call invalidate()
+# after committing; readers recompute at most once per TTL otherwise.
+_lock = threading.Lock()
+_generation = 0
+_snapshot: dict | None = None  # {"generation", "computed_at", "generated_at", "data"}
+
+
+def invalidate() -> None:
+    """Mark the snapshot stale. Call after committing sale, purchase or product writes."""
+    global _generation
+    with _lock:
+        _generation += 1
+
+
+def compute_summary(db: Session) -> dict:
+    total_products, total_stock_value, low_stock = db.exec(
+        select(
+            func.count(Product.id),
+            func.coalesce(
+                func.sum(
+                    func.coalesce(Product.stock_qty, 0)
+                    * func.coalesce(Product.cost_price, 0)
+                ),
+                0,
+            ),
+            func.coalesce(
+                func.sum(
+                    case(
+                        (
+                            func.coalesce(Product.stock_qty, 0)
+                            <= func.coalesce(Product.reorder_level, 0),
+                            1,
+                        ),
+                        else_=0,
+                    )
+                ),
+                0,
+            ),
+        )
+    ).one()
+
+    # Only count actual sales, not credit; read from the daily rollup
+    rollup = rollup_rows(payment_method=PaymentMethod.cash)
+    total_sold = func.sum(rollup.c.qty).label("total_sold")
+    top = db.exec(
+        select(Product.name, total_sold)
+        .join(rollup, Product.id == rollup.c.product_id)
+        .group_by(Product.id, Product.name)
+        .order_by(total_sold.desc())
+        .limit(5)
+    ).all()
+
+    return {
+        "total_products": int(total_products or 0),
+        "total_stock_value": float(total_stock_value or 0),
+        "low_stock": int(low_stock or 0),
+        "top_sold_products": [
+            {"name": r.name, "total_sold": float(r.total_sold) if r.total_sold else 0}
+            for r in top
+        ],
+    }
+
+
+def cached_summary(db: Session) -> dict:
+    """Return the dashboard summary, recomputing only when stale or invalidated."""
+    global _snapshot
+    with _lock:
+        snap, generation = _snapshot, _generation
+    now = time.monotonic()
+    if (
+        snap is None
+        or snap["generation"] != generation
+        or now - snap["computed_at"] > settings.DASHBOARD_CACHE_SECONDS
+    ):
+        data = compute_summary(db)
+        snap = {
+            "generation": generation,
+            "computed_at": time.monotonic(),
+            "generated_at": datetime.utcnow(),
+            "data": data,
+        }
+        with _lock:
+            # Don't overwrite a snapshot taken after a newer invalidation
+            if _snapshot is None or _snapshot["generation"] <= generation:
+                _snapshot = snap
+    return {
+        **snap["data"],
+        "generated_at": snap["generated_at"].isoformat(),
+        "snapshot_age_seconds": round(time.monotonic() - snap["computed_at"], 3),
+    }
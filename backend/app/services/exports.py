@@ -0,0 +1,157 @@
+import csv
+import io
+from datetime import date, datetime, time, timedelta
+from enum import Enum
+from typing import Any, AsyncIterator
+
+import orjson
+from sqlalchemy import Select, select
+
+from ..db import async_engine
+from ..models import (
+    CreditTransaction,
+    Employee,
+    Product,
+    Purchase,
+    PurchaseItem,
+    Sale,
+    SaleItem,
+    Supplier,
+)
+
+# Rows fetched per round trip from the server-side cursor; memory is bounded
+# by one batch regardless of the export size.
+BATCH_ROWS = 2000
+
+
+def _sales() -> tuple[Select, Any]:
+    return (
+        select(
+            Sale.id.label("sale_id"),
+            Sale.created_at,
+            Sale.payment_method,
+            Sale.employee_id,
+            Employee.name.label("employee_name"),
+            SaleItem.product_id,
+            Product.sku,
+            Product.name.label("product_name"),
+            SaleItem.qty,
+            SaleItem.unit_price,
+            SaleItem.subtotal,
+            Sale.total.label("sale_total"),
+        )
+        .join(SaleItem, SaleItem.sale_id == Sale.id)
+        .join(Product, Product.id == SaleItem.product_id)
+        .outerjoin(Employee, Employee.id == Sale.employee_id)
+        .order_by(Sale.created_at, Sale.id, SaleItem.id)
+    ), Sale.created_at
+
+
+def _purchases() -> tuple[Select, Any]:
+    return (
+        select(
+            Purchase.id.label("purchase_id"),
+            Purchase.created_at,
+            Purchase.supplier_id,
+            Supplier.name.label("supplier_name"),
+            PurchaseItem.product_id,
+            Product.sku,
+            Product.name.label("product_name"),
+            PurchaseItem.qty,
+            PurchaseItem.unit_cost,
+            PurchaseItem.subtotal,
+            Purchase.total.label("purchase_total"),
+        )
+        .join(PurchaseItem, PurchaseItem.purchase_id == Purchase.id)
+        .join(Product, Product.id == PurchaseItem.product_id)
+        .join(Supplier, Supplier.id == Purchase.supplier_id)
+        .order_by(Purchase.created_at, Purchase.id, PurchaseItem.id)
+    ), Purchase.created_at
+
+
+def _credit_transactions() -> tuple[Select, Any]:
+    return (
+        select(
+            CreditTransaction.id,
+            CreditTransaction.created_at,
+            CreditTransaction.employee_id,
+            Employee.name.label("employee_name"),
+            CreditTransaction.type,
+            CreditTransaction.amount,
+            CreditTransaction.sale_id,
+            CreditTransaction.note,
+        )
+        .join(Employee, Employee.id == CreditTransaction.employee_id)
+        .order_by(CreditTransaction.created_at, CreditTransaction.id)
+    ), CreditTransaction.created_at
+
+
+def _stock() -> tuple[Select, Any]:
+    return (
+        select(
+            Product.id.label("product_id"),
+            Product.sku,
+            Product.name,
+            Product.unit,
+            Product.stock_qty,
+            Product.reorder_level,
+            Product.cost_price,
+            Product.price,
+            (Product.stock_qty * Product.cost_price).label("stock_value"),
+        ).order_by(Product.id)
+    ), None
+
+
+# kind -> builder returning (statement, timestamp column for date filters)
+EXPORTS = {
+    "sales": _sales,
+    "purchases": _purchases,
+    "credit-transactions": _credit_transactions,
+    "stock": _stock,
+}
+
+
+def export_statement(
+    kind: str, date_from: date | None = None, date_to: date | None = None
+) -> Select:
+    stmt, ts = EXPORTS[kind]()
+    if date_from is not None:
+        stmt = stmt.where(ts >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        stmt = stmt.where(ts < datetime.combine(date_to + timedelta(days=1), time.min))
+    return stmt
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunk(rows) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerows([[_cell(v) for v in row] for row in rows])
+    return buf.getvalue().encode()
+
+
+def _ndjson_chunk(columns, rows) -> bytes:
+    # orjson handles datetimes, enums and None natively
+    return b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+async def stream_export(stmt: Select, fmt: str) -> AsyncIterator[bytes]:
+    """
+    Yield the export in batches from a server-side cursor. The CSV header is
+    sent before the query runs, so clients see the first byte immediately.
+    """
+    columns = [c.name for c in stmt.selected_columns]
+    if fmt == "csv":
+        yield _csv_chunk([columns])
+    async with async_engine.connect() as conn:
+        result = await conn.stream(stmt.execution_options(yield_per=BATCH_ROWS))
+        async for rows in result.partitions():
+            yield _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(columns, rows)
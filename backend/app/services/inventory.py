@@ -1,19 +1,56 @@
-from typing import List
 from collections import defaultdict
+from typing import List
+
+from fastapi import HTTPException
+from sqlalchemy import update
 from sqlmodel import Session, select
 
-from ..models import PaymentMethod, Product, Purchase, PurchaseItem, Sale, SaleItem
+from ..config import settings
+from ..db import on_commit, transactional
+from ..models import (
+    Employee,
+    PaymentMethod,
+    Product,
+    Purchase,
+    PurchaseItem,
+    Sale,
+    SaleItem,
+    StockReason,
+)
 from ..utils import ensure
+from . import catalogue, dashboard, sales_rollup
+from .credits import record_credit_charge, record_credit_charges
+from .stock_ledger import movements_for, record_movements
+
+
+def lock_products(db: Session, product_ids) -> dict[int, Product]:
+    """Lock the given products with one SELECT ... FOR UPDATE, in id order."""
+    ids = sorted({int(pid) for pid in product_ids})
+    if not ids:
+        return {}
+    rows = db.exec(
+        select(Product)
+        .where(Product.id.in_(ids))
+        .order_by(Product.id)
+        .with_for_update()
+    ).all()
+    return {p.id: p for p in rows}
 
 
+@transactional
 def create_purchase(db: Session, supplier_id: int, items: List[dict]) -> Purchase:
     ensure(len(items) > 0, "No items provided")
+    products = lock_products(db, (it["product_id"] for it in items))
+    for it in items:
+        ensure(
+            int(it["product_id"]) in products, f"Product {it['product_id']} not found"
+        )
     purchase = Purchase(supplier_id=supplier_id, total=0)
     db.add(purchase)
     total = 0.0
+    received: dict[int, float] = defaultdict(float)
     for it in items:
-        product = db.get(Product, it["product_id"])  # type: ignore[arg-type]
-        ensure(product is not None, f"Product {it['product_id']} not found")
+        product = products[int(it["product_id"])]
         qty = float(it["qty"])
         unit_cost = float(it["unit_cost"])
         subtotal = qty * unit_cost
@@ -26,21 +63,98 @@ def create_purchase(db: Session, supplier_id: int, items: List[dict]) -> Purchas
         )
         db.add(pi)
         product.stock_qty += qty
+        received[product.id] += qty
         total += subtotal
     purchase.total = round(total, 2)
-    db.commit()
-    db.refresh(purchase)
+    db.flush()
+    record_movements(
+        db,
+        movements_for(received, StockReason.purchase, purchase.id, purchase.created_at),
+    )
+    on_commit(db, dashboard.invalidate)
+    on_commit(db, catalogue.bump)
     return purchase
 
 
+def _decrement_locked(db: Session, wanted: dict[int, float]) -> dict[int, float]:
+    """
+    Lock engine: read the rows FOR UPDATE, check, then decrement in the ORM.
+    Returns {product_id: cost_price} for the sales rollup.
+    """
+    products = lock_products(db, wanted)
+    for pid, qty in wanted.items():
+        product = products.get(pid)
+        ensure(product is not None, f"Product {pid} not found")
+        ensure(product.stock_qty - qty >= 0, f"Insufficient stock for {product.name}")
+    for pid, qty in wanted.items():
+        products[pid].stock_qty -= qty
+        db.add(products[pid])
+    return {pid: products[pid].cost_price for pid in wanted}
+
+
+def _product_costs(db: Session, wanted: dict[int, float]) -> dict[int, float]:
+    """{product_id: cost_price} for the sales rollup, read without locking."""
+    cost_of = dict(
+        db.exec(
+            select(Product.id, Product.cost_price).where(Product.id.in_(sorted(wanted)))
+        ).all()
+    )
+    for pid in wanted:
+        ensure(pid in cost_of, f"Product {pid} not found")
+    return cost_of
+
+
+def _decrement_conditional(db: Session, wanted: dict[int, float]) -> None:
+    """
+    Conditional engine: one UPDATE ... WHERE stock_qty >= :q per product, in
+    id order. The row lock an UPDATE takes lasts until COMMIT, so create_sale
+    issues these last, right before committing; a missing RETURNING row
+    means insufficient stock and rolls the whole sale back.
+    """
+    for pid in sorted(wanted):
+        qty = wanted[pid]
+        row = db.exec(
+            update(Product)
+            .where(Product.id == pid, Product.stock_qty >= qty)
+            .values(stock_qty=Product.stock_qty - qty)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            name = db.exec(select(Product.name).where(Product.id == pid)).first()
+            ensure(name is not None, f"Product {pid} not found")
+            ensure(False, f"Insufficient stock for {name}")
+
+
+STOCK_ENGINES = {
+    "lock": _decrement_locked,
+    "conditional": _decrement_conditional,
+}
+
+
+@transactional
 def create_sale(
     db: Session,
     employee_id: int | None,
     payment_method: PaymentMethod,
     items: List[dict],
     due_date=None,
+    stock_engine: str | None = None,
 ) -> Sale:
     ensure(len(items) > 0, "No items provided")
+    # Merge duplicate lines so the stock check sees the full quantity per product
+    wanted: dict[int, float] = defaultdict(float)
+    for it in items:
+        wanted[int(it["product_id"])] += float(it["qty"])
+    engine = stock_engine or settings.STOCK_ENGINE
+    ensure(engine in STOCK_ENGINES, f"Unknown stock engine {engine}")
+    # The lock engine holds the rows from its check on; the conditional one
+    # writes everything else first and takes its row locks last
+    if engine == "lock":
+        cost_of = _decrement_locked(db, wanted)
+    else:
+        cost_of = _product_costs(db, wanted)
+
     sale = Sale(
         employee_id=employee_id,
         payment_method=payment_method,
@@ -50,29 +164,163 @@ def create_sale(
     db.add(sale)
     total = 0.0
     for it in items:
-        product = db.get(Product, it["product_id"])  # type: ignore[arg-type]
-        ensure(product is not None, f"Product {it['product_id']} not found")
         qty = float(it["qty"])
         unit_price = float(it["unit_price"])
         subtotal = qty * unit_price
-        ensure(product.stock_qty - qty >= 0, f"Insufficient stock for {product.name}")
         si = SaleItem(
             sale=sale,
-            product=product,
+            product_id=int(it["product_id"]),
             qty=qty,
             unit_price=unit_price,
             subtotal=subtotal,
         )
         db.add(si)
-        product.stock_qty -= qty
         total += subtotal
     sale.total = round(total, 2)
-    db.commit()
-    db.refresh(sale)
+    db.flush()
+    record_movements(
+        db,
+        movements_for(
+            {pid: -qty for pid, qty in wanted.items()},
+            StockReason.sale,
+            sale.id,
+            sale.created_at,
+        ),
+    )
+    totals = sales_rollup.new_totals()
+    sales_rollup.add_sale(totals, sale, items, cost_of)
+    sales_rollup.apply(db, totals)
+    if payment_method == PaymentMethod.credit:
+        record_credit_charge(db, sale)
+    if engine == "conditional":
+        db.flush()
+        _decrement_conditional(db, wanted)
+    on_commit(db, dashboard.invalidate)
+    on_commit(db, catalogue.bump)
     return sale
 
 
+@transactional
+def create_sales_batch(db: Session, payloads: List[dict]) -> List[dict]:
+    """
+    Apply many sales in one transaction (offline till sync). All referenced
+    products are locked in a single query; each sale is validated against
+    the running stock and either applied whole or reported as rejected.
+    Returns one {index, ok, sale_id, total, error} result per payload.
+    """
+    products = lock_products(
+        db, (it["product_id"] for p in payloads for it in p.get("items") or [])
+    )
+    emp_ids = {p["employee_id"] for p in payloads if p.get("employee_id") is not None}
+    known_employees = (
+        set(db.exec(select(Employee.id).where(Employee.id.in_(emp_ids))).all())
+        if emp_ids
+        else set()
+    )
+
+    results: List[dict] = []
+    accepted: List[tuple[int, Sale, dict[int, float]]] = []
+    for idx, payload in enumerate(payloads):
+        items = payload.get("items") or []
+        employee_id = payload.get("employee_id")
+        try:
+            ensure(len(items) > 0, "No items provided")
+            ensure(
+                employee_id is None or employee_id in known_employees,
+                "Employee not found",
+            )
+            if payload["payment_method"] == PaymentMethod.credit:
+                ensure(employee_id is not None, "Credit sale requires employee")
+            wanted: dict[int, float] = defaultdict(float)
+            for it in items:
+                ensure(
+                    it["product_id"] in products,
+                    f"Product {it['product_id']} not found",
+                )
+                wanted[it["product_id"]] += float(it["qty"])
+            for pid, qty in wanted.items():
+                prod = products[pid]
+                ensure(prod.stock_qty - qty >= 0, f"Insufficient stock for {prod.name}")
+        except HTTPException as e:
+            results.append(
+                {
+                    "index": idx,
+                    "ok": False,
+                    "sale_id": None,
+                    "total": None,
+                    "error": e.detail,
+                }
+            )
+            continue
+
+        sale = Sale(
+            employee_id=employee_id,
+            payment_method=payload["payment_method"],
+            total=0,
+            due_date=payload.get("due_date"),
+        )
+        total = 0.0
+        for it in items:
+            qty = float(it["qty"])
+            unit_price = float(it["unit_price"])
+            subtotal = qty * unit_price
+            db.add(
+                SaleItem(
+                    sale=sale,
+                    product_id=it["product_id"],
+                    qty=qty,
+                    unit_price=unit_price,
+                    subtotal=subtotal,
+                )
+            )
+            total += subtotal
+        for pid, qty in wanted.items():
+            products[pid].stock_qty -= qty
+        sale.total = round(total, 2)
+        db.add(sale)
+        accepted.append((idx, sale, wanted))
+        results.append(
+            {
+                "index": idx,
+                "ok": True,
+                "sale_id": None,
+                "total": sale.total,
+                "error": None,
+            }
+        )
+
+    if accepted:
+        db.flush()
+        record_credit_charges(
+            db, [s for _, s, _ in accepted if s.payment_method == PaymentMethod.credit]
+        )
+        totals = sales_rollup.new_totals()
+        cost_of = {pid: p.cost_price for pid, p in products.items()}
+        for idx, sale, _ in accepted:
+            sales_rollup.add_sale(totals, sale, payloads[idx]["items"], cost_of)
+        sales_rollup.apply(db, totals)
+        record_movements(
+            db,
+            [
+                row
+                for _, sale, wanted in accepted
+                for row in movements_for(
+                    {pid: -qty for pid, qty in wanted.items()},
+                    StockReason.sale,
+                    sale.id,
+                    sale.created_at,
+                )
+            ],
+        )
+        on_commit(db, dashboard.invalidate)
+        on_commit(db, catalogue.bump)
+        for idx, sale, _ in accepted:
+            results[idx]["sale_id"] = sale.id
+    return results
+
+
 def low_stock(db: Session, limit: int = 10) -> List[Product]:
+    """Static reorder_level threshold; services.reorder plans from actual demand."""
     stmt = (
         select(Product)
         .where(Product.stock_qty <= Product.reorder_level)
@@ -84,6 +332,7 @@ def low_stock(db: Session, limit: int = 10) -> List[Product]:
         rows = [r[0] for r in rows]
     return rows
 
+
 def total_stock_value(db: Session) -> float:
     rows = db.exec(select(Product)).all()
     if rows and isinstance(rows[0], tuple):
@@ -93,45 +342,53 @@ def total_stock_value(db: Session) -> float:
         value += (p.cost_price or 0) * (p.stock_qty or 0)
     return round(value, 2)
 
+
 # Purchases Services – implement cancel and update
 
+
+@transactional
 def cancel_purchase(db: Session, purchase_id: int) -> bool:
     p = db.get(Purchase, purchase_id)
     if not p:
         return False
-    items = db.exec(select(PurchaseItem).where(PurchaseItem.purchase_id == purchase_id)).all()
-
-    # Get all unique product IDs that need to be locked
-    product_ids = list({it.product_id for it in items})
-
-    # Fetch all products with row-level locks in a single query
-    locked_products = db.exec(
-        select(Product).where(Product.id.in_(product_ids)).with_for_update()
+    items = db.exec(
+        select(PurchaseItem).where(PurchaseItem.purchase_id == purchase_id)
     ).all()
 
-    # Create a mapping for quick access by product_id
-    product_map = {prod.id: prod for prod in locked_products}
+    # Lock all affected products in a single, id-ordered query
+    product_map = lock_products(db, (it.product_id for it in items))
 
     # make sure rolling back won't send stock negative (using locked products)
     for it in items:
         prod = product_map.get(it.product_id)
         ensure(prod is not None, "Product missing")
-        ensure((prod.stock_qty or 0) - it.qty >= 0,
-                f"Cannot cancel: {prod.name} stock would go negative")
+        ensure(
+            (prod.stock_qty or 0) - it.qty >= 0,
+            f"Cannot cancel: {prod.name} stock would go negative",
+        )
 
     # apply rollback (using the same locked products)
+    returned: dict[int, float] = defaultdict(float)
     for it in items:
         prod = product_map[it.product_id]
         prod.stock_qty -= it.qty
+        returned[it.product_id] -= it.qty
         db.add(prod)
         db.delete(it)
+    record_movements(
+        db, movements_for(returned, StockReason.purchase_cancel, purchase_id)
+    )
 
     db.delete(p)
-    db.commit()
+    on_commit(db, dashboard.invalidate)
+    on_commit(db, catalogue.bump)
     return True
 
-def update_purchase(db: Session, purchase_id: int, supplier_id: int | None,
-                    items: list[dict] | None) -> Purchase:
+
+@transactional
+def update_purchase(
+    db: Session, purchase_id: int, supplier_id: int | None, items: list[dict] | None
+) -> Purchase:
     p = db.get(Purchase, purchase_id)
     ensure(p is not None, "Purchase not found")
     if supplier_id is not None:
@@ -140,7 +397,9 @@ def update_purchase(db: Session, purchase_id: int, supplier_id: int | None,
     if items is not None:
         # current totals by product
         current = defaultdict(lambda: {"qty": 0.0})
-        cur_items = db.exec(select(PurchaseItem).where(PurchaseItem.purchase_id == purchase_id)).all()
+        cur_items = db.exec(
+            select(PurchaseItem).where(PurchaseItem.purchase_id == purchase_id)
+        ).all()
         for it in cur_items:
             current[it.product_id]["qty"] += float(it.qty)
 
@@ -149,28 +408,27 @@ def update_purchase(db: Session, purchase_id: int, supplier_id: int | None,
         for it in items:
             desired[int(it["product_id"])]["qty"] += float(it["qty"])
 
-        # Get all unique product IDs that need to be locked
-        product_ids = list(set(current.keys()) | set(desired.keys()))
-
-        # Fetch all products with row-level locks in a single query
-        locked_products = db.exec(
-            select(Product).where(Product.id.in_(product_ids)).with_for_update()
-        ).all()
-
-        # Create a mapping for quick access by product_id
-        product_map = {prod.id: prod for prod in locked_products}
+        # Lock all affected products in a single, id-ordered query
+        product_map = lock_products(db, set(current.keys()) | set(desired.keys()))
 
         # adjust stock by delta (desired - current) using locked products
+        deltas: dict[int, float] = {}
         for pid in set(current.keys()) | set(desired.keys()):
             old = current[pid]["qty"]
             new = desired[pid]["qty"]
             delta = new - old
             prod = product_map.get(pid)
             ensure(prod is not None, "Product missing")
-            ensure((prod.stock_qty or 0) + delta >= 0,
-                    f"Adjusting purchase would send {prod.name} stock negative")
+            ensure(
+                (prod.stock_qty or 0) + delta >= 0,
+                f"Adjusting purchase would send {prod.name} stock negative",
+            )
             prod.stock_qty += delta
+            deltas[pid] = delta
             db.add(prod)
+        record_movements(
+            db, movements_for(deltas, StockReason.purchase_edit, purchase_id)
+        )
 
         # replace items using the same locked products
         for it in cur_items:
@@ -178,11 +436,22 @@ def update_purchase(db: Session, purchase_id: int, supplier_id: int | None,
         total = 0.0
         for it in items:
             prod = product_map[int(it["product_id"])]
-            qty = float(it["qty"]); unit_cost = float(it["unit_cost"])
+            qty = float(it["qty"])
+            unit_cost = float(it["unit_cost"])
             subtotal = qty * unit_cost
-            db.add(PurchaseItem(purchase=p, product=prod, qty=qty, unit_cost=unit_cost, subtotal=subtotal))
+            db.add(
+                PurchaseItem(
+                    purchase=p,
+                    product=prod,
+                    qty=qty,
+                    unit_cost=unit_cost,
+                    subtotal=subtotal,
+                )
+            )
             total += subtotal
         p.total = round(total, 2)
 
-    db.add(p); db.commit(); db.refresh(p)
-    return p
\ No newline at end of file
+    db.add(p)
+    on_commit(db, dashboard.invalidate)
+    on_commit(db, catalogue.bump)
+    return p
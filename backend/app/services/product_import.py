@@ -0,0 +1,153 @@
+import csv
+import io
+from typing import Iterable, List
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import literal_column
+from sqlmodel import Session, select
+
+from ..db import on_commit, transactional
+from ..models import Product
+from ..schemas import ProductCreate
+from ..utils import normalize_sku
+from . import catalogue, dashboard
+from .stock_ledger import record_opening
+
+# Rows per executemany call; bounds the parameter list held per round trip
+BATCH_ROWS = 1000
+
+# Columns an import may overwrite on an existing SKU. Stock is only taken
+# for new products; existing stock moves through purchases and sales.
+UPDATABLE = ("name", "unit", "price", "cost_price", "reorder_level")
+
+
+def parse_csv(text: str) -> List[tuple[int, dict]]:
+    """(line number, raw fields) per data row; blank cells count as absent."""
+    reader = csv.DictReader(io.StringIO(text))
+    return [
+        (
+            reader.line_num,
+            {
+                k.strip(): v.strip()
+                for k, v in row.items()
+                if k and v is not None and v.strip() != ""
+            },
+        )
+        for row in reader
+    ]
+
+
+def parse_ndjson(text: str) -> List[tuple[int, dict]]:
+    out = []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            obj = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            obj = None
+        out.append(
+            (line_no, obj if isinstance(obj, dict) else {"__invalid__": line[:80]})
+        )
+    return out
+
+
+def _upsert(db: Session, rows: List[dict], fields: frozenset) -> set[str]:
+    """
+    Insert or update `rows` by SKU; returns the SKUs this call inserted.
+    PostgreSQL reports it per row: xmax is 0 only on a row version the
+    statement inserted, so a product another import or create commits
+    meanwhile counts as updated. SQLite has a single writer; a concurrent
+    commit after the SELECT makes this transaction fail instead.
+    """
+    table = Product.__table__
+    postgres = db.get_bind().dialect.name == "postgresql"
+    insert = pg_insert if postgres else sqlite_insert
+    stmt = insert(table)
+    # name, price and cost_price are required, so `fields` is never empty
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.sku],
+        set_={c: stmt.excluded[c] for c in UPDATABLE if c in fields},
+    )
+    if postgres:
+        stmt = stmt.returning(table.c.sku, literal_column("xmax = 0").label("inserted"))
+    inserted: set[str] = set()
+    # One compiled statement run as executemany: compiling a multi-row VALUES
+    # clause per batch costs more than the round trips it saves
+    for i in range(0, len(rows), BATCH_ROWS):
+        batch = rows[i : i + BATCH_ROWS]
+        if postgres:
+            inserted.update(r.sku for r in db.execute(stmt, batch) if r.inserted)
+            continue
+        skus = [r["sku"] for r in batch]
+        existing = set(db.exec(select(Product.sku).where(Product.sku.in_(skus))))
+        db.execute(stmt, batch)
+        inserted.update(sku for sku in skus if sku not in existing)
+    return inserted
+
+
+@transactional
+def import_products(db: Session, records: Iterable[tuple[int, dict]]) -> dict:
+    """
+    Validate and upsert products by normalised SKU. Invalid rows are reported
+    and skipped; when a SKU repeats in the file the last row wins. On an
+    existing SKU only the columns the row supplies are updated.
+    Returns counts plus a {line, sku, status, error} entry per row.
+    """
+    report: List[dict] = []
+    by_sku: dict[str, tuple[int, dict, frozenset]] = {}
+    for line, raw in records:
+        entry = {"line": line, "sku": None, "status": "error", "error": None}
+        report.append(entry)
+        if "__invalid__" in raw:
+            entry["error"] = "Not a JSON object"
+            continue
+        try:
+            item = ProductCreate.model_validate(raw)
+        except ValidationError as e:
+            entry["sku"] = raw.get("sku")
+            entry["error"] = "; ".join(
+                f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}"
+                for err in e.errors()
+            )
+            continue
+        sku = normalize_sku(item.sku)
+        entry["sku"] = sku
+        if not sku:
+            entry["error"] = "sku: must not be blank"
+            continue
+        if sku in by_sku:
+            earlier = report[by_sku[sku][0]]
+            earlier["status"], earlier["error"] = (
+                "skipped",
+                f"SKU repeated on line {line}",
+            )
+        row = item.model_dump()
+        row["sku"] = sku
+        by_sku[sku] = (len(report) - 1, row, frozenset(raw) & set(UPDATABLE))
+
+    # One statement shape per set of supplied columns (usually just one)
+    groups: dict[frozenset, List[dict]] = {}
+    for _, row, fields in by_sku.values():
+        groups.setdefault(fields, []).append(row)
+    inserted: set[str] = set()
+    for fields, rows in groups.items():
+        inserted |= _upsert(db, rows, fields)
+    for sku, (idx, _, _) in by_sku.items():
+        report[idx]["status"] = "inserted" if sku in inserted else "updated"
+    # New products start their stock ledger with an opening movement
+    new_skus = sorted(inserted)
+    for i in range(0, len(new_skus), BATCH_ROWS):
+        record_opening(db, Product.sku.in_(new_skus[i : i + BATCH_ROWS]))
+
+    if by_sku:
+        on_commit(db, dashboard.invalidate)
+        on_commit(db, catalogue.bump)
+    counts = {
+        s: sum(1 for r in report if r["status"] == s)
+        for s in ("inserted", "updated", "skipped", "error")
+    }
+    return {**counts, "rows": report}
@@ -0,0 +1,183 @@
+from datetime import date, datetime, timedelta
+from statistics import NormalDist
+from typing import List
+
+import numpy as np
+from sqlalchemy import Integer, cast, func
+from sqlmodel import Session, select
+
+from ..models import Product
+from .sales_rollup import rollup_rows
+
+DEFAULT_WINDOW_DAYS = 90
+DEFAULT_LEAD_TIME_DAYS = 7
+DEFAULT_REVIEW_DAYS = 7
+DEFAULT_SERVICE_LEVEL = 0.95
+
+
+def _fetch(db: Session, stmt):
+    """
+    Raw result tuples straight off the DBAPI cursor; building a Row per sale
+    day costs more than the query itself. Only for numeric columns.
+    """
+    return db.connection().execute(stmt).cursor.fetchall()
+
+
+def _load(db: Session, start: date, end: date):
+    """
+    Product ids and stock, plus their per-day sales over [start, end] from
+    the daily rollup, as columns: one entry per rollup or unfolded delta row.
+    """
+    products = np.array(
+        _fetch(
+            db,
+            select(Product.id, func.coalesce(Product.stock_qty, 0.0)).order_by(
+                Product.id
+            ),
+        ),
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    rollup = rollup_rows(start, end)
+    if db.get_bind().dialect.name == "postgresql":
+        # One row of three arrays (date - date is an integer): psycopg decodes
+        # arrays in C, about twice as fast as the same data as row tuples
+        pid, offset, qty = _fetch(
+            db,
+            select(
+                func.array_agg(rollup.c.product_id),
+                func.array_agg(rollup.c.day - start),
+                func.array_agg(rollup.c.qty),
+            ),
+        )[0]
+        sales = np.array([pid or [], offset or [], qty or []], dtype=np.float64).T
+    else:
+        offset = cast(
+            func.julianday(rollup.c.day) - func.julianday(start.isoformat()), Integer
+        )
+        sales = np.array(
+            _fetch(db, select(rollup.c.product_id, offset, rollup.c.qty)),
+            dtype=np.float64,
+        ).reshape(-1, 3)
+    return (
+        products[:, 0].astype(np.int64),
+        products[:, 1],
+        sales[:, 0].astype(np.int64),
+        sales[:, 1].astype(np.int64),
+        sales[:, 2],
+    )
+
+
+def reorder_plan(
+    ids: np.ndarray,
+    stock: np.ndarray,
+    sale_pid: np.ndarray,
+    sale_offset: np.ndarray,
+    sale_qty: np.ndarray,
+    window_days: int,
+    lead_time_days: float = DEFAULT_LEAD_TIME_DAYS,
+    review_days: float = DEFAULT_REVIEW_DAYS,
+    service_level: float = DEFAULT_SERVICE_LEVEL,
+) -> dict:
+    """
+    Demand statistics and order quantities for every product at once.
+
+    `ids` must be sorted; sales are (product id, day offset into the window,
+    qty) triples, duplicates allowed. Days without sales count as zero
+    demand. Order-up-to policy: cover the lead time plus one review period
+    at the mean daily velocity, plus safety stock for the service level.
+    """
+    n = len(ids)
+    row = np.searchsorted(ids, sale_pid)
+    demand = np.bincount(
+        row * window_days + sale_offset, weights=sale_qty, minlength=n * window_days
+    ).reshape(n, window_days)
+
+    velocity = demand.mean(axis=1)
+    std = demand.std(axis=1, ddof=1) if window_days > 1 else np.zeros(n)
+    z = NormalDist().inv_cdf(service_level)
+    horizon = lead_time_days + review_days
+    safety = z * std * np.sqrt(horizon)
+    on_hand = np.maximum(stock, 0.0)
+    return {
+        "velocity": velocity,
+        "std": std,
+        "days_of_cover": np.divide(
+            on_hand, velocity, out=np.full(n, np.inf), where=velocity > 0
+        ),
+        "reorder_point": velocity * lead_time_days + z * std * np.sqrt(lead_time_days),
+        "suggested_qty": np.ceil(
+            np.maximum(velocity * horizon + safety - on_hand, 0.0)
+        ),
+    }
+
+
+def reorder_report(
+    db: Session,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    lead_time_days: float = DEFAULT_LEAD_TIME_DAYS,
+    review_days: float = DEFAULT_REVIEW_DAYS,
+    service_level: float = DEFAULT_SERVICE_LEVEL,
+    only_needed: bool = True,
+    limit: int = 100,
+    today: date | None = None,
+) -> List[dict]:
+    """
+    Products ordered by days of cover (shortest first) over a trailing
+    window ending `today`; with only_needed, just those with a suggested
+    order. Replaces the static stock_qty <= reorder_level threshold.
+    """
+    end = today or datetime.utcnow().date()
+    start = end - timedelta(days=window_days - 1)
+    ids, stock, sale_pid, sale_offset, sale_qty = _load(db, start, end)
+    if not len(ids):
+        return []
+    plan = reorder_plan(
+        ids,
+        stock,
+        sale_pid,
+        sale_offset,
+        sale_qty,
+        window_days,
+        lead_time_days,
+        review_days,
+        service_level,
+    )
+
+    cover, velocity = plan["days_of_cover"], plan["velocity"]
+    order = np.lexsort((-velocity, cover))
+    if only_needed:
+        order = order[plan["suggested_qty"][order] > 0]
+    order = order[:limit].tolist()
+    # Names only for the rows we return
+    products = {
+        p.id: p
+        for p in db.exec(
+            select(
+                Product.id,
+                Product.sku,
+                Product.name,
+                Product.stock_qty,
+                Product.reorder_level,
+            ).where(Product.id.in_([int(ids[i]) for i in order]))
+        ).all()
+    }
+    out = []
+    for i in order:
+        p = products[int(ids[i])]
+        out.append(
+            {
+                "product_id": p.id,
+                "sku": p.sku,
+                "name": p.name,
+                "stock_qty": p.stock_qty,
+                "reorder_level": p.reorder_level,
+                "velocity": round(float(velocity[i]), 4),
+                "daily_std": round(float(plan["std"][i]), 4),
+                "days_of_cover": None
+                if np.isinf(cover[i])
+                else round(float(cover[i]), 1),
+                "reorder_point": round(float(plan["reorder_point"][i]), 2),
+                "suggested_qty": float(plan["suggested_qty"][i]),
+            }
+        )
+    return out
@@ -0,0 +1,347 @@
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List
+
+from sqlalchemy import delete, func, insert, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from ..db import transactional
+from ..models import DailySales, PaymentMethod, Product, Sale, SaleItem, SalesDelta
+
+# (day, product_id, payment_method) -> [qty, revenue, cost]
+Totals = Dict[tuple[date, int, PaymentMethod], List[float]]
+
+
+def add_sale(
+    totals: Totals, sale: Sale, lines: Iterable[dict], cost_of: Dict[int, float]
+) -> None:
+    """Fold one sale's lines ({product_id, qty, unit_price}) into `totals`."""
+    day = (sale.created_at or datetime.utcnow()).date()
+    for it in lines:
+        pid, qty = int(it["product_id"]), float(it["qty"])
+        row = totals[(day, pid, PaymentMethod(sale.payment_method))]
+        row[0] += qty
+        row[1] += qty * float(it["unit_price"])
+        row[2] += qty * float(cost_of.get(pid) or 0.0)
+
+
+def new_totals() -> Totals:
+    return defaultdict(lambda: [0.0, 0.0, 0.0])
+
+
+def apply(db: Session, totals: Totals) -> None:
+    """
+    Append `totals` as SalesDelta rows (one executemany) in the sale's
+    transaction. Upserting DailySales here would hold its row lock until
+    commit and queue every other sale of the product that day behind it.
+    """
+    if not totals:
+        return
+    db.execute(
+        insert(SalesDelta),
+        [
+            {
+                "day": day,
+                "product_id": pid,
+                "payment_method": method,
+                "qty": qty,
+                "revenue": round(revenue, 2),
+                "cost": round(cost, 2),
+            }
+            for (day, pid, method), (qty, revenue, cost) in sorted(totals.items())
+        ],
+    )
+
+
+def _upsert(db: Session, totals: Totals) -> None:
+    """
+    Add `totals` to DailySales with one INSERT ... ON CONFLICT DO UPDATE,
+    run as executemany in key order (the same order every fold locks in).
+    """
+    if not totals:
+        return
+    table = DailySales.__table__
+    insert_ = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert_(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.product_id, table.c.payment_method],
+        set_={c: table.c[c] + stmt.excluded[c] for c in ("qty", "revenue", "cost")},
+    )
+    db.execute(
+        stmt,
+        [
+            {
+                "day": day,
+                "product_id": pid,
+                "payment_method": method,
+                "qty": qty,
+                "revenue": round(revenue, 2),
+                "cost": round(cost, 2),
+            }
+            for (day, pid, method), (qty, revenue, cost) in sorted(totals.items())
+        ],
+    )
+
+
+@transactional
+def fold_deltas(db: Session) -> int:
+    """
+    Move the committed SalesDelta rows into DailySales. DELETE ... RETURNING
+    hands back exactly the rows it removed, so a sale committing meanwhile is
+    left for the next fold. Returns the number of deltas folded.
+    """
+    rows = db.execute(
+        delete(SalesDelta).returning(
+            SalesDelta.day,
+            SalesDelta.product_id,
+            SalesDelta.payment_method,
+            SalesDelta.qty,
+            SalesDelta.revenue,
+            SalesDelta.cost,
+        )
+    ).all()
+    totals = new_totals()
+    for day, pid, method, qty, revenue, cost in rows:
+        row = totals[(day, pid, PaymentMethod(method))]
+        row[0] += qty
+        row[1] += revenue
+        row[2] += cost
+    _upsert(db, totals)
+    return len(rows)
+
+
+def _fold(engine: Engine) -> int:
+    with Session(engine) as db:
+        return fold_deltas(db)
+
+
+async def fold_periodically(engine: Engine, every: float) -> None:
+    """
+    Fold now and then every `every` seconds until cancelled, so reports never
+    read more than that long a tail of SalesDelta rows. Run by the app from
+    startup; a failed fold (e.g. a lock timeout) is retried on the next tick.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(_fold, engine)
+        except DBAPIError as e:
+            print(f"Warning: sales delta fold failed: {e}")
+        await asyncio.sleep(every)
+
+
+def rollup_rows(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    payment_method: PaymentMethod | None = None,
+):
+    """
+    DailySales rows in the window plus the deltas not folded in yet, as one
+    UNION ALL subquery with DailySales' columns. Every report reads this;
+    rows may repeat a key, so aggregate.
+    """
+    parts = []
+    for model in (DailySales, SalesDelta):
+        clauses = []
+        if date_from is not None:
+            clauses.append(model.day >= date_from)
+        if date_to is not None:
+            clauses.append(model.day <= date_to)
+        if payment_method is not None:
+            clauses.append(model.payment_method == payment_method)
+        parts.append(
+            select(
+                model.day,
+                model.product_id,
+                model.payment_method,
+                model.qty,
+                model.revenue,
+                model.cost,
+            ).where(*clauses)
+        )
+    return union_all(*parts).subquery("rollup")
+
+
+def _from_history(date_from: date | None = None):
+    """SaleItem aggregated to rollup rows, optionally from a day onwards."""
+    day = func.date(Sale.created_at)
+    stmt = (
+        select(
+            day.label("day"),
+            SaleItem.product_id,
+            Sale.payment_method,
+            func.sum(SaleItem.qty).label("qty"),
+            func.sum(SaleItem.subtotal).label("revenue"),
+            func.sum(SaleItem.qty * Product.cost_price).label("cost"),
+        )
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .join(Product, Product.id == SaleItem.product_id)
+        .group_by(day, SaleItem.product_id, Sale.payment_method)
+    )
+    if date_from is not None:
+        stmt = stmt.where(Sale.created_at >= datetime.combine(date_from, time.min))
+    return stmt
+
+
+@transactional
+def backfill_sales_rollup(db: Session, date_from: date | None = None) -> int:
+    """
+    Replace the rollup and its pending deltas (from `date_from`, or
+    entirely) with an aggregate of the sale lines. Historical cost uses today's cost_price, since sale
+    lines don't record it. Returns the number of rollup rows written.
+    """
+    for model in (DailySales, SalesDelta):
+        clear = delete(model)
+        if date_from is not None:
+            clear = clear.where(model.day >= date_from)
+        db.execute(clear)
+    result = db.execute(
+        insert(DailySales)
+        .from_select(
+            ["day", "product_id", "payment_method", "qty", "revenue", "cost"],
+            _from_history(date_from),
+        )
+        .execution_options(preserve_rowcount=True)
+    )
+    return result.rowcount
+
+
+def verify_sales_rollup(db: Session) -> List[dict]:
+    """Rollup keys (deltas included) whose qty or revenue disagree with the sale lines."""
+    expected = {
+        (
+            date.fromisoformat(str(r.day)[:10]),
+            r.product_id,
+            PaymentMethod(r.payment_method),
+        ): (float(r.qty), float(r.revenue))
+        for r in db.exec(_from_history()).all()
+    }
+    rollup = rollup_rows()
+    stored = {
+        (r.day, r.product_id, PaymentMethod(r.payment_method)): (r.qty, r.revenue)
+        for r in db.exec(
+            select(
+                rollup.c.day,
+                rollup.c.product_id,
+                rollup.c.payment_method,
+                func.sum(rollup.c.qty).label("qty"),
+                func.sum(rollup.c.revenue).label("revenue"),
+            ).group_by(rollup.c.day, rollup.c.product_id, rollup.c.payment_method)
+        ).all()
+    }
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        want, have = expected.get(key, (0.0, 0.0)), stored.get(key, (0.0, 0.0))
+        if abs(want[0] - have[0]) > 1e-6 or abs(want[1] - have[1]) > 0.005:
+            drift.append(
+                {
+                    "day": key[0].isoformat(),
+                    "product_id": key[1],
+                    "payment_method": key[2].value,
+                    "stored_qty": have[0],
+                    "expected_qty": want[0],
+                    "stored_revenue": have[1],
+                    "expected_revenue": want[1],
+                }
+            )
+    return drift
+
+
+def _bucket(day: date, period: str) -> date:
+    if period == "week":
+        return day - timedelta(days=day.weekday())  # ISO week, starting Monday
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def sales_by_period(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    period: str = "day",
+    payment_method: PaymentMethod | None = None,
+) -> List[dict]:
+    """
+    Totals per day, week or month over [date_from, date_to]. Reads one row
+    per day from the rollup, so the cost follows the window, not the sales.
+    """
+    rollup = rollup_rows(date_from, date_to, payment_method)
+    rows = db.exec(
+        select(
+            rollup.c.day,
+            func.sum(rollup.c.qty),
+            func.sum(rollup.c.revenue),
+            func.sum(rollup.c.cost),
+        )
+        .group_by(rollup.c.day)
+        .order_by(rollup.c.day)
+    ).all()
+    buckets: Dict[date, List[float]] = {}
+    for day, qty, revenue, cost in rows:
+        b = buckets.setdefault(_bucket(day, period), [0.0, 0.0, 0.0])
+        b[0] += qty or 0.0
+        b[1] += revenue or 0.0
+        b[2] += cost or 0.0
+    return [
+        {
+            "period": start,
+            "qty": qty,
+            "revenue": round(revenue, 2),
+            "cost": round(cost, 2),
+            "margin": round(revenue - cost, 2),
+        }
+        for start, (qty, revenue, cost) in buckets.items()
+    ]
+
+
+def top_products(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    limit: int = 10,
+    by: str = "qty",
+    payment_method: PaymentMethod | None = None,
+) -> List[dict]:
+    """Best sellers over [date_from, date_to] by qty or revenue, from the rollup."""
+    rollup = rollup_rows(date_from, date_to, payment_method)
+    qty = func.sum(rollup.c.qty).label("qty")
+    revenue = func.sum(rollup.c.revenue).label("revenue")
+    cost = func.sum(rollup.c.cost).label("cost")
+    ranked = (
+        select(rollup.c.product_id, qty, revenue, cost)
+        .group_by(rollup.c.product_id)
+        .order_by((revenue if by == "revenue" else qty).desc(), rollup.c.product_id)
+        .limit(limit)
+        .subquery()
+    )
+    rows = db.exec(
+        select(
+            Product.id,
+            Product.sku,
+            Product.name,
+            ranked.c.qty,
+            ranked.c.revenue,
+            ranked.c.cost,
+        )
+        .join(ranked, ranked.c.product_id == Product.id)
+        .order_by(
+            (ranked.c.revenue if by == "revenue" else ranked.c.qty).desc(), Product.id
+        )
+    ).all()
+    return [
+        {
+            "product_id": r.id,
+            "sku": r.sku,
+            "name": r.name,
+            "qty": float(r.qty),
+            "revenue": round(float(r.revenue), 2),
+            "cost": round(float(r.cost), 2),
+            "margin": round(float(r.revenue) - float(r.cost), 2),
+        }
+        for r in rows
+    ]
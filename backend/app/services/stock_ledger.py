@@ -0,0 +1,332 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List
+
+from sqlalchemy import and_, delete, func, insert, literal, or_
+from sqlmodel import Session, select
+
+from ..db import transactional
+from ..models import (
+    Product,
+    Purchase,
+    PurchaseItem,
+    Sale,
+    SaleItem,
+    StockMovement,
+    StockReason,
+    StockSnapshot,
+)
+
+# Snapshots are taken as of a cutoff slightly in the past, so movements from
+# transactions still open at the cutoff have committed by the time we fold.
+SNAPSHOT_LAG = timedelta(minutes=5)
+
+_MOVEMENT_COLUMNS = ["product_id", "delta", "reason", "source_id", "created_at"]
+
+
+def movements_for(
+    deltas: Dict[int, float],
+    reason: StockReason,
+    source_id: int | None = None,
+    at: datetime | None = None,
+) -> List[dict]:
+    """Ledger rows for a {product_id: delta} change; zero deltas are dropped."""
+    at = at or datetime.utcnow()
+    return [
+        {
+            "product_id": pid,
+            "delta": delta,
+            "reason": reason,
+            "source_id": source_id,
+            "created_at": at,
+        }
+        for pid, delta in sorted(deltas.items())
+        if delta
+    ]
+
+
+def record_movements(db: Session, rows: List[dict]) -> None:
+    """Append ledger rows in one executemany, inside the caller's transaction."""
+    if rows:
+        db.execute(insert(StockMovement), rows)
+
+
+def record_opening(db: Session, *where) -> None:
+    """Opening movements for the products matching `where`, at their current stock."""
+    db.execute(
+        insert(StockMovement).from_select(
+            _MOVEMENT_COLUMNS,
+            select(
+                Product.id,
+                Product.stock_qty,
+                literal(StockReason.opening, StockMovement.reason.type),
+                literal(None, StockMovement.source_id.type),
+                literal(datetime.utcnow(), StockMovement.created_at.type),
+            ).where(*where, Product.stock_qty != 0),
+        )
+    )
+
+
+def forget_product(db: Session, product_id: int) -> None:
+    """Drop the ledger of a product being deleted (only allowed without sales/purchases)."""
+    db.execute(delete(StockSnapshot).where(StockSnapshot.product_id == product_id))
+    db.execute(delete(StockMovement).where(StockMovement.product_id == product_id))
+
+
+def _snapshot_time(at: datetime):
+    """Correlated: the product's latest snapshot time at or before `at`."""
+    return (
+        select(func.max(StockSnapshot.taken_at))
+        .where(StockSnapshot.product_id == Product.id, StockSnapshot.taken_at <= at)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+
+
+def _qty_at(at: datetime):
+    """
+    Correlated stock-on-hand expression for Product rows: the latest snapshot
+    plus the movements after it. Both lookups are index range scans, so the
+    cost per product is bounded by the snapshot interval, not the history.
+    """
+    snap_at = _snapshot_time(at)
+    base = (
+        select(StockSnapshot.qty)
+        .where(
+            StockSnapshot.product_id == Product.id, StockSnapshot.taken_at == snap_at
+        )
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    tail = (
+        select(func.coalesce(func.sum(StockMovement.delta), 0.0))
+        .where(
+            StockMovement.product_id == Product.id,
+            StockMovement.created_at <= at,
+            StockMovement.created_at > func.coalesce(snap_at, datetime.min),
+        )
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    return func.coalesce(base, 0.0) + tail
+
+
+def stock_at(
+    db: Session, at: datetime, product_ids: List[int] | None = None
+) -> List[dict]:
+    """Stock on hand per product as of `at`, ordered by product id."""
+    stmt = select(
+        Product.id, Product.sku, Product.name, _qty_at(at).label("qty")
+    ).order_by(Product.id)
+    if product_ids:
+        stmt = stmt.where(Product.id.in_(product_ids))
+    return [
+        {
+            "product_id": r.id,
+            "sku": r.sku,
+            "name": r.name,
+            "qty": round(float(r.qty), 6),
+        }
+        for r in db.exec(stmt).all()
+    ]
+
+
+@transactional
+def take_snapshots(db: Session, at: datetime | None = None) -> int:
+    """
+    Snapshot every product with movements since its previous snapshot, as of
+    `at` (default: now minus SNAPSHOT_LAG). Products that didn't move keep
+    their older snapshot. Returns the number of snapshots written.
+    """
+    at = at or datetime.utcnow() - SNAPSHOT_LAG
+    # A scalar "latest movement" probe per product; an EXISTS here gets
+    # flattened into a semi-join over the whole history up to `at`
+    last_moved = (
+        select(func.max(StockMovement.created_at))
+        .where(StockMovement.product_id == Product.id, StockMovement.created_at <= at)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    moved = last_moved > func.coalesce(_snapshot_time(at), datetime.min)
+    result = db.execute(
+        insert(StockSnapshot)
+        .from_select(
+            ["product_id", "taken_at", "qty"],
+            select(
+                Product.id, literal(at, StockSnapshot.taken_at.type), _qty_at(at)
+            ).where(moved),
+        )
+        .execution_options(preserve_rowcount=True)
+    )  # psycopg reports -1 otherwise
+    return result.rowcount
+
+
+def _backfill_untracked(db: Session) -> None:
+    """
+    Reconstruct movements from purchase and sale lines for products that have
+    no ledger yet, plus an opening movement for whatever the lines don't
+    explain (stock set at creation or edited by hand).
+    """
+    marker = db.exec(select(func.coalesce(func.max(StockMovement.id), 0))).one()
+
+    # Evaluated once per product, then semi-joined to the (much longer) line tables
+    untracked = select(Product.id).where(
+        ~(
+            select(StockMovement.id)
+            .where(StockMovement.product_id == Product.id, StockMovement.id <= marker)
+            .correlate(Product)
+            .exists()
+        )
+    )
+
+    db.execute(
+        insert(StockMovement).from_select(
+            _MOVEMENT_COLUMNS,
+            select(
+                PurchaseItem.product_id,
+                func.sum(PurchaseItem.qty),
+                literal(StockReason.purchase, StockMovement.reason.type),
+                Purchase.id,
+                Purchase.created_at,
+            )
+            .join(Purchase, Purchase.id == PurchaseItem.purchase_id)
+            .where(PurchaseItem.product_id.in_(untracked))
+            .group_by(PurchaseItem.product_id, Purchase.id, Purchase.created_at),
+        )
+    )
+    db.execute(
+        insert(StockMovement).from_select(
+            _MOVEMENT_COLUMNS,
+            select(
+                SaleItem.product_id,
+                -func.sum(SaleItem.qty),
+                literal(StockReason.sale, StockMovement.reason.type),
+                Sale.id,
+                Sale.created_at,
+            )
+            .join(Sale, Sale.id == SaleItem.sale_id)
+            .where(SaleItem.product_id.in_(untracked))
+            .group_by(SaleItem.product_id, Sale.id, Sale.created_at),
+        )
+    )
+
+    new = and_(StockMovement.product_id == Product.id, StockMovement.id > marker)
+    explained = (
+        select(func.coalesce(func.sum(StockMovement.delta), 0.0))
+        .where(new)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    first_seen = (
+        select(func.min(StockMovement.created_at))
+        .where(new)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    opening = Product.stock_qty - explained
+    db.execute(
+        insert(StockMovement).from_select(
+            _MOVEMENT_COLUMNS,
+            select(
+                Product.id,
+                opening,
+                literal(StockReason.opening, StockMovement.reason.type),
+                literal(None, StockMovement.source_id.type),
+                func.coalesce(
+                    first_seen,
+                    literal(datetime.utcnow(), StockMovement.created_at.type),
+                ),
+            ).where(Product.id.in_(untracked), func.abs(opening) > 1e-9),
+        )
+    )
+
+
+@transactional
+def rebuild_stock_ledger(db: Session, fix: bool = True) -> List[dict]:
+    """
+    Compare every product's stock_qty with the sum of its movements and
+    report drift. With fix=True, products without a ledger get one rebuilt
+    from their purchase and sale history, and any remaining difference is
+    booked as an adjustment movement (the ledger itself is never rewritten).
+    """
+    ledger = dict(
+        db.exec(
+            select(StockMovement.product_id, func.sum(StockMovement.delta)).group_by(
+                StockMovement.product_id
+            )
+        ).all()
+    )
+    drift = [
+        {
+            "product_id": pid,
+            "stored_qty": qty,
+            "ledger_qty": round(float(ledger.get(pid) or 0.0), 6),
+        }
+        for pid, qty in db.exec(
+            select(Product.id, Product.stock_qty).order_by(Product.id)
+        ).all()
+        if abs((qty or 0.0) - float(ledger.get(pid) or 0.0)) > 1e-6
+    ]
+    if not fix:
+        return drift
+
+    _backfill_untracked(db)
+    summed = (
+        select(func.coalesce(func.sum(StockMovement.delta), 0.0))
+        .where(StockMovement.product_id == Product.id)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    db.execute(
+        insert(StockMovement).from_select(
+            _MOVEMENT_COLUMNS,
+            select(
+                Product.id,
+                Product.stock_qty - summed,
+                literal(StockReason.adjustment, StockMovement.reason.type),
+                literal(None, StockMovement.source_id.type),
+                literal(datetime.utcnow(), StockMovement.created_at.type),
+            ).where(func.abs(Product.stock_qty - summed) > 1e-6),
+        )
+    )
+    return drift
+
+
+def movement_history(
+    db: Session,
+    product_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    after: tuple[datetime, int] | None = None,
+    limit: int = 500,
+) -> tuple[List[StockMovement], tuple[datetime, int] | None]:
+    """One keyset page of movements, newest first. Returns (rows, next_key)."""
+    stmt = (
+        select(StockMovement)
+        .order_by(StockMovement.created_at.desc(), StockMovement.id.desc())
+        .limit(limit + 1)
+    )
+    if product_id is not None:
+        stmt = stmt.where(StockMovement.product_id == product_id)
+    if date_from is not None:
+        stmt = stmt.where(
+            StockMovement.created_at >= datetime.combine(date_from, time.min)
+        )
+    if date_to is not None:
+        stmt = stmt.where(
+            StockMovement.created_at
+            < datetime.combine(date_to + timedelta(days=1), time.min)
+        )
+    if after is not None:
+        ts, last_id = after
+        stmt = stmt.where(
+            or_(
+                StockMovement.created_at < ts,
+                and_(StockMovement.created_at == ts, StockMovement.id < last_id),
+            )
+        )
+    rows = list(db.exec(stmt).all())
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_key = (rows[-1].created_at, rows[-1].id)
+    return rows, next_key
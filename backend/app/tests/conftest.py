@@ -1,9 +1,50 @@
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
+from app.db import async_engine, engine
 from app.main import app
 
 
 @pytest.fixture(scope="session")
 def client():
     return TestClient(app)
+
+
+class QueryLog:
+    """SQL statements seen while a `count_queries()` block was active."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __repr__(self) -> str:
+        return f"<QueryLog {self.count} statements>\n" + "\n".join(self.statements)
+
+
+@contextmanager
+def count_queries():
+    """Record every statement sent by the sync and async engines."""
+    log = QueryLog()
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        log.statements.append(statement)
+
+    targets = (engine, async_engine.sync_engine)
+    for target in targets:
+        event.listen(target, "before_cursor_execute", _before)
+    try:
+        yield log
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", _before)
+
+
+@pytest.fixture
+def query_counter():
+    return count_queries
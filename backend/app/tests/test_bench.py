@@ -0,0 +1,31 @@
+from app.bench.endpoints import compare, run_suite
+
+from .conftest import client
+
+
+def test_compare_flags_latency_and_query_regressions():
+    base = {"a": {"p50_ms": 10.0, "p95_ms": 20.0, "queries": 2}}
+    same = {"a": {"p50_ms": 11.0, "p95_ms": 21.0, "queries": 2}}
+    assert compare(base, same) == []
+    slower = {"a": {"p50_ms": 15.0, "p95_ms": 20.0, "queries": 2}}
+    assert [p.split(":")[1].split()[0] for p in compare(base, slower)] == ["p50_ms"]
+    chattier = {"a": {"p50_ms": 10.0, "p95_ms": 20.0, "queries": 3}}
+    assert compare(base, chattier) == ["a: queries 2 -> 3"]
+
+
+def test_suite_runs_every_case(client):
+    results = run_suite(iterations=2)
+    assert {
+        "products_page",
+        "dashboard_summary",
+        "credits_summary",
+        "payment_history",
+        "purchases_page",
+        "create_sale",
+        "create_purchase",
+    } <= set(results)
+    assert results["products_not_modified"]["queries"] == 0
+    for name, r in results.items():
+        assert r["p95_ms"] >= r["p50_ms"] > 0
+        if name != "products_not_modified":
+            assert r["queries"] >= 1
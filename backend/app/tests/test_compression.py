@@ -0,0 +1,102 @@
+import gzip
+import json
+import uuid
+
+from .conftest import client
+
+
+def _big_page(client):
+    # Enough products for a multi-KiB catalogue page
+    tag = uuid.uuid4().hex[:6].upper()
+    for i in range(30):
+        client.post(
+            "/products/",
+            json={
+                "name": f"Zip {i}",
+                "sku": f"ZIP-{tag}-{i}",
+                "price": 1.0,
+                "cost_price": 0.5,
+            },
+        )
+
+
+def test_large_json_is_compressed(client):
+    _big_page(client)
+    plain = client.get("/products/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert len(plain.content) > 1024
+
+    raw = client.get("/products/", headers={"Accept-Encoding": "gzip"})
+    # httpx decodes transparently; check the wire headers and the payload
+    assert raw.headers["content-encoding"] == "gzip"
+    assert raw.headers["vary"] == "Accept-Encoding"
+    assert raw.json() == plain.json()
+
+    br = client.get("/products/", headers={"Accept-Encoding": "gzip, br"})
+    assert br.headers["content-encoding"] == "br"
+    assert br.json() == plain.json()
+
+
+def test_compressed_catalogue_gets_a_weak_etag(client):
+    _big_page(client)
+    plain = client.get("/products/", headers={"Accept-Encoding": "identity"})
+    gz = client.get("/products/", headers={"Accept-Encoding": "gzip"})
+    br = client.get("/products/", headers={"Accept-Encoding": "br"})
+    strong = plain.headers["etag"]
+    assert not strong.startswith("W/")
+    # Different bytes on the wire: only a weak validator may be shared
+    assert gz.headers["etag"] == br.headers["etag"] == "W/" + strong
+
+    # Either form revalidates, whatever the encoding of the revalidation
+    for tag, accept in (
+        (strong, "gzip"),
+        (gz.headers["etag"], "identity"),
+        (gz.headers["etag"], "br"),
+    ):
+        r = client.get(
+            "/products/", headers={"If-None-Match": tag, "Accept-Encoding": accept}
+        )
+        assert r.status_code == 304
+        assert r.headers["etag"] == (strong if accept == "identity" else "W/" + strong)
+
+
+def test_small_responses_pass_through(client):
+    r = client.get("/health", headers={"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in r.headers
+    assert r.json() == {"status": "ok"}
+
+
+def test_streamed_body_is_compressed_incrementally():
+    import asyncio
+
+    from app.compression import CompressionMiddleware
+
+    chunks = [json.dumps({"n": i}).encode() + b"\n" for i in range(500)]
+
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")],
+            }
+        )
+        for c in chunks:
+            await send({"type": "http.response.body", "body": c, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app)(scope, receive, send))
+    headers = dict(sent[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip" and b"content-length" not in headers
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    assert gzip.decompress(body) == b"".join(chunks)
+    assert len(sent) == 1 + len(chunks) + 1  # streamed, not buffered
@@ -0,0 +1,30 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.db import db_contention_handler
+
+
+class _Orig(Exception):
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+@pytest.mark.parametrize(
+    "sqlstate,status", [("40P01", 409), ("40001", 409), ("55P03", 503), ("57014", 503)]
+)
+def test_contention_errors_are_retryable(sqlstate, status):
+    exc = DBAPIError("UPDATE product ...", {}, _Orig(sqlstate))
+    r = asyncio.run(db_contention_handler(None, exc))
+    assert r.status_code == status
+    assert r.headers["retry-after"] == "1"
+    assert json.loads(r.body)["sqlstate"] == sqlstate
+
+
+def test_other_db_errors_propagate():
+    exc = DBAPIError("INSERT ...", {}, _Orig("23505"))
+    with pytest.raises(DBAPIError):
+        asyncio.run(db_contention_handler(None, exc))
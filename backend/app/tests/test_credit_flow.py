@@ -1,3 +1,5 @@
+import uuid
+
 from .conftest import client
 
 
@@ -21,3 +23,76 @@ def test_credit_charge_and_payment(client):
 
     bal2 = client.get("/credits/1/balance")
     assert bal2.json() == 30.0
+
+
+def test_credit_balances_match_ledger(client):
+    from sqlmodel import Session
+
+    from app.db import engine
+    from app.services.credits import rebuild_credit_balances
+
+    client.post("/dev/seed")
+    r = client.get("/credits/1/balance")
+    assert r.status_code == 200
+
+    with Session(engine) as db:
+        assert rebuild_credit_balances(db, fix=False) == []
+
+
+def test_payment_history_keyset_pages(client):
+    sku = f"HIST-{uuid.uuid4().hex[:8]}".upper()
+    prod = client.post(
+        "/products/",
+        json={
+            "name": "History item",
+            "sku": sku,
+            "price": 10.0,
+            "cost_price": 6.0,
+            "stock_qty": 100,
+        },
+    ).json()
+    emps = [
+        client.post("/employees/", json={"name": f"History payer {i}"}).json()
+        for i in range(3)
+    ]
+    for emp in emps:
+        client.post(
+            "/sales/",
+            json={
+                "employee_id": emp["id"],
+                "payment_method": "credit",
+                "items": [{"product_id": prod["id"], "qty": 3, "unit_price": 10.0}],
+            },
+        )
+        for amount in (5.0, 7.0, 9.0):
+            client.post(f"/credits/{emp['id']}/payments", json={"amount": amount})
+
+    # Pages are by employee: each appears once, with the total of all its payments
+    seen, pages, cursor = {}, 0, None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/credits/payment-history", params=params)
+        assert r.status_code == 200
+        pages += 1
+        for row in r.json():
+            assert row["employee_id"] not in seen
+            seen[row["employee_id"]] = row
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == (len(seen) + 1) // 2
+    for emp in emps:
+        assert seen[emp["id"]]["total_paid"] == 21.0
+        assert [p["qty"] for p in seen[emp["id"]]["products"]] == [3]
+    only = client.get(
+        "/credits/payment-history", params={"employee_id": emps[0]["id"], "limit": 1}
+    )
+    assert [row["employee_id"] for row in only.json()] == [emps[0]["id"]]
+    assert "X-Next-Cursor" not in only.headers
+    assert (
+        client.get("/credits/payment-history", params={"cursor": "bogus"}).status_code
+        == 400
+    )
@@ -0,0 +1,90 @@
+import uuid
+
+from .conftest import client, count_queries
+
+
+def _seed_credit_employees(client, n: int) -> None:
+    sku = f"CS-{uuid.uuid4().hex[:8]}".upper()
+    prod = client.post(
+        "/products/",
+        json={
+            "name": f"Summary item {sku}",
+            "sku": sku,
+            "price": 10.0,
+            "cost_price": 6.0,
+            "stock_qty": 10_000,
+        },
+    ).json()
+    for i in range(n):
+        emp = client.post("/employees/", json={"name": f"Summary emp {sku}-{i}"}).json()
+        r = client.post(
+            "/sales/",
+            json={
+                "employee_id": emp["id"],
+                "payment_method": "credit",
+                "items": [{"product_id": prod["id"], "qty": 1, "unit_price": 10.0}],
+            },
+        )
+        assert r.status_code == 201
+
+
+def _count_statements(fn) -> int:
+    with count_queries() as log:
+        fn()
+    return log.count
+
+
+def test_credit_summary_query_count_is_constant(client):
+    _seed_credit_employees(client, 2)
+    small = _count_statements(lambda: client.get("/credits/summary"))
+
+    _seed_credit_employees(client, 20)
+    large = _count_statements(lambda: client.get("/credits/summary"))
+
+    assert large == small
+    assert client.get("/credits/summary").status_code == 200
+
+
+def test_manual_charge_lists_the_employees_sales(client):
+    from sqlmodel import Session
+
+    from app.db import engine
+    from app.models import CreditTransaction, CreditType
+    from app.services.credits import apply_to_balance
+
+    sku = f"CSM-{uuid.uuid4().hex[:8]}".upper()
+    prod = client.post(
+        "/products/",
+        json={
+            "name": f"Manual item {sku}",
+            "sku": sku,
+            "price": 4.0,
+            "cost_price": 2.0,
+            "stock_qty": 100,
+        },
+    ).json()
+    emp = client.post("/employees/", json={"name": f"Manual emp {sku}"}).json()
+    client.post(
+        "/sales/",
+        json={
+            "employee_id": emp["id"],
+            "payment_method": "cash",
+            "items": [{"product_id": prod["id"], "qty": 2, "unit_price": 4.0}],
+        },
+    )
+    with Session(engine) as db:
+        txn = CreditTransaction(
+            employee_id=emp["id"], type=CreditType.charge, amount=8.0
+        )
+        db.add(txn)
+        db.flush()
+        apply_to_balance(db, txn)
+        db.commit()
+
+    row = next(
+        r
+        for r in client.get("/credits/summary").json()
+        if r["employee_id"] == emp["id"]
+    )
+    assert row["balance"] == 8.0
+    assert [(p["name"], p["qty"]) for p in row["products"]] == [(prod["name"], 2)]
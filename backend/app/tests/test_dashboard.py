@@ -0,0 +1,33 @@
+import uuid
+
+from .conftest import client
+
+
+def test_dashboard_summary_invalidated_by_writes(client):
+    before = client.get("/dashboard/summary")
+    assert before.status_code == 200
+    body = before.json()
+    assert body["snapshot_age_seconds"] >= 0
+
+    # Served from the snapshot while nothing changes
+    again = client.get("/dashboard/summary").json()
+    assert again["generated_at"] == body["generated_at"]
+
+    sku = f"DASH-{uuid.uuid4().hex[:8]}".upper()
+    r = client.post(
+        "/products/",
+        json={
+            "name": "Dashboard item",
+            "sku": sku,
+            "price": 10.0,
+            "cost_price": 4.0,
+            "stock_qty": 2,
+            "reorder_level": 5,
+        },
+    )
+    assert r.status_code == 201
+
+    after = client.get("/dashboard/summary").json()
+    assert after["total_products"] == body["total_products"] + 1
+    assert after["low_stock"] == body["low_stock"] + 1
+    assert round(after["total_stock_value"] - body["total_stock_value"], 2) == 8.0
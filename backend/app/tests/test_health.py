@@ -5,3 +5,13 @@ def test_healthz(client):
     r = client.get("/healthz")
     assert r.status_code == 200
     assert r.json()["status"] == "ok"
+
+
+def test_health_db_reports_pool_and_latency(client):
+    r = client.get("/health/db")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["status"] == "ok"
+    assert body["db_latency_ms"] is not None
+    assert {"sync", "async"} <= set(body["pools"])
+    assert "status" in body["pools"]["sync"]
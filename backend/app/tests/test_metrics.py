@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.db import engine
+
+from .conftest import client
+
+
+def test_metrics_exposes_route_latency_and_db_statements(client):
+    r = client.get("/products/", params={"limit": 5})
+    assert r.status_code == 200
+    assert "queries" in r.headers["server-timing"]
+
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/products/",status="200"}' in body
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/products/"}' in body
+    )
+    assert 'http_requests_in_flight{route="/products/"} 0' in body
+
+    # The product page issues at least one statement, counted against the route
+    line = next(
+        entry
+        for entry in body.splitlines()
+        if entry.startswith(
+            'http_request_db_statements_sum{method="GET",route="/products/"}'
+        )
+    )
+    assert float(line.rsplit(" ", 1)[1]) >= 1
+
+
+def test_failed_statements_leave_no_timing_state():
+    # after_cursor_execute doesn't run for them; a pooled connection must not keep their start times
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(DBAPIError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+            conn.rollback()
+        conn.exec_driver_sql("SELECT 1")
+        assert "_metrics_t0" not in conn.info
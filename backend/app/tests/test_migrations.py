@@ -0,0 +1,103 @@
+import uuid
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from sqlmodel import SQLModel
+
+from app import migrations
+from app.bench.query_plans import check_plans
+from app.db import engine
+
+from .conftest import client
+
+
+def test_models_match_migrations():
+    # A model change without a migration (or the reverse) shows up here;
+    # `python -m app.manage migrate -m "..."` generates the missing one
+    with engine.connect() as conn:
+        diff = compare_metadata(MigrationContext.configure(conn), SQLModel.metadata)
+    assert diff == []
+
+
+def _create_all_database(path):
+    """A database as create_all() left it before migrations: baseline tables, no version."""
+    old = create_engine(f"sqlite:///{path}")
+    migrations.upgrade(old, migrations.BASELINE)
+    with old.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE alembic_version")
+    return old
+
+
+def test_unversioned_database_is_stamped_and_backfilled(tmp_path):
+    old = _create_all_database(tmp_path / "old.db")
+    with old.begin() as conn:
+        for sql in (
+            "INSERT INTO employee (id, name) VALUES (1, 'Old debtor')",
+            "INSERT INTO product (id, name, sku, unit, price, cost_price, stock_qty, reorder_level)"
+            " VALUES (1, 'Old', 'OLD-1', 'pcs', 25, 10, 38, 5)",
+            "INSERT INTO sale (id, employee_id, created_at, total, payment_method)"
+            " VALUES (1, 1, '2024-03-01 10:00:00', 50, 'credit')",
+            "INSERT INTO saleitem (id, sale_id, product_id, qty, unit_price, subtotal) VALUES (1, 1, 1, 2, 25, 50)",
+            "INSERT INTO credittransaction (id, employee_id, created_at, type, amount, sale_id)"
+            " VALUES (1, 1, '2024-03-01 10:00:00', 'charge', 50, 1)",
+        ):
+            conn.exec_driver_sql(sql)
+
+    migrations.upgrade(old)
+    with old.connect() as conn:
+        assert conn.exec_driver_sql(
+            "SELECT employee_id, outstanding, last_txn_id FROM creditbalance"
+        ).all() == [(1, 50.0, 1)]
+        assert conn.exec_driver_sql(
+            "SELECT product_id, delta, reason FROM stockmovement"
+        ).all() == [(1, 38.0, "opening")]
+        assert conn.exec_driver_sql(
+            "SELECT day, product_id, payment_method, qty, revenue, cost FROM dailysales"
+        ).all() == [("2024-03-01", 1, "credit", 2.0, 50.0, 20.0)]
+
+
+def test_partial_unversioned_database_is_not_stamped(tmp_path):
+    old = _create_all_database(tmp_path / "partial.db")
+    with old.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE saleitem")
+    with pytest.raises(RuntimeError, match="saleitem"):
+        migrations.upgrade(old)
+    assert "alembic_version" not in inspect(old).get_table_names()
+
+
+def test_hot_queries_use_indexes(client):
+    tag = uuid.uuid4().hex[:6].upper()
+    pid = client.post(
+        "/products/",
+        json={
+            "name": f"Plan {tag}",
+            "sku": f"PLAN-{tag}",
+            "price": 2.0,
+            "cost_price": 1.0,
+            "stock_qty": 0,
+        },
+    ).json()["id"]
+    sup = client.post("/suppliers/", json={"name": f"Plan supplier {tag}"}).json()["id"]
+    emp = client.post("/employees/", json={"name": f"Plan employee {tag}"}).json()["id"]
+    client.post(
+        "/purchases/",
+        json={
+            "supplier_id": sup,
+            "items": [{"product_id": pid, "qty": 3, "unit_cost": 1.0}],
+        },
+    )
+    client.post(
+        "/sales/",
+        json={
+            "payment_method": "credit",
+            "employee_id": emp,
+            "items": [{"product_id": pid, "qty": 3, "unit_price": 2.0}],
+        },
+    )
+    client.post(f"/credits/{emp}/payments", json={"amount": 1.0})
+
+    results = check_plans(force_index=True)
+    assert not any(r["skipped"] for r in results)
+    assert [(r["case"], r["scans"]) for r in results if r["scans"]] == []
@@ -0,0 +1,91 @@
+import json
+import uuid
+
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models import StockMovement
+
+from .conftest import client
+
+
+def _product(client, sku):
+    rows = client.get("/products/").json()
+    return next(p for p in rows if p["sku"] == sku)
+
+
+def test_csv_import_inserts_then_updates(client):
+    tag = uuid.uuid4().hex[:6].upper()
+    body = (
+        "sku,name,unit,price,cost_price,stock_qty\n"
+        f" imp-{tag}-a ,Import A,bag,10,6,40\n"
+        f"IMP-{tag}-B,Import B,,5,3,\n"
+        f"IMP-{tag}-C,Import C,unit,not-a-number,1,1\n"
+    )
+    r = client.post(
+        "/products/import", content=body, headers={"Content-Type": "text/csv"}
+    )
+    assert r.status_code == 200
+    out = r.json()
+    assert (out["inserted"], out["updated"], out["skipped"], out["error"]) == (
+        2,
+        0,
+        0,
+        1,
+    )
+    assert [row["status"] for row in out["rows"]] == ["inserted", "inserted", "error"]
+    assert out["rows"][2]["line"] == 4 and out["rows"][2]["error"].startswith("price:")
+
+    a = _product(client, f"IMP-{tag}-A")
+    assert (a["unit"], a["price"], a["stock_qty"]) == ("bag", 10.0, 40.0)
+    assert _product(client, f"IMP-{tag}-B")["unit"] == "unit"
+
+    # Second pass: price change only; stock and unspecified columns stay put
+    body = f"sku,name,price,cost_price,stock_qty\nimp-{tag}-a,Import A v2,12,7,999\n"
+    out = client.post(
+        "/products/import", content=body, headers={"Content-Type": "text/csv"}
+    ).json()
+    assert (out["inserted"], out["updated"]) == (0, 1)
+    a = _product(client, f"IMP-{tag}-A")
+    assert (a["name"], a["price"], a["unit"], a["stock_qty"]) == (
+        "Import A v2",
+        12.0,
+        "bag",
+        40.0,
+    )
+    # Only the first pass inserted it, so only that pass opened its ledger
+    with Session(engine) as db:
+        reasons = db.exec(
+            select(StockMovement.reason).where(StockMovement.product_id == a["id"])
+        ).all()
+    assert [r.value for r in reasons] == ["opening"]
+
+
+def test_ndjson_import_last_duplicate_wins(client):
+    tag = uuid.uuid4().hex[:6].upper()
+    lines = [
+        {"sku": f"nd-{tag}", "name": "First", "price": 1, "cost_price": 1},
+        "not json",
+        {"sku": f"ND-{tag}", "name": "Second", "price": 2, "cost_price": 1},
+    ]
+    body = "\n".join(x if isinstance(x, str) else json.dumps(x) for x in lines)
+    r = client.post(
+        "/products/import",
+        params={"errors_only": True},
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    out = r.json()
+    assert (out["inserted"], out["skipped"], out["error"]) == (1, 1, 1)
+    assert [(row["line"], row["status"]) for row in out["rows"]] == [
+        (1, "skipped"),
+        (2, "error"),
+    ]
+    assert _product(client, f"ND-{tag}")["name"] == "Second"
+
+
+def test_empty_import_rejected(client):
+    r = client.post(
+        "/products/import", content=b"  \n", headers={"Content-Type": "text/csv"}
+    )
+    assert r.status_code == 400
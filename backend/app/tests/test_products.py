@@ -1,4 +1,6 @@
-from .conftest import client
+import uuid
+
+from .conftest import client, count_queries
 
 
 def test_create_and_list_products(client):
@@ -17,3 +19,91 @@ def test_create_and_list_products(client):
     r2 = client.get("/products/")
     assert r2.status_code == 200
     assert any(x["sku"] == "SALT-500G" for x in r2.json())
+
+
+def test_list_products_keyset_pages_and_filters(client):
+    unit = "pg-" + uuid.uuid4().hex[:6]
+    for i in range(5):
+        r = client.post(
+            "/products/",
+            json={
+                "name": f"Paged {i}",
+                "sku": f"{unit}-{i}".upper(),
+                "unit": unit,
+                "price": 10.0 + i,
+                "cost_price": 5.0,
+                "stock_qty": 1 if i < 2 else 50,
+                "reorder_level": 5,
+            },
+        )
+        assert r.status_code == 201
+
+    seen, cursor = [], None
+    while True:
+        params = {"unit": unit, "limit": 2, "include_total": True}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/products/", params=params)
+        assert r.status_code == 200
+        assert r.headers["X-Total-Count"] == "5"
+        seen += [p["name"] for p in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [f"Paged {i}" for i in range(5)]
+
+    low = client.get("/products/", params={"unit": unit, "low_stock": True}).json()
+    assert {p["name"] for p in low} == {"Paged 0", "Paged 1"}
+
+    priced = client.get(
+        "/products/", params={"unit": unit, "min_price": 12, "max_price": 13}
+    ).json()
+    assert [p["name"] for p in priced] == ["Paged 2", "Paged 3"]
+
+
+def test_catalogue_etag_and_not_modified(client):
+    sku = "ETAG-" + uuid.uuid4().hex[:6].upper()
+    r = client.post(
+        "/products/",
+        json={
+            "name": "Etag probe",
+            "sku": sku,
+            "price": 3.0,
+            "cost_price": 1.0,
+            "stock_qty": 10,
+        },
+    )
+    pid = r.json()["id"]
+
+    first = client.get("/products/", params={"limit": 1000})
+    etag = first.headers["ETag"]
+    with count_queries() as log:
+        again = client.get(
+            "/products/", params={"limit": 1000}, headers={"If-None-Match": etag}
+        )
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == etag
+    assert log.count == 0
+
+    # A stock-moving sale changes the catalogue
+    sale = client.post(
+        "/sales/",
+        json={
+            "payment_method": "cash",
+            "items": [{"product_id": pid, "qty": 1, "unit_price": 3.0}],
+        },
+    )
+    assert sale.status_code == 201
+    after_sale = client.get(
+        "/products/", params={"limit": 1000}, headers={"If-None-Match": etag}
+    )
+    assert after_sale.status_code == 200 and after_sale.headers["ETag"] != etag
+    assert next(p for p in after_sale.json() if p["id"] == pid)["stock_qty"] == 9
+
+    # So does a product edit
+    etag = after_sale.headers["ETag"]
+    client.patch(f"/products/{pid}", json={"price": 4.0})
+    edited = client.get(
+        "/products/", params={"limit": 1000}, headers={"If-None-Match": etag}
+    )
+    assert edited.status_code == 200 and edited.headers["ETag"] != etag
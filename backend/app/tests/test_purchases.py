@@ -0,0 +1,48 @@
+import uuid
+
+from .conftest import client
+
+
+def test_list_purchases_pages_and_filters(client):
+    sup = client.post(
+        "/suppliers/", json={"name": f"Pager {uuid.uuid4().hex[:6]}"}
+    ).json()
+    sku = f"PUR-{uuid.uuid4().hex[:8]}".upper()
+    prod = client.post(
+        "/products/",
+        json={
+            "name": "Purchase pager item",
+            "sku": sku,
+            "price": 10.0,
+            "cost_price": 6.0,
+        },
+    ).json()
+    for qty in (1, 2, 3):
+        r = client.post(
+            "/purchases/",
+            json={
+                "supplier_id": sup["id"],
+                "items": [
+                    {"product_id": prod["id"], "qty": qty, "unit_cost": 6.0},
+                    {"product_id": prod["id"], "qty": 1, "unit_cost": 6.0},
+                ],
+            },
+        )
+        assert r.status_code == 201
+
+    rows, cursor = [], None
+    while True:
+        params = {"supplier_id": sup["id"], "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/purchases/", params=params)
+        assert r.status_code == 200
+        rows += r.json()
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(rows) == 3
+    assert len({row["id"] for row in rows}) == 3
+    assert all(row["item_count"] == 2 and len(row["products"]) == 2 for row in rows)
+    assert [row["total"] for row in rows] == [24.0, 18.0, 12.0]
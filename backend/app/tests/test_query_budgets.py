@@ -0,0 +1,162 @@
+"""
+Statement budgets for the hot endpoints, measured at two data sizes.
+A growing count means a new N+1 pattern: fix the query, don't raise the budget.
+"""
+
+import uuid
+
+import pytest
+from sqlmodel import Session
+
+from app.db import engine
+from app.models import (
+    CreditTransaction,
+    CreditType,
+    Employee,
+    PaymentMethod,
+    Product,
+    Purchase,
+    PurchaseItem,
+    Sale,
+    SaleItem,
+    Supplier,
+)
+from app.services import dashboard
+from app.services.credits import rebuild_credit_balances
+
+from .conftest import client, count_queries
+
+SIZES = (10, 1000)
+
+# name -> (method, url, max statements per request)
+BUDGETS = {
+    "credit_summary": ("GET", "/credits/summary", 4),  # +1 when manual charges exist
+    "payment_history": ("GET", "/credits/payment-history", 4),
+    "purchases": ("GET", "/purchases/", 2),
+    "products_page": ("GET", "/products/?limit=50", 1),
+    "dashboard": ("GET", "/dashboard/summary", 2),
+    # 11 on PostgreSQL (incl. the balance, stock ledger and rollup upserts); SQLite inserts lines one by one
+    "create_sale": ("POST", "/sales/", 13),
+}
+
+
+def _grow_dataset(tag: str, n: int) -> None:
+    """Bulk-add n employees (credit sale + payment each) and n purchases."""
+    with Session(engine) as db:
+        sup = Supplier(name=f"Budget supplier {tag}")
+        prods = [
+            Product(
+                name=f"Budget {tag} {i}",
+                sku=f"BUD-{tag}-{i}".upper(),
+                price=10.0,
+                cost_price=6.0,
+                stock_qty=100_000,
+            )
+            for i in range(3)
+        ]
+        db.add(sup)
+        db.add_all(prods)
+        db.flush()
+        for i in range(n):
+            emp = Employee(name=f"Budget emp {tag}-{i}")
+            sale = Sale(employee=emp, payment_method=PaymentMethod.credit, total=20.0)
+            db.add_all([emp, sale])
+            db.add_all(
+                [
+                    SaleItem(
+                        sale=sale,
+                        product_id=p.id,
+                        qty=1,
+                        unit_price=10.0,
+                        subtotal=10.0,
+                    )
+                    for p in prods[:2]
+                ]
+            )
+            db.flush()
+            db.add_all(
+                [
+                    CreditTransaction(
+                        employee_id=emp.id,
+                        type=CreditType.charge,
+                        amount=20.0,
+                        sale_id=sale.id,
+                    ),
+                    CreditTransaction(
+                        employee_id=emp.id, type=CreditType.payment, amount=5.0
+                    ),
+                ]
+            )
+            pur = Purchase(supplier_id=sup.id, total=12.0)
+            db.add(pur)
+            db.add_all(
+                [
+                    PurchaseItem(
+                        purchase=pur,
+                        product_id=p.id,
+                        qty=1,
+                        unit_cost=6.0,
+                        subtotal=6.0,
+                    )
+                    for p in prods[:2]
+                ]
+            )
+        db.commit()
+        rebuild_credit_balances(db)
+    dashboard.invalidate()
+
+
+def _measure(client, method: str, url: str, sale_body: dict) -> int:
+    dashboard.invalidate()
+    with count_queries() as log:
+        r = client.post(url, json=sale_body) if method == "POST" else client.get(url)
+    assert r.status_code < 300, r.text
+    return log.count
+
+
+@pytest.fixture(scope="module")
+def counts(client):
+    prod = client.post(
+        "/products/",
+        json={
+            "name": "Budget sale item",
+            "sku": f"BUD-SALE-{uuid.uuid4().hex[:8]}".upper(),
+            "price": 3.0,
+            "cost_price": 1.0,
+            "stock_qty": 1_000,
+        },
+    ).json()
+    emp = client.post("/employees/", json={"name": "Budget buyer"}).json()
+    sale_body = {
+        "employee_id": emp["id"],
+        "payment_method": "credit",
+        "items": [{"product_id": prod["id"], "qty": 1, "unit_price": 3.0}] * 3,
+    }
+
+    out, grown = {}, 0
+    tag = uuid.uuid4().hex[:6]
+    for size in SIZES:
+        _grow_dataset(f"{tag}-{size}", size - grown)
+        grown = size
+        out[size] = {
+            name: _measure(client, method, url, sale_body)
+            for name, (method, url, _) in BUDGETS.items()
+        }
+    return out
+
+
+@pytest.mark.parametrize("name", list(BUDGETS))
+def test_statement_count_within_budget_and_flat(counts, name):
+    small, large = counts[SIZES[0]][name], counts[SIZES[-1]][name]
+    budget = BUDGETS[name][2]
+    assert large <= budget, f"{name}: {large} statements > budget {budget}"
+    assert (
+        large == small
+    ), f"{name}: {small} statements at {SIZES[0]} rows, {large} at {SIZES[-1]}"
+
+
+def test_query_counter_fixture_sees_statements(client, query_counter):
+    with query_counter() as log:
+        client.get("/employees/")
+    assert log.count >= 1
+    assert any("employee" in s.lower() for s in log.statements)
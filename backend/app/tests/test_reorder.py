@@ -0,0 +1,114 @@
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+from sqlmodel import Session
+
+from app.db import engine
+from app.models import DailySales, PaymentMethod, Product
+from app.services.reorder import reorder_plan, reorder_report
+
+from .conftest import client
+
+
+def test_plan_statistics():
+    ids = np.array([1, 2, 3])
+    stock = np.array([10.0, 5.0, -1.0])
+    # Product 1 sells 2/day every day, 2 never sells, 3 sells 10 once
+    pid = np.array([1] * 10 + [3])
+    offset = np.array(list(range(10)) + [0])
+    qty = np.array([2.0] * 10 + [10.0])
+    plan = reorder_plan(
+        ids, stock, pid, offset, qty, window_days=10, lead_time_days=7, review_days=7
+    )
+
+    assert plan["velocity"].tolist() == [2.0, 0.0, 1.0]
+    assert (
+        plan["std"][:2].tolist() == [0.0, 0.0] and abs(plan["std"][2] - 10**0.5) < 1e-9
+    )
+    assert plan["days_of_cover"].tolist() == [5.0, float("inf"), 0.0]
+    # 2/day over 14 days minus the 10 on hand; 1/day plus safety stock for 3
+    assert plan["suggested_qty"].tolist() == [18.0, 0.0, 34.0]
+
+
+def test_reorder_report_reads_the_rollup(client):
+    tag = uuid.uuid4().hex[:6].upper()
+    today = date(2018, 6, 30)
+    with Session(engine) as db:
+        fast = Product(
+            name=f"Fast {tag}",
+            sku=f"FAST-{tag}",
+            price=1,
+            cost_price=1,
+            stock_qty=3,
+            reorder_level=1,
+        )
+        slow = Product(
+            name=f"Slow {tag}",
+            sku=f"SLOW-{tag}",
+            price=1,
+            cost_price=1,
+            stock_qty=500,
+            reorder_level=50,
+        )
+        db.add_all([fast, slow])
+        db.flush()
+        for i in range(28):
+            day = today - timedelta(days=i)
+            db.add(
+                DailySales(
+                    day=day,
+                    product_id=fast.id,
+                    payment_method=PaymentMethod.cash,
+                    qty=3,
+                )
+            )
+            db.add(
+                DailySales(
+                    day=day,
+                    product_id=fast.id,
+                    payment_method=PaymentMethod.credit,
+                    qty=1,
+                )
+            )
+            db.add(
+                DailySales(
+                    day=day,
+                    product_id=slow.id,
+                    payment_method=PaymentMethod.cash,
+                    qty=1,
+                )
+            )
+        # Outside the window
+        db.add(
+            DailySales(
+                day=today - timedelta(days=40),
+                product_id=fast.id,
+                payment_method=PaymentMethod.cash,
+                qty=999,
+            )
+        )
+        db.commit()
+
+        rows = {
+            r["product_id"]: r
+            for r in reorder_report(db, window_days=28, today=today, limit=5000)
+        }
+        assert fast.id in rows and slow.id not in rows  # slow has 500 days of cover
+        r = rows[fast.id]
+        assert (r["velocity"], r["daily_std"], r["days_of_cover"]) == (4.0, 0.0, 0.8)
+        assert (r["reorder_point"], r["suggested_qty"]) == (28.0, 53.0)
+
+        everything = reorder_report(
+            db, window_days=28, today=today, only_needed=False, limit=5000
+        )
+        assert (
+            next(x for x in everything if x["product_id"] == slow.id)["days_of_cover"]
+            == 500.0
+        )
+
+    r = client.get("/reports/reorder", params={"window_days": 30, "limit": 5})
+    assert r.status_code == 200 and len(r.json()) <= 5
+    assert (
+        client.get("/reports/reorder", params={"service_level": 1}).status_code == 422
+    )
@@ -0,0 +1,200 @@
+import asyncio
+import uuid
+from datetime import date, datetime
+
+from sqlmodel import Session, func, select
+
+from app.db import engine
+from app.models import DailySales, PaymentMethod, Sale, SaleItem, SalesDelta
+from app.services.sales_rollup import (
+    backfill_sales_rollup,
+    fold_deltas,
+    fold_periodically,
+    verify_sales_rollup,
+)
+
+from .conftest import client
+
+
+def _product(client, price=10.0, cost=6.0):
+    tag = uuid.uuid4().hex[:6].upper()
+    r = client.post(
+        "/products/",
+        json={
+            "name": f"Report {tag}",
+            "sku": f"REP-{tag}",
+            "price": price,
+            "cost_price": cost,
+            "stock_qty": 1000,
+        },
+    )
+    return r.json()["id"]
+
+
+def _rollup(pid):
+    with Session(engine) as db:
+        return {
+            (r.payment_method, r.qty, r.revenue, r.cost)
+            for r in db.exec(
+                select(DailySales).where(DailySales.product_id == pid)
+            ).all()
+        }
+
+
+def test_sales_update_the_rollup(client):
+    pid = _product(client)
+    emp = client.post("/employees/", json={"name": "Report employee"}).json()["id"]
+    for payload in (
+        {
+            "payment_method": "cash",
+            "items": [{"product_id": pid, "qty": 2, "unit_price": 10.0}],
+        },
+        {
+            "payment_method": "cash",
+            "items": [{"product_id": pid, "qty": 1, "unit_price": 9.5}],
+        },
+        {
+            "payment_method": "credit",
+            "employee_id": emp,
+            "items": [{"product_id": pid, "qty": 3, "unit_price": 10.0}],
+        },
+    ):
+        assert client.post("/sales/", json=payload).status_code == 201
+    r = client.post(
+        "/sales/batch",
+        json=[
+            {
+                "payment_method": "cash",
+                "items": [{"product_id": pid, "qty": 4, "unit_price": 10.0}],
+            },
+            {
+                "payment_method": "cash",
+                "items": [{"product_id": pid, "qty": 10_000, "unit_price": 10.0}],
+            },
+        ],
+    )
+    assert r.status_code in (200, 207)
+
+    def reports():
+        today = datetime.utcnow().date().isoformat()
+        top = client.get(
+            "/reports/top-products", params={"from": today, "to": today, "limit": 100}
+        ).json()
+        mine = next(t for t in top if t["product_id"] == pid)
+        assert (mine["qty"], mine["revenue"], mine["cost"], mine["margin"]) == (
+            10.0,
+            99.5,
+            60.0,
+            39.5,
+        )
+        cash = client.get(
+            "/reports/top-products",
+            params={"payment_method": "cash", "by": "revenue", "limit": 100},
+        ).json()
+        assert next(t for t in cash if t["product_id"] == pid)["revenue"] == 69.5
+        with Session(engine) as db:
+            assert pid not in {d["product_id"] for d in verify_sales_rollup(db)}
+
+    # Sales only append deltas; reports already include them
+    assert _rollup(pid) == set()
+    reports()
+
+    with Session(engine) as db:
+        assert fold_deltas(db) >= 3
+    assert _rollup(pid) == {
+        (PaymentMethod.cash, 7.0, 69.5, 42.0),
+        (PaymentMethod.credit, 3.0, 30.0, 18.0),
+    }
+    reports()
+
+
+def test_background_fold_bounds_the_delta_tail(client):
+    pid = _product(client)
+    for _ in range(3):
+        r = client.post(
+            "/sales/",
+            json={
+                "payment_method": "cash",
+                "items": [{"product_id": pid, "qty": 1, "unit_price": 10.0}],
+            },
+        )
+        assert r.status_code == 201
+
+    def unfolded():
+        with Session(engine) as db:
+            return db.exec(select(func.count()).select_from(SalesDelta)).one()
+
+    assert unfolded() >= 3
+
+    async def run_for(seconds):
+        task = asyncio.create_task(fold_periodically(engine, 0.01))
+        await asyncio.sleep(seconds)
+        task.cancel()
+
+    asyncio.run(run_for(0.2))
+    # Reports read only DailySales again, with the same totals
+    assert unfolded() == 0
+    assert _rollup(pid) == {(PaymentMethod.cash, 3.0, 30.0, 18.0)}
+
+
+def test_backfill_and_period_buckets(client):
+    pid = _product(client, price=5.0, cost=2.0)
+    with Session(engine) as db:
+        # Historical sales loaded behind the rollup's back
+        for day, qty in (
+            (date(2019, 4, 29), 1),
+            (date(2019, 4, 30), 2),
+            (date(2019, 5, 1), 3),
+            (date(2019, 5, 6), 4),
+        ):
+            sale = Sale(
+                payment_method=PaymentMethod.cash,
+                total=qty * 5.0,
+                created_at=datetime.combine(day, datetime.min.time()),
+            )
+            db.add(sale)
+            db.add(
+                SaleItem(
+                    sale=sale,
+                    product_id=pid,
+                    qty=qty,
+                    unit_price=5.0,
+                    subtotal=qty * 5.0,
+                )
+            )
+        db.commit()
+        assert pid in {d["product_id"] for d in verify_sales_rollup(db)}
+        assert backfill_sales_rollup(db, date(2019, 1, 1)) >= 4
+        assert pid not in {d["product_id"] for d in verify_sales_rollup(db)}
+
+    def report(period):
+        r = client.get(
+            "/reports/sales",
+            params={"period": period, "from": "2019-04-01", "to": "2019-05-31"},
+        )
+        assert r.status_code == 200
+        return [
+            (row["period"], row["qty"], row["revenue"], row["margin"])
+            for row in r.json()
+        ]
+
+    assert report("day") == [
+        ("2019-04-29", 1.0, 5.0, 3.0),
+        ("2019-04-30", 2.0, 10.0, 6.0),
+        ("2019-05-01", 3.0, 15.0, 9.0),
+        ("2019-05-06", 4.0, 20.0, 12.0),
+    ]
+    assert report("week") == [
+        ("2019-04-29", 6.0, 30.0, 18.0),
+        ("2019-05-06", 4.0, 20.0, 12.0),
+    ]
+    assert report("month") == [
+        ("2019-04-01", 3.0, 15.0, 9.0),
+        ("2019-05-01", 7.0, 35.0, 21.0),
+    ]
+    assert (
+        client.get(
+            "/reports/sales", params={"from": "2019-05-02", "to": "2019-05-01"}
+        ).status_code
+        == 400
+    )
@@ -0,0 +1,128 @@
+import uuid
+
+from .conftest import client
+
+
+def test_sales_batch_reports_per_sale_outcome(client):
+    sku = f"BATCH-{uuid.uuid4().hex[:8]}".upper()
+    prod = client.post(
+        "/products/",
+        json={
+            "name": "Batch item",
+            "sku": sku,
+            "price": 5.0,
+            "cost_price": 3.0,
+            "stock_qty": 5,
+        },
+    ).json()
+    emp = client.post("/employees/", json={"name": "Batch buyer"}).json()
+    line = {"product_id": prod["id"], "qty": 2, "unit_price": 5.0}
+
+    r = client.post(
+        "/sales/batch",
+        json=[
+            {"payment_method": "cash", "items": [line]},
+            {"employee_id": emp["id"], "payment_method": "credit", "items": [line]},
+            {"payment_method": "cash", "items": [line]},  # only 1 left
+            {"payment_method": "credit", "items": [line]},  # no employee
+            {
+                "payment_method": "cash",
+                "items": [{"product_id": 0, "qty": 1, "unit_price": 1.0}],
+            },
+        ],
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["accepted"], body["rejected"]) == (2, 3)
+    assert [x["ok"] for x in body["results"]] == [True, True, False, False, False]
+    assert all(x["sale_id"] for x in body["results"][:2])
+    assert "Insufficient stock" in body["results"][2]["error"]
+
+    assert client.get(f"/credits/{emp['id']}/balance").json() == 10.0
+    stock = client.get(
+        "/products/", params={"unit": "unit", "min_price": 5, "max_price": 5}
+    ).json()
+    assert next(p for p in stock if p["sku"] == sku)["stock_qty"] == 1
+
+
+def test_credit_sale_is_atomic(client):
+    sku = f"UOW-{uuid.uuid4().hex[:8]}".upper()
+    prod = client.post(
+        "/products/",
+        json={
+            "name": "Atomic item",
+            "sku": sku,
+            "price": 7.0,
+            "cost_price": 3.0,
+            "stock_qty": 4,
+        },
+    ).json()
+
+    # The charge fails (no employee), so the sale and its stock move must not persist
+    r = client.post(
+        "/sales/",
+        json={
+            "payment_method": "credit",
+            "items": [{"product_id": prod["id"], "qty": 1, "unit_price": 7.0}],
+        },
+    )
+    assert r.status_code == 400
+
+    listed = client.get("/products/", params={"min_price": 7, "max_price": 7}).json()
+    assert next(p for p in listed if p["sku"] == sku)["stock_qty"] == 4
+
+
+def test_conditional_shortfall_rolls_back_the_sale(client, monkeypatch):
+    from sqlmodel import Session, select
+
+    from app.config import settings
+    from app.db import engine
+    from app.models import CreditTransaction, SaleItem, StockMovement
+
+    monkeypatch.setattr(settings, "STOCK_ENGINE", "conditional")
+    sku = f"COND-{uuid.uuid4().hex[:8]}".upper()
+    prod = client.post(
+        "/products/",
+        json={
+            "name": "Conditional item",
+            "sku": sku,
+            "price": 2.0,
+            "cost_price": 1.0,
+            "stock_qty": 3,
+        },
+    ).json()
+    emp = client.post("/employees/", json={"name": "Conditional buyer"}).json()
+
+    # The stock UPDATE runs after the sale rows are written; its shortfall undoes them all
+    r = client.post(
+        "/sales/",
+        json={
+            "employee_id": emp["id"],
+            "payment_method": "credit",
+            "items": [{"product_id": prod["id"], "qty": 5, "unit_price": 2.0}],
+        },
+    )
+    assert r.status_code == 400
+    assert "Insufficient stock" in r.json()["detail"]
+    with Session(engine) as db:
+        assert not db.exec(
+            select(SaleItem).where(SaleItem.product_id == prod["id"])
+        ).all()
+        assert not db.exec(
+            select(CreditTransaction).where(CreditTransaction.employee_id == emp["id"])
+        ).all()
+        moves = db.exec(
+            select(StockMovement.reason).where(StockMovement.product_id == prod["id"])
+        ).all()
+        assert [m.value for m in moves] == ["opening"]
+
+    ok = client.post(
+        "/sales/",
+        json={
+            "employee_id": emp["id"],
+            "payment_method": "credit",
+            "items": [{"product_id": prod["id"], "qty": 3, "unit_price": 2.0}],
+        },
+    )
+    assert ok.status_code == 201
+    assert client.get(f"/credits/{emp['id']}/balance").json() == 6.0
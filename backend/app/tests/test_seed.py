@@ -0,0 +1,103 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models import CreditTransaction, Product, PurchaseItem, Sale, SaleItem
+from app.seed import generate
+from app.services.credits import rebuild_credit_balances
+from app.services.sales_rollup import verify_sales_rollup
+from app.services.stock_ledger import rebuild_stock_ledger, stock_at
+
+from .conftest import client
+
+NOW = datetime(2025, 1, 1)
+
+
+def _fingerprint(db: Session):
+    return (
+        db.exec(select(func.count(), func.sum(SaleItem.subtotal))).one(),
+        db.exec(select(func.count(), func.sum(CreditTransaction.amount))).one(),
+        db.exec(select(func.sum(Product.stock_qty))).one(),
+    )
+
+
+def test_generate_is_deterministic_and_consistent():
+    first = generate(engine, scale=1, seed=7, now=NOW)
+    assert first["products"] == 100 and first["sales"] == 1000
+    assert first["sale_items"] > first["sales"]  # multi-line baskets
+
+    with Session(engine) as db:
+        fp = _fingerprint(db)
+        # Stock on hand = purchased - sold for every product
+        bought = dict(
+            db.exec(
+                select(PurchaseItem.product_id, func.sum(PurchaseItem.qty)).group_by(
+                    PurchaseItem.product_id
+                )
+            ).all()
+        )
+        sold = dict(
+            db.exec(
+                select(SaleItem.product_id, func.sum(SaleItem.qty)).group_by(
+                    SaleItem.product_id
+                )
+            ).all()
+        )
+        for p in db.exec(select(Product)).all():
+            assert p.stock_qty == bought.get(p.id, 0) - sold.get(p.id, 0)
+        # Sale totals match their lines, balances match the ledger
+        mismatched = db.exec(
+            select(func.count())
+            .select_from(Sale)
+            .where(
+                func.abs(
+                    Sale.total
+                    - select(func.sum(SaleItem.subtotal))
+                    .where(SaleItem.sale_id == Sale.id)
+                    .scalar_subquery()
+                )
+                > 0.01
+            )
+        ).one()
+        assert mismatched == 0
+        assert rebuild_credit_balances(db, fix=False) == []
+        # Stock ledger rebuilt from the lines; snapshots agree with it
+        assert first["stock_snapshots"] > 0
+        assert rebuild_stock_ledger(db, fix=False) == []
+        on_hand = {r["product_id"]: r["qty"] for r in stock_at(db, NOW)}
+        assert all(
+            abs(on_hand[p.id] - p.stock_qty) < 1e-6
+            for p in db.exec(select(Product)).all()
+        )
+        # Daily rollup backfilled from the same lines
+        assert first["daily_sales"] > 0
+        assert verify_sales_rollup(db) == []
+
+    generate(engine, scale=1, seed=7, now=NOW)
+    with Session(engine) as db:
+        assert _fingerprint(db) == fp
+
+
+def test_dev_seed_scale(client):
+    r = client.post("/dev/seed", params={"scale": 1, "seed": 3})
+    assert r.status_code == 200
+    assert r.json()["employees"] == 10
+
+    # Ids continue after the loaded rows
+    p = client.post(
+        "/products/",
+        json={
+            "name": "After seed",
+            "sku": "AFTER-SEED",
+            "price": 1.0,
+            "cost_price": 0.5,
+        },
+    )
+    assert p.status_code in (200, 201)
+    assert p.json()["id"] == 101
+
+    # The demo fixture is still the default
+    r = client.post("/dev/seed")
+    assert r.status_code == 200 and r.json()["products_created"] == 8
@@ -0,0 +1,87 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.config import settings
+from app.db import engine
+
+from .conftest import client
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="row locks (SELECT ... FOR UPDATE) need PostgreSQL",
+)
+
+
+@pytest.mark.parametrize("stock_engine", ["lock", "conditional"])
+def test_concurrent_sales_never_oversell(client, monkeypatch, stock_engine):
+    monkeypatch.setattr(settings, "STOCK_ENGINE", stock_engine)
+    sku = f"HOT-{uuid.uuid4().hex[:8]}".upper()
+    prod = client.post(
+        "/products/",
+        json={
+            "name": "Hot SKU",
+            "sku": sku,
+            "price": 2.0,
+            "cost_price": 1.0,
+            "stock_qty": 25,
+        },
+    ).json()
+
+    def sell(_):
+        # Duplicate lines must be merged before the stock check
+        return client.post(
+            "/sales/",
+            json={
+                "payment_method": "cash",
+                "items": [
+                    {"product_id": prod["id"], "qty": 1, "unit_price": 2.0},
+                    {"product_id": prod["id"], "qty": 1, "unit_price": 2.0},
+                ],
+            },
+        ).status_code
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        codes = list(pool.map(sell, range(40)))
+
+    assert codes.count(201) == 12
+    assert set(codes) <= {201, 400}
+    listed = client.get("/products/", params={"min_price": 2, "max_price": 2}).json()
+    assert next(p for p in listed if p["sku"] == sku)["stock_qty"] == 1
+
+
+def test_concurrent_first_credit_charges(client):
+    # No balance row yet: every charge races to create it. One product per
+    # sale, so the stock row locks don't serialize them first
+    tag = uuid.uuid4().hex[:8].upper()
+    prods = [
+        client.post(
+            "/products/",
+            json={
+                "name": "Credit SKU",
+                "sku": f"CRED-{tag}-{i}",
+                "price": 3.0,
+                "cost_price": 1.0,
+                "stock_qty": 5,
+            },
+        ).json()
+        for i in range(8)
+    ]
+    emp = client.post("/employees/", json={"name": "First-time debtor"}).json()
+
+    def charge(prod):
+        return client.post(
+            "/sales/",
+            json={
+                "employee_id": emp["id"],
+                "payment_method": "credit",
+                "items": [{"product_id": prod["id"], "qty": 1, "unit_price": 3.0}],
+            },
+        ).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        codes = list(pool.map(charge, prods))
+
+    assert codes == [201] * 8
+    assert client.get(f"/credits/{emp['id']}/balance").json() == 24.0
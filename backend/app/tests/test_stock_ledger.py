@@ -0,0 +1,150 @@
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models import Product, StockMovement, StockReason, StockSnapshot
+from app.services.stock_ledger import (
+    movements_for,
+    rebuild_stock_ledger,
+    record_movements,
+    stock_at,
+    take_snapshots,
+)
+
+from .conftest import client
+
+
+def _product(client, stock=10.0):
+    tag = uuid.uuid4().hex[:6].upper()
+    r = client.post(
+        "/products/",
+        json={
+            "name": f"Ledger {tag}",
+            "sku": f"LED-{tag}",
+            "price": 5.0,
+            "cost_price": 3.0,
+            "stock_qty": stock,
+        },
+    )
+    return r.json()["id"]
+
+
+def test_every_stock_write_is_recorded(client):
+    pid = _product(client, stock=10)
+    sup = client.post("/suppliers/", json={"name": "Ledger supplier"}).json()["id"]
+    pur = client.post(
+        "/purchases/",
+        json={
+            "supplier_id": sup,
+            "items": [{"product_id": pid, "qty": 5, "unit_cost": 3.0}],
+        },
+    ).json()["id"]
+    sale = client.post(
+        "/sales/",
+        json={
+            "payment_method": "cash",
+            "items": [
+                {"product_id": pid, "qty": 2, "unit_price": 5.0},
+                {"product_id": pid, "qty": 1, "unit_price": 5.0},
+            ],
+        },
+    )
+    assert sale.status_code == 201
+    assert (
+        client.patch(
+            f"/purchases/{pur}",
+            json={"items": [{"product_id": pid, "qty": 4, "unit_cost": 3.0}]},
+        ).status_code
+        == 200
+    )
+    assert client.patch(f"/products/{pid}", json={"stock_qty": 20}).status_code == 200
+
+    rows = client.get("/stock/movements", params={"product_id": pid}).json()
+    assert [(m["reason"], m["delta"]) for m in reversed(rows)] == [
+        ("opening", 10.0),
+        ("purchase", 5.0),
+        ("sale", -3.0),
+        ("purchase_edit", -1.0),
+        ("adjustment", 9.0),
+    ]
+    assert rows[2]["source_id"] == sale.json()["id"]
+
+    now = client.get("/stock/on-hand", params={"product_id": pid}).json()
+    assert now == [
+        {"product_id": pid, "sku": now[0]["sku"], "name": now[0]["name"], "qty": 20.0}
+    ]
+    with Session(engine) as db:
+        assert pid not in {d["product_id"] for d in rebuild_stock_ledger(db, fix=False)}
+
+
+def test_point_in_time_from_snapshot_and_tail(client):
+    pid = _product(client, stock=0)
+    t0 = datetime(2020, 3, 1)
+    with Session(engine) as db:
+        record_movements(db, movements_for({pid: 50}, StockReason.purchase, at=t0))
+        record_movements(
+            db, movements_for({pid: -10}, StockReason.sale, at=t0 + timedelta(days=10))
+        )
+        db.commit()
+        assert take_snapshots(db, t0 + timedelta(days=15)) >= 1
+        # Nothing moved since, so a second snapshot run skips the product
+        take_snapshots(db, t0 + timedelta(days=20))
+        snaps = db.exec(
+            select(StockSnapshot.taken_at, StockSnapshot.qty).where(
+                StockSnapshot.product_id == pid
+            )
+        ).all()
+        assert snaps == [(t0 + timedelta(days=15), 40.0)]
+        record_movements(
+            db, movements_for({pid: -5}, StockReason.sale, at=t0 + timedelta(days=25))
+        )
+        db.commit()
+
+    def qty(**params):
+        return client.get(
+            "/stock/on-hand", params={"product_id": pid, **params}
+        ).json()[0]["qty"]
+
+    assert qty(on=date(2020, 2, 28)) == 0.0
+    assert qty(on=date(2020, 3, 1)) == 50.0
+    assert qty(at="2020-03-16T00:00:00") == 40.0
+    assert qty(on=date(2020, 3, 26)) == 35.0
+    assert qty(at="2020-03-26T02:00:00+02:00") == 35.0
+    assert (
+        client.get(
+            "/stock/on-hand", params={"at": "2020-03-01T00:00:00", "on": "2020-03-01"}
+        ).status_code
+        == 400
+    )
+
+
+def test_rebuild_backfills_untracked_products(client):
+    with Session(engine) as db:
+        p = Product(
+            name="Untracked",
+            sku=f"UNT-{uuid.uuid4().hex[:6]}".upper(),
+            price=1,
+            cost_price=1,
+            stock_qty=7,
+        )
+        db.add(p)
+        db.commit()
+        drift = rebuild_stock_ledger(db, fix=False)
+        assert {"product_id": p.id, "stored_qty": 7.0, "ledger_qty": 0.0} in drift
+
+        rebuild_stock_ledger(db)
+        assert p.id not in {
+            d["product_id"] for d in rebuild_stock_ledger(db, fix=False)
+        }
+        moves = db.exec(
+            select(StockMovement.reason, StockMovement.delta).where(
+                StockMovement.product_id == p.id
+            )
+        ).all()
+        assert moves == [(StockReason.opening, 7.0)]
+        assert (
+            stock_at(db, datetime.utcnow() + timedelta(seconds=1), [p.id])[0]["qty"]
+            == 7.0
+        )
@@ -1,6 +1,51 @@
-from fastapi import HTTPException, status
+import base64
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException, Response, status
+from pydantic import TypeAdapter
 
 
 def ensure(cond: bool, msg: str, code: int = status.HTTP_400_BAD_REQUEST):
     if not cond:
         raise HTTPException(status_code=code, detail=msg)
+
+
+def normalize_sku(sku: str) -> str:
+    return sku.strip().upper()
+
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset cursor for the last row of a page (datetimes as ISO strings)."""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """Inverse of encode_cursor; `types` converts each position (e.g. datetime, int)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        ensure(isinstance(values, list) and len(values) == len(types), "Invalid cursor")
+        return tuple(
+            t.fromisoformat(v) if t in (date, datetime) else t(v)
+            for t, v in zip(types, values)
+        )
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def json_response(adapter: TypeAdapter, data, headers: dict | None = None) -> Response:
+    """
+    Validate `data` once and encode it in pydantic-core. Used by list routes
+    instead of response_model's dump / re-validate / encode passes; keep the
+    route's response_model for the OpenAPI schema.
+    """
+    body = adapter.dump_json(adapter.validate_python(data))
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -96,8 +96,19 @@ export const createSaleCredit = (payload: SaleCreate) =>
 export const addCreditPayment = (employeeId: number, amount: number) =>
   api.post(`/credits/${employeeId}/payments`, { amount }).then((r) => r.data)
 
-export const getPaymentHistory = () =>
-  api.get<PaymentHistory[]>('/credits/payment-history').then((r) => r.data)
+// Pages are by employee (one row each); follow X-Next-Cursor to the end
+export const getPaymentHistory = async () => {
+  const rows: PaymentHistory[] = []
+  let cursor: string | undefined
+  do {
+    const r = await api.get<PaymentHistory[]>('/credits/payment-history', {
+      params: cursor ? { cursor } : undefined,
+    })
+    rows.push(...r.data)
+    cursor = r.headers['x-next-cursor']
+  } while (cursor)
+  return rows
+}
 
 // -------------------------------
 // Suppliers